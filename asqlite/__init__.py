@@ -20,80 +20,219 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import os
+import re
+import time
 import sqlite3
 import threading
 import queue
 import asyncio
+import weakref
+from contextlib import aclosing, asynccontextmanager
 
 PARSE_DECLTYPES = sqlite3.PARSE_DECLTYPES
 PARSE_COLNAMES = sqlite3.PARSE_COLNAMES
 
 
 class _WorkerEntry:
-    __slots__ = ('func', 'args', 'kwargs', 'future', 'cancelled')
+    __slots__ = ('func', 'args', 'kwargs', 'future', 'cancelled', 'posted', 'result')
 
     def __init__(self, func, args, kwargs, future):
         self.func = func
         self.args = args
         self.kwargs = kwargs
         self.future = future
+        self.posted = time.perf_counter()
+        # Kept on the worker thread, so a result nobody awaits anymore can still be cleaned up
+        self.result = None
+
+
+_STOP = object()
 
 
 class _Worker(threading.Thread):
-    def __init__(self, *, loop):
+    """A thread that runs sqlite3 calls in order.
+
+    The thread blocks on its queue until there's work and exits once it receives a sentinel.
+    Results are handed back to the event loop in batches, a single ``call_soon_threadsafe``
+    delivers everything that finished since the loop last picked up results.
+    """
+
+    def __init__(self, *, loop, key=None, observer=None):
         super().__init__(name='asqlite-worker-thread', daemon=True)
         self.loop = loop
-        self._worker_queue = queue.Queue()
-        self._end = threading.Event()
+        self.key = key
+        self.observer = observer
+        self.refs = 1
+        self._worker_queue = queue.SimpleQueue()
+        self._results = []
+        self._results_lock = threading.Lock()
+        self._delivery_scheduled = False
 
     def _call_entry(self, entry):
         fut = entry.future
         if fut.cancelled():
             return
 
+        started = time.perf_counter()
+        result = exc = None
+
         try:
-            result = entry.func(*entry.args, **entry.kwargs)
+            result = entry.result = entry.func(*entry.args, **entry.kwargs)
         except Exception as e:
-            self.loop.call_soon_threadsafe(fut.set_exception, e)
-        else:
-            self.loop.call_soon_threadsafe(fut.set_result, result)
+            exc = e
 
-    def run(self):
-        _queue = self._worker_queue
-        while not self._end.is_set():
+        if self.observer is not None:
             try:
-                entry = _queue.get(timeout=0.2)
-            except queue.Empty:
+                self.observer(entry.func, entry.args, result, exc, started - entry.posted, time.perf_counter() - started)
+            except Exception:
+                pass
+
+        self._deliver(fut, exc, result)
+
+    def _deliver(self, fut, exc, result):
+        with self._results_lock:
+            self._results.append((fut, exc, result))
+            if self._delivery_scheduled:
+                return
+            self._delivery_scheduled = True
+
+        try:
+            self.loop.call_soon_threadsafe(self._set_results)
+        except RuntimeError:
+            # The loop was closed, nobody is left to receive the results
+            pass
+
+    def _set_results(self):
+        with self._results_lock:
+            results, self._results = self._results, []
+            self._delivery_scheduled = False
+
+        for fut, exc, result in results:
+            if fut.cancelled():
                 continue
+
+            if exc is not None:
+                fut.set_exception(exc)
             else:
-                self._call_entry(entry)
+                fut.set_result(result)
 
-    def post(self, func, *args, **kwargs):
+    def run(self):
+        _queue = self._worker_queue
+        while True:
+            entry = _queue.get()
+            if entry is _STOP:
+                break
+
+            self._call_entry(entry)
+
+    def submit(self, func, *args, **kwargs):
+        """Queues a call and returns its entry, the entry's future resolves with the call's result"""
         future = self.loop.create_future()
         entry = _WorkerEntry(func=func, args=args, kwargs=kwargs, future=future)
-        self._worker_queue.put_nowait(entry)
-        return future
+        self._worker_queue.put(entry)
+        return entry
+
+    def post(self, func, *args, **kwargs):
+        return self.submit(func, *args, **kwargs).future
 
     def stop(self):
-        self._end.set()
+        """Drops a reference to the worker, the thread is stopped once nothing uses it.
+
+        The thread isn't joined, it exits on its own after finishing the calls queued before this.
+        Joining here would block the event loop until then.
+        """
+        if self.refs <= 0:
+            return
+
+        self.refs -= 1
+        if self.refs:
+            return
+
+        if self.key is not None and _shared_workers.get(self.key) is self:
+            del _shared_workers[self.key]
+
+        self._worker_queue.put(_STOP)
+
+
+_shared_workers = {}
+
+
+def _worker_key(database, loop):
+    database = os.fspath(database)
+    if database == ':memory:' or database.startswith('file:'):
+        return None
+
+    return (loop, os.path.abspath(database))
+
+
+def _get_worker(database, loop, shared, observer):
+    """Returns a running worker, connections to the same file on the same loop share one unless ``shared`` is False"""
+    key = _worker_key(database, loop) if shared else None
+
+    if key is not None:
+        worker = _shared_workers.get(key)
+        if worker is not None:
+            worker.refs += 1
+            worker.observer = worker.observer or observer
+            return worker
+
+    worker = _Worker(loop=loop, key=key, observer=observer)
+    worker.start()
+
+    if key is not None:
+        _shared_workers[key] = worker
+
+    return worker
 
 
 class _ContextManagerMixin:
-    def __init__(self, _queue, _factory, func, *args, timeout=None, **kwargs):
+    def __init__(
+            self,
+            _queue,
+            _factory,
+            func,
+            *args,
+            timeout=None,
+            on_error=None,
+            on_abandoned=None,
+            **kwargs
+    ):
         self._worker = _queue
         self.func = func
         self.timeout = timeout
         self._factory = _factory
+        self._on_error = on_error
+        # Called on the worker thread with the result of a call that was cancelled or timed out while it ran
+        self._on_abandoned = on_abandoned
         self.args = args
         self.kwargs = kwargs
         self.__result = None
 
+    def _clean_up_abandoned(self, entry):
+        if entry.result is None:
+            return
+
+        try:
+            self._on_abandoned(entry.result)
+        except Exception:
+            pass
+
     async def _runner(self):
-        future = self._worker.post(self.func, *self.args, **self.kwargs)
-        if self.timeout is not None:
-            ret = await asyncio.wait_for(future, timeout=self.timeout)
-        else:
-            ret = await future
+        entry = self._worker.submit(self.func, *self.args, **self.kwargs)
+        try:
+            if self.timeout is not None:
+                ret = await asyncio.wait_for(entry.future, timeout=self.timeout)
+            else:
+                ret = await entry.future
+        except BaseException:
+            if self._on_abandoned is not None:
+                # Runs after the abandoned call on the same thread, so it sees the result if there was one
+                self._worker.post(self._clean_up_abandoned, entry)
+            if self._on_error is not None:
+                self._on_error()
+            raise
+
         self.__result = result = self._factory(ret)
         return result
 
@@ -168,6 +307,21 @@ class Cursor:
         """Asynchronous version of :meth:`sqlite3.Cursor.fetchall`."""
         return await self._post(self._cursor.fetchall)
 
+    def __aiter__(self):
+        return self.iterate()
+
+    async def iterate(self, size=256):
+        """Yields the remaining rows, fetching ``size`` of them at a time from the worker thread.
+        ``async for row in cursor`` uses the default batch size.
+        """
+        while True:
+            rows = await self._post(self._cursor.fetchmany, size)
+            if not rows:
+                return
+
+            for row in rows:
+                yield row
+
 
 class Transaction:
     """An asyncio-compatible transaction for sqlite3.
@@ -240,6 +394,7 @@ class Connection:
         self._conn = connection
         self._queue = queue
         self._post = queue.post
+        self._closed = False
 
     async def __aenter__(self):
         return self
@@ -289,8 +444,14 @@ class Connection:
 
     async def close(self):
         """Asynchronous version of :meth:`sqlite3.Connection.close`."""
-        await self._post(self._conn.close)
-        self._queue.stop()
+        if self._closed:
+            return
+
+        self._closed = True
+        try:
+            await self._post(self._conn.close)
+        finally:
+            self._queue.stop()
 
     def execute(self, sql, *parameters):
         """Asynchronous version of :meth:`sqlite3.Connection.execute`.
@@ -331,6 +492,54 @@ class Connection:
         async with self.execute(query, *parameters) as cursor:
             return await cursor.fetchall()
 
+    async def iterate(self, query, *parameters, size=256):
+        """Shortcut method version of :meth:`Cursor.iterate` without making a cursor."""
+        async with self.execute(query, *parameters) as cursor:
+            async with aclosing(cursor.iterate(size)) as rows:
+                async for row in rows:
+                    yield row
+
+    def _backup(self, target, pages, sleep, progress):
+        copied = {'pages': 0, 'steps': 0}
+
+        def on_step(status, remaining, total):
+            copied['pages'] = total - remaining
+            copied['steps'] += 1
+            if progress is not None:
+                progress(total - remaining, total)
+
+        # A read transaction pins the snapshot, so writes from other connections
+        # don't force the backup to restart and the copy stays consistent
+        pin_snapshot = not self._conn.in_transaction
+        destination = sqlite3.connect(target)
+
+        try:
+            if pin_snapshot:
+                self._conn.execute('BEGIN')
+                self._conn.execute('SELECT count(*) FROM sqlite_master').fetchone()
+
+            try:
+                self._conn.backup(destination, pages=pages, progress=on_step, sleep=sleep)
+            finally:
+                if pin_snapshot:
+                    self._conn.execute('COMMIT')
+
+            # The copy inherits WAL mode, switch it back so the backup is a single self-contained file
+            destination.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            destination.close()
+
+        return copied['pages'], copied['steps']
+
+    async def backup(self, target, *, pages=256, sleep=0.005, progress=None):
+        """Copies the database to the file at ``target`` with the sqlite online backup API.
+
+        ``pages`` are copied per step and the worker sleeps ``sleep`` seconds between steps
+        with the GIL released. ``progress(copied, total)`` is called on the worker thread after
+        every step. Returns a ``(pages, steps)`` tuple.
+        """
+        return await self._post(self._backup, target, pages, sleep, progress)
+
 
 def _connect_pragmas(db, **kwargs):
     connection = sqlite3.connect(db, **kwargs)
@@ -341,7 +550,7 @@ def _connect_pragmas(db, **kwargs):
     return connection
 
 
-def connect(database, *, init=None, timeout=None, loop=None, **kwargs):
+def connect(database, *, init=None, timeout=None, loop=None, shared=True, observer=None, **kwargs):
     """asyncio-compatible version of :func:`sqlite3.connect`.
     This can be used as a regular coroutine or in an async-with statement.
     For example, both are equivalent:
@@ -358,10 +567,13 @@ def connect(database, *, init=None, timeout=None, loop=None, **kwargs):
     A special keyword-only parameter named ``init`` can be passed which allows
     one to customize the :class:`sqlite3.Connection` before it is converted
     to a :class:`Connection` object.
+    Connections to the same database file share a single worker thread, pass
+    ``shared=False`` to give the connection a thread of its own.
+    ``observer`` is called on the worker thread after every call it runs, as
+    ``observer(func, args, result, exception, queue_wait, run_time)``.
     """
     loop = loop or asyncio.get_event_loop()
-    queue = _Worker(loop=loop)
-    queue.start()
+    queue = _get_worker(database, loop, shared, observer)
 
     def factory(con):
         return Connection(con, queue)
@@ -374,4 +586,186 @@ def connect(database, *, init=None, timeout=None, loop=None, **kwargs):
     else:
         new_connect = _connect_pragmas
 
-    return _ContextManagerMixin(queue, factory, new_connect, database, timeout=timeout, **kwargs)
+    return _ContextManagerMixin(
+        queue,
+        factory,
+        new_connect,
+        database,
+        timeout=timeout,
+        on_error=queue.stop,
+        on_abandoned=sqlite3.Connection.close,
+        **kwargs
+    )
+
+
+_LEADING_COMMENTS = re.compile(r'^\s*(?:(?:--[^\n]*(?:\n|$)|/\*.*?\*/)\s*)*', re.DOTALL)
+_READ_ONLY_KEYWORDS = frozenset({'SELECT', 'EXPLAIN', 'VALUES'})
+
+
+def is_read_only(sql):
+    """Whether a statement can run on a read-only connection, judged by its first keyword.
+    ``WITH`` and ``PRAGMA`` statements are treated as writes since they may modify the database.
+    """
+    sql = _LEADING_COMMENTS.sub('', sql, count=1)
+    keyword = sql.split(None, 1)[0].upper() if sql else ''
+    return keyword in _READ_ONLY_KEYWORDS
+
+
+class Pool:
+    """A single writer :class:`Connection` plus read-only connections that each run on their own thread.
+    Create these with :func:`create_pool`.
+    In WAL mode readers never block the writer or each other, so reads no longer queue up
+    behind one thread. If the pool has no readers everything runs on the writer.
+    """
+
+    def __init__(self, writer, readers):
+        self._writer = writer
+        self._writer_lock = asyncio.Lock()
+        self._readers = asyncio.Queue()
+        self._all_readers = list(readers)
+        self._num_readers = len(readers)
+        self._closed = False
+        # Generators from iterate() hold their connection until they're finalized, close() finalizes them
+        self._iterators = weakref.WeakSet()
+
+        for reader in readers:
+            self._readers.put_nowait(reader)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def num_readers(self):
+        """The number of read-only connections in the pool."""
+        return self._num_readers
+
+    @asynccontextmanager
+    async def acquire(self, *, write=False):
+        """Borrows a connection, the writer is held exclusively until the block exits."""
+        if self._closed:
+            raise RuntimeError('Pool is closed')
+
+        if write or not self._num_readers:
+            async with self._writer_lock:
+                yield self._writer
+            return
+
+        reader = await self._readers.get()
+        try:
+            yield reader
+        finally:
+            self._readers.put_nowait(reader)
+
+    def acquire_for(self, sql):
+        """Borrows the connection a statement should run on, see :func:`is_read_only`."""
+        return self.acquire(write=not is_read_only(sql))
+
+    async def execute(self, sql, *parameters):
+        """Runs a statement on the connection it belongs on and returns the number of modified rows."""
+        async with self.acquire_for(sql) as conn:
+            async with conn.execute(sql, *parameters) as cursor:
+                return cursor.get_cursor().rowcount
+
+    async def fetchone(self, query, *parameters):
+        """Shortcut method version of :meth:`Connection.fetchone` that runs on the right connection."""
+        async with self.acquire_for(query) as conn:
+            return await conn.fetchone(query, *parameters)
+
+    async def fetchmany(self, query, *parameters, size=None):
+        """Shortcut method version of :meth:`Connection.fetchmany` that runs on the right connection."""
+        async with self.acquire_for(query) as conn:
+            return await conn.fetchmany(query, *parameters, size=size)
+
+    async def fetchall(self, query, *parameters):
+        """Shortcut method version of :meth:`Connection.fetchall` that runs on the right connection."""
+        async with self.acquire_for(query) as conn:
+            return await conn.fetchall(query, *parameters)
+
+    def iterate(self, query, *parameters, size=256):
+        """Shortcut method version of :meth:`Connection.iterate` that runs on the right connection.
+        The connection stays borrowed until iteration finishes or the generator is closed, breaking
+        out of ``async for`` doesn't close it, use :func:`contextlib.aclosing` for that.
+        """
+        iterator = self._iterate(query, parameters, size)
+        self._iterators.add(iterator)
+        return iterator
+
+    async def _iterate(self, query, parameters, size):
+        async with self.acquire_for(query) as conn:
+            async with aclosing(conn.iterate(query, *parameters, size=size)) as rows:
+                async for row in rows:
+                    yield row
+
+    async def _wait_for_connections(self):
+        await self._writer_lock.acquire()
+        for _ in range(self._num_readers):
+            await self._readers.get()
+
+    async def close(self, *, timeout=10.0):
+        """Closes the writer and every reader.
+        Borrowed connections are waited on for up to ``timeout`` seconds, then they're closed anyway.
+        A ``timeout`` of ``None`` waits for them indefinitely.
+        """
+        if self._closed:
+            return
+
+        self._closed = True
+
+        for iterator in list(self._iterators):
+            try:
+                await iterator.aclose()
+            except RuntimeError:
+                # It's being iterated right now, its connection is returned once that step finishes
+                pass
+
+        try:
+            await asyncio.wait_for(self._wait_for_connections(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        # Calls already queued on a borrowed connection's worker still run before it closes
+        await self._writer.close()
+        for reader in self._all_readers:
+            await reader.close()
+
+
+def _query_only(con):
+    con.execute('pragma query_only=ON')
+
+
+async def create_pool(database, *, readers=4, init=None, timeout=None, loop=None, observer=None, **kwargs):
+    """Opens a :class:`Pool` with one writer and ``readers`` read-only connections.
+    ``init`` and ``observer`` apply to every connection, readers also get ``pragma query_only``.
+    The writer is opened first so the database is created and in WAL mode before the readers attach.
+    """
+    writer = await connect(database, init=init, timeout=timeout, loop=loop, observer=observer, **kwargs)
+
+    def reader_init(con):
+        _query_only(con)
+        if init is not None:
+            init(con)
+
+    opened = []
+    try:
+        for _ in range(readers):
+            opened.append(
+                await connect(
+                    database,
+                    init=reader_init,
+                    timeout=timeout,
+                    loop=loop,
+                    shared=False,
+                    observer=observer,
+                    **kwargs
+                )
+            )
+    except BaseException:
+        for reader in opened:
+            await reader.close()
+        await writer.close()
+        raise
+
+    return Pool(writer, opened)
@@ -0,0 +1,89 @@
+"""Times single-account UPDATEs against a large accounts table, with and without the composite key.
+
+Usage: python -m benchmarks.account_update [--rows 1000000] [--guilds 100] [--updates 10000]
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from utils.db_helper import BaseTable, DatabaseHelper
+from utils.classes import AccountsTable, ACCOUNT_INSERT, ACCOUNT_UPDATE
+
+
+# The accounts table as it was before it had a primary key
+LegacyAccountsTable = BaseTable(name=AccountsTable.name, columns=AccountsTable.columns)
+
+
+async def populate(db: DatabaseHelper, rows: int, guilds: int):
+    chunk = 100_000
+    for start in range(0, rows, chunk):
+        await db.executemany(
+            ACCOUNT_INSERT,
+            ((i // guilds, i % guilds, 0, 0, 0) for i in range(start, min(start + chunk, rows)))
+        )
+
+
+async def bench(path: str, table: BaseTable, label: str, rows: int, guilds: int, updates: int):
+    db = DatabaseHelper([table], 0, path, check_same_thread=False)
+    await db.startup()
+
+    start = time.perf_counter()
+    await populate(db, rows, guilds)
+    populate_time = time.perf_counter() - start
+
+    async with db.conn() as conn:
+        plan = await conn.fetchall(f'EXPLAIN QUERY PLAN {ACCOUNT_UPDATE}', (1, 1, 1, 1, 1))
+
+    rng = random.Random(0)
+    keys = [rng.randrange(rows) for _ in range(updates)]
+    params = [(1, 2, 3, i // guilds, i % guilds) for i in keys]
+
+    start = time.perf_counter()
+    await db.executemany(ACCOUNT_UPDATE, params)
+    elapsed = time.perf_counter() - start
+
+    await db.close()
+
+    print(f'{label} ({rows} rows, populated in {populate_time:.2f}s)')
+    print(f'  plan: {plan[0]["detail"]}')
+    print(f'  {updates} updates in {elapsed:.3f}s, {elapsed / updates * 1_000_000:.1f}us per update')
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--guilds', type=int, default=100)
+    parser.add_argument('--updates', type=int, default=10_000)
+    parser.add_argument(
+        '--legacy-updates',
+        type=int,
+        default=50,
+        help='Updates to time without the key, every one is a full table scan'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        await bench(
+            os.path.join(directory, 'legacy.db'),
+            LegacyAccountsTable,
+            'No primary key',
+            args.rows,
+            args.guilds,
+            args.legacy_updates
+        )
+        await bench(
+            os.path.join(directory, 'keyed.db'),
+            AccountsTable,
+            'PRIMARY KEY (guild_id, user_id)',
+            args.rows,
+            args.guilds,
+            args.updates
+        )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Round-trip latency of asqlite's worker against the old polling worker.
+
+Usage: python -m benchmarks.asqlite_latency [--queries 20000] [--concurrency 1 32]
+"""
+
+import os
+import time
+import queue
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+
+import asqlite
+
+
+class LegacyWorker(threading.Thread):
+    """The worker asqlite used to ship, it polls its queue and posts every result separately"""
+
+    def __init__(self, *, loop):
+        super().__init__(name='asqlite-legacy-worker-thread', daemon=True)
+        self.loop = loop
+        self._worker_queue = queue.Queue()
+        self._end = threading.Event()
+
+    def _call_entry(self, entry):
+        fut = entry.future
+        if fut.cancelled():
+            return
+
+        try:
+            result = entry.func(*entry.args, **entry.kwargs)
+        except Exception as e:
+            self.loop.call_soon_threadsafe(fut.set_exception, e)
+        else:
+            self.loop.call_soon_threadsafe(fut.set_result, result)
+
+    def run(self):
+        _queue = self._worker_queue
+        while not self._end.is_set():
+            try:
+                entry = _queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            else:
+                self._call_entry(entry)
+
+    def post(self, func, *args, **kwargs):
+        future = self.loop.create_future()
+        entry = asqlite._WorkerEntry(func=func, args=args, kwargs=kwargs, future=future)
+        self._worker_queue.put_nowait(entry)
+        return future
+
+    def stop(self):
+        self._end.set()
+
+
+async def legacy_connect(path: str) -> asqlite.Connection:
+    worker = LegacyWorker(loop=asyncio.get_running_loop())
+    worker.start()
+    connection = await worker.post(asqlite._connect_pragmas, path)
+    return asqlite.Connection(connection, worker)
+
+
+async def measure(conn: asqlite.Connection, queries: int, concurrency: int) -> tuple[list[float], float]:
+    latencies = []
+
+    async def client(amount: int):
+        for _ in range(amount):
+            start = time.perf_counter()
+            await conn.fetchone('SELECT 1')
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(queries // concurrency) for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+def report(label: str, latencies: list[float], elapsed: float):
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1_000_000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1_000_000
+    print(f'  {label:<8} p50 {p50:>8.1f}us  p99 {p99:>8.1f}us  {len(latencies) / elapsed:>9.0f} queries/s')
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--queries', type=int, default=20_000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 32])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'latency.db')
+
+        for concurrency in args.concurrency:
+            print(f'{args.queries} queries, {concurrency} concurrent')
+
+            legacy = await legacy_connect(path)
+            await measure(legacy, 1000, 1)
+            report('legacy', *await measure(legacy, args.queries, concurrency))
+            await legacy.close()
+
+            current = await asqlite.connect(path)
+            await measure(current, 1000, 1)
+            report('current', *await measure(current, args.queries, concurrency))
+            await current.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Compares per-row account writes against the executemany bulk APIs.
+
+Usage: python -m benchmarks.bulk_accounts [--rows 10000 100000] [--per-row-limit 10000]
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+import discord
+
+from utils import DiscordClient, Account
+from utils.classes import ACCOUNT_INSERT, ACCOUNT_UPDATE
+
+
+GUILD_ID = 1
+
+
+def make_accounts(amount: int) -> list[Account]:
+    return [
+        Account(
+            id=i,
+            num_wins=0,
+            num_loses=0,
+            num_draws=0,
+            blessed_scrolls=[],
+            cursed_scrolls=[],
+            accomplished_achievements=[]
+        ) for i in range(amount)
+    ]
+
+
+async def make_client(directory: str, name: str) -> DiscordClient:
+    client = DiscordClient(
+        test_guild=None,
+        do_first_sync=False,
+        guide_channel_id=None,
+        database_filename=os.path.join(directory, name),
+        intents=discord.Intents.none(),
+        command_prefix='sdg.'
+    )
+    await client.start_database()
+    return client
+
+
+async def close_client(client: DiscordClient):
+    await client.db.close()
+
+
+def report(label: str, rows: int, elapsed: float):
+    print(f'  {label:<28} {rows:>7} rows  {elapsed:>8.3f}s  {rows / elapsed:>10.0f} rows/s')
+
+
+async def bench(directory: str, rows: int, per_row_limit: int):
+    print(f'{rows} rows')
+    accounts = make_accounts(rows)
+    per_row = accounts[:per_row_limit]
+
+    client = await make_client(directory, f'per_row_{rows}.db')
+
+    start = time.perf_counter()
+    for account in per_row:
+        await client.db.execute(ACCOUNT_INSERT, (account.id, GUILD_ID) + client._account_params(account))
+    report('insert, one per statement', len(per_row), time.perf_counter() - start)
+
+    for account in per_row:
+        account.num_wins += 1
+
+    start = time.perf_counter()
+    for account in per_row:
+        await client.db.execute(ACCOUNT_UPDATE, client._account_params(account) + (account.id, GUILD_ID))
+    report('update, one per statement', len(per_row), time.perf_counter() - start)
+
+    await close_client(client)
+
+    client = await make_client(directory, f'bulk_{rows}.db')
+
+    start = time.perf_counter()
+    await client.add_accounts_bulk(accounts, GUILD_ID)
+    report('add_accounts_bulk', rows, time.perf_counter() - start)
+
+    for account in accounts:
+        account.num_wins += 1
+
+    start = time.perf_counter()
+    await client.modify_accounts_bulk(accounts, GUILD_ID)
+    report('modify_accounts_bulk', rows, time.perf_counter() - start)
+
+    await close_client(client)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument(
+        '--per-row-limit',
+        type=int,
+        default=10_000,
+        help='Only time this many rows for the per-statement baseline'
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            await bench(directory, rows, args.per_row_limit)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Per-interaction guild lookup overhead of the GuildRegistry against the old list of GuildInfo.
+
+Every command and transformer starts with ``utils.get_guild_info``, and syncs and edits end with
+``replace_guild_info``. Lookups hit random guilds, like interactions arriving from across the bot.
+
+Usage: python -m benchmarks.guild_registry [--guilds 100 1000 5000] [--lookups 200000]
+"""
+
+import time
+import random
+import argparse
+
+from types import SimpleNamespace
+
+import utils
+from utils import GuildInfo, GuildRegistry, GuildSettings
+
+
+def legacy_get_guild_info(client, guild_id: int) -> GuildInfo | None:
+    for guild_info in client.guild_info:
+        if guild_info.guild_id == guild_id:
+            return guild_info
+
+    return None
+
+
+def legacy_replace_guild_info(client, guild_info: GuildInfo) -> None:
+    try:
+        client.guild_info.remove([gi for gi in client.guild_info if gi.guild_id == guild_info.guild_id][0])
+    except ValueError:
+        pass
+
+    client.guild_info.append(guild_info)
+
+
+def registry_replace_guild_info(client, guild_info: GuildInfo) -> None:
+    client.guild_info.add(guild_info)
+
+
+def make_guild_infos(amount: int) -> list[GuildInfo]:
+    return [GuildInfo(i, [], [], [], [], [], [], [], [], GuildSettings.default()) for i in range(amount)]
+
+
+def time_per_call(func, args_list: list) -> float:
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guilds', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--lookups', type=int, default=200000)
+    parser.add_argument('--replaces', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f'{"guilds":>6} {"":<9} {"lookup":>10} {"replace":>10}')
+
+    for guilds in args.guilds:
+        rng = random.Random(guilds)
+        guild_infos = make_guild_infos(guilds)
+        interactions = [SimpleNamespace(guild_id=rng.randrange(guilds)) for _ in range(args.lookups)]
+        replacements = [rng.choice(guild_infos) for _ in range(args.replaces)]
+
+        legacy = SimpleNamespace(guild_info=list(guild_infos))
+        registry = SimpleNamespace(guild_info=GuildRegistry(guild_infos))
+
+        for label, client, lookup, replace in (
+                ('list', legacy, lambda i: legacy_get_guild_info(legacy, i.guild_id), legacy_replace_guild_info),
+                ('registry', registry, utils.get_guild_info, registry_replace_guild_info)
+        ):
+            for interaction in interactions:
+                interaction.client = client
+
+            lookup_us = time_per_call(lookup, [(i,) for i in interactions])
+            replace_us = time_per_call(replace, [(client, gi) for gi in replacements])
+            print(f'{guilds:>6} {label:<9} {lookup_us:>8.3f}us {replace_us:>8.3f}us')
+
+
+if __name__ == '__main__':
+    main()
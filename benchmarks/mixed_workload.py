@@ -0,0 +1,87 @@
+"""Mixed read/write throughput with reads on the writer connection versus a pool of reader threads.
+
+Usage: python -m benchmarks.mixed_workload [--readers 0 4] [--duration 5]
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from utils.db_helper import DatabaseHelper
+from utils.classes import AccountsTable, ACCOUNT_INSERT, ACCOUNT_UPDATE
+
+
+async def populate(path: str, guilds: int, accounts_per_guild: int):
+    db = DatabaseHelper([AccountsTable], 0, path, readers=0, check_same_thread=False)
+    await db.startup()
+    await db.executemany(
+        ACCOUNT_INSERT,
+        ((user_id, guild_id, 0, 0, 0) for guild_id in range(guilds) for user_id in range(accounts_per_guild))
+    )
+    await db.close()
+
+
+async def run(path: str, readers: int, args) -> None:
+    db = DatabaseHelper([AccountsTable], 0, path, readers=readers, check_same_thread=False)
+    await db.startup()
+
+    deadline = time.perf_counter() + args.duration
+    read_latencies = []
+    write_latencies = []
+
+    async def reader(rng: random.Random):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await db.fetchall('SELECT * FROM accounts WHERE guild_id = ?', (rng.randrange(args.guilds),))
+            read_latencies.append(time.perf_counter() - start)
+
+    async def writer(rng: random.Random):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await db.execute(
+                ACCOUNT_UPDATE,
+                (rng.randrange(100), 0, 0, rng.randrange(args.accounts), rng.randrange(args.guilds))
+            )
+            write_latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(
+        *(reader(random.Random(i)) for i in range(args.read_tasks)),
+        *(writer(random.Random(-i)) for i in range(args.write_tasks))
+    )
+    await db.close()
+
+    for label, latencies in (('reads', read_latencies), ('writes', write_latencies)):
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(
+            f'  {label:<7} {len(latencies) / args.duration:>8.0f}/s  '
+            f'p50 {statistics.median(latencies) * 1000:>7.2f}ms  p99 {p99:>7.2f}ms'
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, nargs='+', default=[0, 4])
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--guilds', type=int, default=100)
+    parser.add_argument('--accounts', type=int, default=2000, help='Accounts per guild')
+    parser.add_argument('--read-tasks', type=int, default=8)
+    parser.add_argument('--write-tasks', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'mixed.db')
+        await populate(path, args.guilds, args.accounts)
+
+        for readers in args.readers:
+            label = f'{readers} reader threads' if readers else 'reads on the writer connection'
+            print(f'{label} ({args.read_tasks} readers, {args.write_tasks} writers, {args.duration}s)')
+            await run(path, readers, args)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Flex faction name resolution with the GuildInfo name maps against the old scans.
+
+Resolves the ``(faction)`` of every line of a rolelist, as ``get_rolelist`` and
+``message_text_to_roles`` do, in a guild with many roles. Half of the names are roles, so the old
+resolver scanned the factions, subalignments and then the roles for them.
+
+Usage: python -m benchmarks.name_resolution [--roles 500 5000 50000] [--lines 30] [--repeat 200]
+"""
+
+import time
+import random
+import argparse
+
+from utils import Faction, GuildInfo, GuildSettings, Role, Subalignment
+from utils.filter import get_flex_faction
+
+
+def legacy_get_flex_faction(text: str, guild_info: GuildInfo):
+    fac_matches = [f for f in guild_info.factions if f.name.lower() == text.lower()]
+    faction = None
+
+    if fac_matches:
+        faction = fac_matches[0]
+
+    if not faction:
+        sub_matches = [s for s in guild_info.subalignments if s.name.lower() == text.lower()]
+        if sub_matches:
+            faction = sub_matches[0]
+
+    if not faction:
+        role_matches = [r for r in guild_info.roles if r.name.lower() == text.lower()]
+        if role_matches:
+            faction = role_matches[0]
+
+    if not faction:
+        faction = text
+
+    return faction
+
+
+def make_guild_info(num_roles: int) -> GuildInfo:
+    factions = [Faction(f'Faction {i}', i) for i in range(8)]
+    subalignments = [Subalignment(f'Subalignment {i}', 100 + i) for i in range(40)]
+    roles = [
+        Role(f'Role {i}', 1000 + i, factions[i % len(factions)], subalignments[i % len(subalignments)], {'unique'})
+        for i in range(num_roles)
+    ]
+    return GuildInfo(0, factions, subalignments, roles, [], [], [], [], [], GuildSettings.default())
+
+
+def make_lines(rng: random.Random, guild_info: GuildInfo, lines: int) -> list[str]:
+    names = []
+    for _ in range(lines):
+        pool = rng.choice([guild_info.factions, guild_info.subalignments, guild_info.roles, guild_info.roles])
+        names.append(rng.choice(pool).name.upper())
+    return names
+
+
+def time_rolelist(resolve, guild_info: GuildInfo, names: list[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            resolve(name, guild_info)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--roles', type=int, nargs='+', default=[500, 5000, 50000])
+    parser.add_argument('--lines', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f'{"roles":>6} {"scan":>12} {"name map":>12}  (per {args.lines}-line rolelist)')
+
+    for num_roles in args.roles:
+        rng = random.Random(num_roles)
+        guild_info = make_guild_info(num_roles)
+        names = make_lines(rng, guild_info, args.lines)
+
+        assert [legacy_get_flex_faction(n, guild_info) for n in names] == [
+            get_flex_faction(n, guild_info) for n in names
+        ]
+
+        repeat = max(args.repeat * 500 // num_roles, 1)
+        scan_us = time_rolelist(legacy_get_flex_faction, guild_info, names, repeat)
+        indexed_us = time_rolelist(get_flex_faction, guild_info, names, args.repeat)
+        print(f'{num_roles:>6} {scan_us:>10.1f}us {indexed_us:>10.1f}us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Write-heavy throughput of each database PRAGMA profile.
+
+Single-row commits stand in for scroll and achievement writes, batches of account updates
+stand in for the write-behind queue flushing, and a few readers run alongside them.
+
+Usage: python -m benchmarks.pragma_profiles [--profiles safe balanced throughput] [--duration 5]
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from utils.db_helper import DatabaseHelper, PRAGMA_PROFILES
+from utils.classes import AccountsTable, ACCOUNT_INSERT, ACCOUNT_UPDATE
+
+
+async def populate(path: str, guilds: int, accounts_per_guild: int):
+    db = DatabaseHelper([AccountsTable], 0, path, readers=0, slow_query_threshold=None, check_same_thread=False)
+    await db.startup()
+    await db.executemany(
+        ACCOUNT_INSERT,
+        ((user_id, guild_id, 0, 0, 0) for guild_id in range(guilds) for user_id in range(accounts_per_guild))
+    )
+    await db.close()
+
+
+def summarize(label: str, latencies: list[float], duration: float, per_op: int = 1, unit: str = 'rows') -> str:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0
+    p50 = statistics.median(latencies) * 1000 if latencies else 0.0
+    rate = len(latencies) * per_op / duration
+    return f'  {label:<8} {rate:>9.0f} {unit + "/s":<10} p50 {p50:>7.2f}ms  p99 {p99:>7.2f}ms'
+
+
+async def run(path: str, profile: str, args) -> None:
+    db = DatabaseHelper(
+        [AccountsTable],
+        0,
+        path,
+        readers=2,
+        profile=profile,
+        slow_query_threshold=None,
+        check_same_thread=False
+    )
+    await db.startup()
+
+    deadline = time.perf_counter() + args.duration
+    single_latencies = []
+    batch_latencies = []
+    read_latencies = []
+
+    def random_update(rng: random.Random) -> tuple:
+        return rng.randrange(100), 0, 0, rng.randrange(args.accounts), rng.randrange(args.guilds)
+
+    async def single_writer(rng: random.Random):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await db.execute(ACCOUNT_UPDATE, random_update(rng))
+            single_latencies.append(time.perf_counter() - start)
+
+    async def batch_writer(rng: random.Random):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await db.executemany(ACCOUNT_UPDATE, [random_update(rng) for _ in range(args.batch_size)])
+            batch_latencies.append(time.perf_counter() - start)
+
+    async def reader(rng: random.Random):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await db.fetchall('SELECT * FROM accounts WHERE guild_id = ?', (rng.randrange(args.guilds),))
+            read_latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(
+        *(single_writer(random.Random(i)) for i in range(args.write_tasks)),
+        batch_writer(random.Random(-1)),
+        *(reader(random.Random(-i - 2)) for i in range(args.read_tasks))
+    )
+
+    wal_size = db.wal_size()
+    maintenance = await db.maintain()
+    await db.close()
+
+    print(summarize('single', single_latencies, args.duration))
+    print(summarize('batched', batch_latencies, args.duration, args.batch_size))
+    print(summarize('reads', read_latencies, args.duration, unit='queries'))
+    print(
+        f'  WAL grew to {wal_size / 1024 / 1024:.1f}MiB, '
+        f'checkpoint copied {maintenance.checkpointed_pages}/{maintenance.wal_pages} pages '
+        f'in {maintenance.duration * 1000:.1f}ms'
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=list(PRAGMA_PROFILES), choices=list(PRAGMA_PROFILES))
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--guilds', type=int, default=100)
+    parser.add_argument('--accounts', type=int, default=2000, help='Accounts per guild')
+    parser.add_argument('--write-tasks', type=int, default=4)
+    parser.add_argument('--read-tasks', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        # Each profile gets a fresh copy so WAL growth isn't carried over
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profiles.db')
+            await populate(path, args.guilds, args.accounts)
+
+            print(f'{profile}: {", ".join(PRAGMA_PROFILES[profile].statements())}')
+            await run(path, profile, args)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
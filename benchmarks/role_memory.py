@@ -0,0 +1,130 @@
+"""Memory and filter time of the interned RoleStore representation against per-role tag sets.
+
+Builds a synthetic guild's roles twice: the old way, where every role owns a set of its own tag
+strings as they come out of the database rows, and with the guild's RoleStore interning them. Then
+builds the partial roles a rolelist generation filters, and runs a tag filter over them. Memory is
+measured with tracemalloc, the partial roles are built once per generation.
+
+Usage: python -m benchmarks.role_memory [--roles 50000] [--tags 40] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+from dataclasses import dataclass
+
+from utils import Faction, Role, RoleStore, Subalignment
+from utils.filter import TagFilter
+
+
+@dataclass(frozen=True)
+class LegacyPartialRole:
+    id: int
+    name: str
+    faction_name: str
+    tags: frozenset[str]
+
+    @classmethod
+    def from_role(cls, role: Role) -> LegacyPartialRole:
+        tags = role.forum_tags | {role.subalignment.name}
+        return cls(id=role.id, name=role.name, faction_name=role.faction.name, tags=frozenset(tags))
+
+
+def legacy_tag_filter(filter_str: str, in_roles: set[LegacyPartialRole]) -> set[LegacyPartialRole]:
+    valid_roles = set()
+    filter_tag = filter_str.lower().strip()
+    for role in in_roles:
+        add_role = False
+        for tag in role.tags:
+            if tag.lower().strip() == filter_tag:
+                add_role = True
+                continue
+
+        if add_role:
+            valid_roles.add(role)
+
+    return valid_roles
+
+
+def make_rows(rng: random.Random, num_roles: int, num_tags: int) -> list[tuple[int, str, str]]:
+    """Catalog rows of ``(id, name, tags json)``, decoding them gives every role its own strings"""
+    tags = [f'Tag {i}' for i in range(num_tags)]
+    return [
+        (1000 + i, f'Role {i}', json.dumps(sorted(rng.sample(tags, rng.randint(0, 4)))))
+        for i in range(num_roles)
+    ]
+
+
+def build_roles(rows, factions, subalignments, store: RoleStore | None) -> list[Role]:
+    roles = []
+    for role_id, name, tags_json in rows:
+        tags = json.loads(tags_json)
+        forum_tags = {t.lower() for t in tags} if store is None else store.intern_tags(tags)
+        faction = factions[role_id % len(factions)]
+        subalignment = subalignments[role_id % len(subalignments)]
+        roles.append(Role(name, role_id, faction, subalignment, forum_tags))
+
+    return roles
+
+
+def measure(build) -> tuple[object, int, int]:
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def timed(func, repeat: int) -> tuple[object, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--roles', type=int, default=50000)
+    parser.add_argument('--tags', type=int, default=40, help='Distinct forum tags in the guild')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.roles)
+    factions = [Faction(f'Faction {i}', i) for i in range(8)]
+    subalignments = [Subalignment(f'Subalignment {i}', 100 + i) for i in range(40)]
+    rows = make_rows(rng, args.roles, args.tags)
+
+    legacy_roles, legacy_roles_mem, _ = measure(lambda: build_roles(rows, factions, subalignments, None))
+    store = RoleStore()
+    roles, roles_mem, _ = measure(lambda: build_roles(rows, factions, subalignments, store))
+
+    legacy_partials, legacy_partials_mem, legacy_peak = measure(
+        lambda: {LegacyPartialRole.from_role(r) for r in legacy_roles}
+    )
+    partials, partials_mem, peak = measure(lambda: store.partial_roles(roles))
+
+    _, legacy_build_ms = timed(lambda: {LegacyPartialRole.from_role(r) for r in legacy_roles}, args.repeat)
+    _, build_ms = timed(lambda: store.partial_roles(roles), args.repeat)
+
+    tag = 'tag 7'
+    legacy_matches, legacy_filter_ms = timed(lambda: legacy_tag_filter(tag, legacy_partials), args.repeat)
+    matches, filter_ms = timed(lambda: TagFilter(False, tag).filter_roles(partials), args.repeat)
+    assert {r.id for r in legacy_matches} == {r.id for r in matches}
+
+    mib = 1024 * 1024
+    print(f'{args.roles} roles, {store.tag_count} interned tags')
+    print(f'{"":>24} {"per-role sets":>14} {"role store":>12}')
+    print(f'{"roles (MiB)":>24} {legacy_roles_mem / mib:>14.1f} {roles_mem / mib:>12.1f}')
+    print(f'{"partial roles (MiB)":>24} {legacy_partials_mem / mib:>14.1f} {partials_mem / mib:>12.1f}')
+    print(f'{"partial roles peak (MiB)":>24} {legacy_peak / mib:>14.1f} {peak / mib:>12.1f}')
+    print(f'{"build partials (ms)":>24} {legacy_build_ms:>14.1f} {build_ms:>12.1f}')
+    print(f'{"tag filter (ms)":>24} {legacy_filter_ms:>14.1f} {filter_ms:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Write throughput as more guilds are active at once, with one database file versus a shard per guild.
+
+Every active guild runs its own writer committing single account updates, the way commands and
+the write-behind queue do. A single file funnels them all through one writer connection, shards
+give each guild a writer and a worker thread of its own.
+
+Usage: python -m benchmarks.shard_scaling [--guilds 1 2 4 8 16] [--duration 3] [--profile safe]
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from utils.db_helper import DatabaseHelper, ShardRouter, PRAGMA_PROFILES
+from utils.classes import AccountsTable, ACCOUNT_INSERT, ACCOUNT_UPDATE
+
+
+async def open_single(directory: str, guilds: int, args) -> DatabaseHelper:
+    db = DatabaseHelper(
+        [AccountsTable],
+        0,
+        os.path.join(directory, 'single.db'),
+        readers=0,
+        profile=args.profile,
+        slow_query_threshold=None,
+        check_same_thread=False
+    )
+    await db.startup()
+    await db.executemany(
+        ACCOUNT_INSERT,
+        ((user_id, guild_id, 0, 0, 0) for guild_id in range(guilds) for user_id in range(args.accounts))
+    )
+    return db
+
+
+async def open_sharded(directory: str, guilds: int, args) -> DatabaseHelper:
+    shards = ShardRouter(
+        [AccountsTable],
+        0,
+        os.path.join(directory, 'shards'),
+        max_open=guilds,
+        readers=0,
+        profile=args.profile,
+        slow_query_threshold=None,
+        check_same_thread=False
+    )
+    db = DatabaseHelper(
+        [AccountsTable],
+        0,
+        os.path.join(directory, 'main.db'),
+        readers=0,
+        profile=args.profile,
+        slow_query_threshold=None,
+        shards=shards,
+        check_same_thread=False
+    )
+    await db.startup()
+
+    for guild_id in range(guilds):
+        await db.executemany(
+            ACCOUNT_INSERT,
+            ((user_id, guild_id, 0, 0, 0) for user_id in range(args.accounts)),
+            guild_id=guild_id
+        )
+
+    return db
+
+
+async def run(db: DatabaseHelper, guilds: int, sharded: bool, args) -> float:
+    deadline = time.perf_counter() + args.duration
+    commits = 0
+
+    async def guild_writer(guild_id: int):
+        nonlocal commits
+        rng = random.Random(guild_id)
+
+        while time.perf_counter() < deadline:
+            await db.execute(
+                ACCOUNT_UPDATE,
+                (rng.randrange(100), 0, 0, rng.randrange(args.accounts), guild_id),
+                guild_id=guild_id if sharded else None
+            )
+            commits += 1
+
+    await asyncio.gather(*(guild_writer(guild_id) for guild_id in range(guilds) for _ in range(args.tasks)))
+    return commits / args.duration
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--guilds', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--duration', type=float, default=3)
+    parser.add_argument('--accounts', type=int, default=1000, help='Accounts per guild')
+    parser.add_argument('--tasks', type=int, default=2, help='Concurrent writers per guild')
+    parser.add_argument('--profile', default='safe', choices=list(PRAGMA_PROFILES))
+    args = parser.parse_args()
+
+    print(f'{"guilds":>6} {"single":>12} {"sharded":>12} {"speedup":>8}')
+
+    for guilds in args.guilds:
+        rates = []
+
+        for opener, sharded in ((open_single, False), (open_sharded, True)):
+            with tempfile.TemporaryDirectory() as directory:
+                db = await opener(directory, guilds, args)
+                rates.append(await run(db, guilds, sharded, args))
+                await db.close()
+
+        single, sharded = rates
+        print(f'{guilds:>6} {single:>9.0f}/s {sharded:>9.0f}/s {sharded / single:>7.2f}x')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,6 +1,7 @@
 import io
 import csv
 import typing
+import datetime
 import dataclasses
 
 import discord
@@ -11,6 +12,12 @@ from discord.ext import commands
 import utils
 from utils import SDGException, DiscordClient, Account, Role, Subalignment, Faction, RSFTransformer, ScrollTransformer
 
+LEDGER_RESULTS = {
+    'WIN': 'win',
+    'LOSS': 'loss',
+    'DRAW': 'draw'
+}
+
 
 class DeleteConfirm(utils.CustomView):
     def __init__(self, owner: discord.User, account_to_delete: discord.User):
@@ -99,10 +106,10 @@ class AccountCog(commands.GroupCog, group_name='account'):
             accomplished_achievements=[]
         )
 
-        guild_info.accounts.append(account)
-
         await self.client.add_account_to_db(account, interaction.guild_id)
-        self.client.replace_guild_info(guild_info)
+
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.accounts.append(account)
 
         embed = utils.create_embed(
             interaction.user,
@@ -120,10 +127,10 @@ class AccountCog(commands.GroupCog, group_name='account'):
 
         await interaction.response.defer()
 
+        existing_ids = {a.id for a in guild_info.accounts}
         new_accounts = []
         for member in interaction.guild.members:
-            existing_account = guild_info.get_account(member.id)
-            if member.bot or existing_account:
+            if member.bot or member.id in existing_ids:
                 continue
 
             new_account = Account(
@@ -136,14 +143,15 @@ class AccountCog(commands.GroupCog, group_name='account'):
                 accomplished_achievements=[]
             )
 
-            await self.client.add_account_to_db(new_account, interaction.guild_id)
             new_accounts.append(new_account)
 
         if not new_accounts:
             raise SDGException('All members already have accounts!')
 
-        guild_info.accounts += new_accounts
-        self.client.replace_guild_info(guild_info)
+        await self.client.add_accounts_bulk(new_accounts, interaction.guild_id)
+
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.accounts += new_accounts
 
         embed = utils.create_embed(
             interaction.user,
@@ -242,9 +250,10 @@ class AccountCog(commands.GroupCog, group_name='account'):
             )
             await interaction.edit_original_response(embed=timed_out_embed, view=None)
         elif view.value:
-            guild_info.accounts.remove(account)
+            with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+                guild_info.accounts.remove(account)
+
             await self.client.delete_account_from_db(account, interaction.guild_id)
-            self.client.replace_guild_info(guild_info)
         else:
             pass
 
@@ -324,7 +333,13 @@ class AccountCog(commands.GroupCog, group_name='account'):
     ):
         """Import a csv file of accounts"""
         guild_info = utils.get_guild_info(interaction)
-        all_rsf = guild_info.roles + guild_info.subalignments + guild_info.factions
+
+        def get_scroll(scroll_id: int) -> Role | Subalignment | Faction | None:
+            return (
+                guild_info.get_role(scroll_id) or
+                guild_info.get_subalignment(scroll_id) or
+                guild_info.get_faction(scroll_id)
+            )
 
         await interaction.response.defer()
 
@@ -333,6 +348,7 @@ class AccountCog(commands.GroupCog, group_name='account'):
         csv_buffer = io.StringIO(csv_data)
 
         new_accounts = []
+        adjustments = []
         csvreader = csv.DictReader(csv_buffer, delimiter=',')
         for row in csvreader:
             row: dict[str, str]
@@ -360,24 +376,21 @@ class AccountCog(commands.GroupCog, group_name='account'):
 
             for scroll_id in blessed_scrolls_list:
                 if scroll_id:
-                    scroll_id = int(scroll_id)
-                    rsf = [r for r in all_rsf if scroll_id == r.id]
+                    rsf = get_scroll(int(scroll_id))
                     if rsf:
-                        blessed_scrolls.append(rsf[0])
+                        blessed_scrolls.append(rsf)
 
             for scroll_id in cursed_scrolls_list:
                 if scroll_id:
-                    scroll_id = int(scroll_id)
-                    rsf = [r for r in all_rsf if scroll_id == r.id]
+                    rsf = get_scroll(int(scroll_id))
                     if rsf:
-                        cursed_scrolls.append(rsf[0])
+                        cursed_scrolls.append(rsf)
 
             for ach_id in achievements_list:
                 if ach_id:
-                    ach_id = int(ach_id)
-                    ach = [a for a in guild_info.achievements if a.id == ach_id]
+                    ach = guild_info.get_achievement(int(ach_id))
                     if ach:
-                        achievements.append(ach[0])
+                        achievements.append(ach)
 
             if mode == 'SET':
                 new_wins = num_wins
@@ -414,22 +427,32 @@ class AccountCog(commands.GroupCog, group_name='account'):
 
             if new_account != existing_account:
                 new_accounts.append(new_account)
+                adjustments += [
+                    (new_account, 'win', new_wins - existing_account.num_wins),
+                    (new_account, 'loss', new_losses - existing_account.num_loses),
+                    (new_account, 'draw', new_draws - existing_account.num_draws)
+                ]
 
         if not new_accounts:
             raise SDGException('All account data remained the same!')
 
         unmodified_accounts = []
-        modified_account_ids = [a.id for a in new_accounts]
-        for account in guild_info.accounts:
-            if account.id not in modified_account_ids:
-                unmodified_accounts.append(account)
+        modified_account_ids = {a.id for a in new_accounts}
 
-        guild_info.accounts = unmodified_accounts + new_accounts
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            for account in guild_info.accounts:
+                if account.id not in modified_account_ids:
+                    unmodified_accounts.append(account)
 
-        self.client.replace_guild_info(guild_info)
+            guild_info.accounts = unmodified_accounts + new_accounts
 
-        for account in new_accounts:
-            await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.record_game(
+            adjustments,
+            interaction.guild_id,
+            kind='adjustment',
+            recorded_by=interaction.user.id
+        )
+        await self.client.modify_accounts_bulk(new_accounts, interaction.guild_id, items=True)
 
         embed = utils.create_embed(
             interaction.user,
@@ -519,7 +542,12 @@ class AccountCog(commands.GroupCog, group_name='account'):
             account.cursed_scrolls.append(role_subalignment_faction)
 
         self.client.replace_guild_info(guild_info)
-        await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.add_scroll_to_db(
+            account,
+            role_subalignment_faction,
+            scroll_type.lower(),
+            interaction.guild_id
+        )
 
         embed = utils.create_embed(
             interaction.user,
@@ -550,7 +578,7 @@ class AccountCog(commands.GroupCog, group_name='account'):
             scroll_type = 'Cursed'
 
         self.client.replace_guild_info(guild_info)
-        await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.delete_scroll_from_db(account, scroll, interaction.guild_id)
 
         embed = utils.create_embed(
             interaction.user,
@@ -588,6 +616,8 @@ class AccountCog(commands.GroupCog, group_name='account'):
         if not accounts:
             raise SDGException('No members provided have accounts!')
 
+        ledger_result = LEDGER_RESULTS[result]
+
         for account in accounts:
             if result == 'WIN':
                 account.num_wins += 1
@@ -596,7 +626,11 @@ class AccountCog(commands.GroupCog, group_name='account'):
             else:
                 account.num_draws += 1
 
-            await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.record_game(
+            [(a, ledger_result, 1) for a in accounts],
+            interaction.guild_id,
+            recorded_by=interaction.user.id
+        )
 
         self.client.replace_guild_info(guild_info)
 
@@ -638,15 +672,26 @@ class AccountCog(commands.GroupCog, group_name='account'):
         if not accounts:
             raise SDGException('No members provided have accounts!')
 
+        ledger_result = LEDGER_RESULTS[result]
+        adjustments = []
+
         for account in accounts:
             if result == 'WIN':
+                adjustments.append((account, ledger_result, amount - account.num_wins))
                 account.num_wins = amount
             elif result == 'LOSS':
+                adjustments.append((account, ledger_result, amount - account.num_loses))
                 account.num_loses = amount
             else:
+                adjustments.append((account, ledger_result, amount - account.num_draws))
                 account.num_draws = amount
 
-            await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.record_game(
+            adjustments,
+            interaction.guild_id,
+            kind='adjustment',
+            recorded_by=interaction.user.id
+        )
 
         self.client.replace_guild_info(guild_info)
 
@@ -658,6 +703,39 @@ class AccountCog(commands.GroupCog, group_name='account'):
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @game_group.command(name='stats')
+    @app_commands.describe(member='The member to view the recent games of')
+    @app_commands.describe(days='How many days back to count games from. Defaults to 30')
+    @app_commands.describe(ephemeral='Whether to only show the response to you. Defaults to False')
+    async def game_stats(
+            self,
+            interaction: Interaction,
+            member: discord.User | None = None,
+            days: app_commands.Range[int, 1, 3650] = 30,
+            ephemeral: bool = False
+    ):
+        """View the games a player played recently"""
+        member = member or interaction.user
+        guild_info = utils.get_guild_info(interaction)
+
+        if not guild_info.get_account(member.id):
+            raise SDGException(f'Member {member.mention} does not have an account.')
+
+        since = discord.utils.utcnow() - datetime.timedelta(days=days)
+        stats = await self.client.game_stats(interaction.guild_id, member.id, since=int(since.timestamp()))
+
+        embed = utils.create_embed(
+            interaction.user,
+            title=f'Games of {member} in the last {days} days',
+            description=f'**Games played:** {sum(stats.values())}\n\n'
+                        f'**Wins:** {stats["win"]}\n'
+                        f'**Losses:** {stats["loss"]}\n'
+                        f'**Draws:** {stats["draw"]}\n\n'
+                        f'Counted since {utils.user_friendly_dt(since)}'
+        )
+
+        await interaction.response.send_message(embed=embed, ephemeral=ephemeral)
+
 
 async def setup(bot):
     await bot.add_cog(AccountCog(bot))
@@ -77,8 +77,9 @@ class AchievementCog(commands.GroupCog, group_name='achievement'):
             faction=faction
         )
 
-        guild_info.achievements.append(achievement)
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.achievements.append(achievement)
+
         await self.client.add_achievement_to_db(achievement, interaction.guild_id)
 
         embed = utils.create_embed(
@@ -104,17 +105,17 @@ class AchievementCog(commands.GroupCog, group_name='achievement'):
         for account in guild_info.accounts:
             if achievement in account.accomplished_achievements:
                 account.accomplished_achievements.remove(achievement)
-                await self.client.modify_account_in_db(account, interaction.guild_id)
 
-        guild_info.achievements.remove(achievement)
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.achievements.remove(achievement)
 
-        await self.client.delete_achievement_from_db(achievement, interaction.guild_id)
+        awards = await self.client.delete_achievement_from_db(achievement, interaction.guild_id)
 
         embed = utils.create_embed(
             interaction.user,
             title='Achievement deleted',
-            description=f'The achievement "{achievement.name}" has been deleted.'
+            description=f'The achievement "{achievement.name}" has been deleted '
+                        f'and removed from {awards.rowcount} accounts.'
         )
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -130,8 +131,7 @@ class AchievementCog(commands.GroupCog, group_name='achievement'):
     ):
         """View information on an achievement!"""
 
-        guild_info = utils.get_guild_info(interaction)
-        amount_achieved = sum(1 for a in guild_info.accounts if achievement in a.accomplished_achievements)
+        amount_achieved = await self.client.count_achievement_holders(achievement, interaction.guild_id)
 
         embed = utils.create_embed(
             interaction.user,
@@ -228,7 +228,7 @@ class AchievementCog(commands.GroupCog, group_name='achievement'):
 
         account.accomplished_achievements.append(achievement)
         self.client.replace_guild_info(guild_info)
-        await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.award_achievement_bulk(achievement, [account], interaction.guild_id)
 
         embed = utils.create_embed(
             interaction.user,
@@ -261,7 +261,7 @@ class AchievementCog(commands.GroupCog, group_name='achievement'):
 
         account.accomplished_achievements.remove(achievement)
         self.client.replace_guild_info(guild_info)
-        await self.client.modify_account_in_db(account, interaction.guild_id)
+        await self.client.unaward_achievement_in_db(achievement, account, interaction.guild_id)
 
         embed = utils.create_embed(
             interaction.user,
@@ -326,9 +326,9 @@ class AchievementCog(commands.GroupCog, group_name='achievement'):
             faction=faction
         )
 
-        guild_info.achievements.remove(achievement)
-        guild_info.achievements.append(new_achievement)
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.achievements.remove(achievement)
+            guild_info.achievements.append(new_achievement)
         await self.client.modify_achievement_in_db(new_achievement, interaction.guild_id)
 
         embed = utils.create_embed(
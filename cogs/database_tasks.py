@@ -0,0 +1,76 @@
+import asyncio
+
+from discord.ext import commands, tasks
+from loguru import logger
+
+import utils
+
+
+class DatabaseTasks(commands.Cog):
+    def __init__(self, client):
+        self.client: utils.DiscordClient = client
+
+    def cog_load(self) -> None:
+        if self.client.maintenance_interval > 0:
+            self.maintain_database.change_interval(minutes=self.client.maintenance_interval)
+            self.maintain_database.start()
+        else:
+            logger.info('Database maintenance is disabled (MAINTENANCE_INTERVAL_MINUTES)')
+
+        if self.client.backup_interval > 0:
+            self.backup_database.change_interval(hours=self.client.backup_interval)
+            self.backup_database.start()
+        else:
+            logger.info('Scheduled database backups are disabled (BACKUP_INTERVAL_HOURS)')
+
+    def cog_unload(self) -> None:
+        self.maintain_database.cancel()
+        self.backup_database.cancel()
+
+    @tasks.loop(minutes=10)
+    async def maintain_database(self):
+        try:
+            result = await self.client.db.maintain()
+        except Exception:
+            logger.exception('Database maintenance failed')
+            return
+
+        logger.debug(
+            'Database maintenance took {:.3f}s: checkpointed {}/{} WAL pages{}, WAL is {} bytes',
+            result.duration,
+            result.checkpointed_pages,
+            result.wal_pages,
+            ' (busy)' if result.checkpoint_busy else '',
+            result.wal_size
+        )
+
+        shards = self.client.shards
+        if shards is None:
+            return
+
+        try:
+            # Shards untouched since the last pass are closed, the rest are checkpointed
+            await shards.close_idle(self.client.maintenance_interval * 60)
+            checkpointed, wal_size = await shards.maintain()
+        except Exception:
+            logger.exception('Shard maintenance failed')
+            return
+
+        logger.debug('Checkpointed {} open shards, their WALs total {} bytes', checkpointed, wal_size)
+
+    @tasks.loop(hours=24)
+    async def backup_database(self):
+        try:
+            await self.client.backup_database()
+        except Exception:
+            logger.exception('Scheduled database backup failed')
+
+    @maintain_database.before_loop
+    @backup_database.before_loop
+    async def wait_for_database(self):
+        while not self.client.db_loaded:
+            await asyncio.sleep(1)
+
+
+async def setup(bot):
+    await bot.add_cog(DatabaseTasks(bot))
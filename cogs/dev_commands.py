@@ -228,6 +228,51 @@ class Dev(commands.Cog, command_attrs={'hidden': True}):
         await self.bot.load_guides()
         await ctx.send(f'Loaded {len(self.bot.guides)} guide items!')
 
+    @commands.command(aliases=['dbstats'])
+    async def poolstats(self, ctx: commands.Context):
+        embed = utils.create_embed(
+            ctx.author,
+            title='Database pool stats',
+            color=discord.Color.green()
+        )
+
+        for name, stats in self.bot.db.pool_stats().items():
+            embed.add_field(
+                name=name.title(),
+                value=f'**Connections:** {stats.in_use}/{stats.size} in use\n'
+                      f'**Acquisitions:** {stats.acquisitions}\n'
+                      f'**Average wait:** {stats.average_wait * 1000:.3f}ms\n'
+                      f'**Max wait:** {stats.max_wait * 1000:.3f}ms\n'
+                      f'**Utilisation:** {stats.utilisation:.2%}',
+                inline=False
+            )
+
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    @commands.guild_only()
+    async def rebuildgames(self, ctx: commands.Context):
+        # Prefix commands don't go through the command tree, so the guild may still be hibernated
+        guild_info = await self.bot.wake_guild(ctx.guild.id)
+        corrected = await self.bot.rebuild_account_counters(guild_info)
+        await ctx.send(f'Rebuilt game counters from the ledger, corrected {corrected} accounts!')
+
+    @commands.command()
+    async def backup(self, ctx: commands.Context):
+        async with ctx.typing():
+            result = await self.bot.backup_database()
+
+        embed = utils.create_embed(
+            ctx.author,
+            title='Database backed up!',
+            description=f'**File:** ``{result.path}``\n'
+                        f'**Pages copied:** {result.pages} in {result.steps} steps\n'
+                        f'**Duration:** {result.duration:.3f}s',
+            color=discord.Color.green()
+        )
+
+        await ctx.send(embed=embed)
+
 
 async def setup(bot):
     await bot.add_cog(Dev(bot))
@@ -17,8 +17,16 @@ class EventsCog(commands.Cog):
     def cog_load(self) -> None:
         self.update_custom_activity.start()
 
+        if self.client.hibernate_after > 0:
+            # Checked four times per threshold, so guilds hibernate at most a quarter of it late
+            self.hibernate_idle_guilds.change_interval(minutes=min(self.client.hibernate_after * 15, 30))
+            self.hibernate_idle_guilds.start()
+        else:
+            logger.info('Guild hibernation is disabled (HIBERNATE_AFTER_HOURS)')
+
     def cog_unload(self) -> None:
         self.update_custom_activity.cancel()
+        self.hibernate_idle_guilds.cancel()
 
     @tasks.loop(minutes=30)
     async def update_custom_activity(self):
@@ -27,7 +35,22 @@ class EventsCog(commands.Cog):
         activity = discord.CustomActivity(f'Handling {len_roles} roles in {len_guilds} servers')
         await self.client.change_presence(activity=activity)
 
+    @tasks.loop(minutes=30)
+    async def hibernate_idle_guilds(self):
+        hibernated = self.client.hibernate_idle_guilds()
+        for guild_id in hibernated:
+            utils.clear_cached_choices(guild_id)
+
+        if hibernated:
+            logger.info(
+                'Hibernated {} idle guilds, {} of {} are hibernated',
+                len(hibernated),
+                len(self.client.hibernated_guild_ids),
+                len(self.client.guild_info)
+            )
+
     @update_custom_activity.before_loop
+    @hibernate_idle_guilds.before_loop
     async def update_custom_activity_before(self):
         await self.client.wait_until_ready()
         while not self.client.first_sync:
@@ -49,13 +72,21 @@ class EventsCog(commands.Cog):
                 await asyncio.sleep(1)
 
             await asyncio.sleep(1)
-            await self.sync_all()
+
+            # With a cataloged set of roles, accounts can be loaded straight away and forums reconciled after
+            warm_start = bool(self.client.catalog)
+            if not warm_start:
+                await self.sync_all()
+
             await self.client.post_guild_info_load()
             await self.client.load_guides()
             self.client.first_sync = True
 
             await self.update_custom_activity()
 
+            if warm_start:
+                await self.sync_all()
+
     @commands.Cog.listener()
     async def on_thread_create(self, thread: discord.Thread):
         guild_info: GuildInfo = self.client.get_guild_info(thread.guild.id)
@@ -80,33 +111,16 @@ class EventsCog(commands.Cog):
         if guild_info:
             return
 
-        default_settings = utils.GuildSettings(
-            max_scrolls=5,
-            roles_are_scrollable=True,
-            subalignments_are_scrollable=True,
-            factions_are_scrollable=True,
-            role_scroll_multiplier=10,
-            subalignment_scroll_multiplier=10,
-            faction_scroll_multiplier=10,
-            accounts_creatable=True
-        )
-
-        self.client.guild_info.append(
-            GuildInfo(
-                guild.id,
-                [],
-                [],
-                [],
-                [],
-                [],
-                [],
-                [],
-                [],
-                default_settings
-            )
-        )
+        # Guilds that added the bot back get the data they had before it left
+        await self.client.load_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        if self.client.evict_guild(guild.id) is None:
+            return
 
-        await self.client.add_settings_to_db(default_settings, guild.id)
+        utils.clear_cached_choices(guild.id)
+        logger.info('Evicted {} ({}) after leaving it', guild.name, guild.id)
 
     @commands.Cog.listener()
     async def on_raw_thread_update(self, payload: discord.RawThreadUpdateEvent):
@@ -122,19 +136,19 @@ class EventsCog(commands.Cog):
             guild._add_thread(thread)
 
         faction = guild_info.get_faction(payload.parent_id)
+        info_category = guild_info.get_info_category(payload.parent_id)
 
-        if faction:
-            roles = [r for r in self.client.get_faction_roles(faction) if r.id != payload.thread_id]
-            guild_info.roles = roles
+        if faction or info_category:
+            with self.client.edit_guild_info(payload.guild_id) as guild_info:
+                role = guild_info.get_role(payload.thread_id)
 
-        info_category = guild_info.get_info_category(payload.parent_id)
+                if faction and role:
+                    guild_info.roles.remove(role)
 
-        if info_category:
-            infotags = [t for t in guild_info.info_tags if t.id != payload.thread_id]
-            guild_info.info_tags = infotags
+                if info_category:
+                    infotags = [t for t in guild_info.info_tags if t.id != payload.thread_id]
+                    guild_info.info_tags = infotags
 
-        if faction or info_category:
-            self.client.replace_guild_info(guild_info)
             await self.client.sync_guild(guild)
 
     @commands.Cog.listener()
@@ -144,17 +158,19 @@ class EventsCog(commands.Cog):
             return
 
         faction = guild_info.get_faction(payload.parent_id)
+        info_category = guild_info.get_info_category(payload.parent_id)
 
-        if faction:
-            guild_info.roles = [r for r in guild_info.roles if r.id != payload.thread_id]
+        if info_category or faction:
+            with self.client.edit_guild_info(payload.guild_id) as guild_info:
+                role = guild_info.get_role(payload.thread_id)
 
-        info_category = guild_info.get_info_category(payload.parent_id)
+                if faction and role:
+                    guild_info.roles.remove(role)
 
-        if info_category:
-            guild_info.info_tags = [t for t in guild_info.info_tags if t.id != payload.thread_id]
+                if info_category:
+                    guild_info.info_tags = [t for t in guild_info.info_tags if t.id != payload.thread_id]
 
-        if info_category or faction:
-            self.client.replace_guild_info(guild_info)
+            await self.client.forget_catalog(payload.parent_id, [payload.thread_id], guild_id=payload.guild_id)
 
     @commands.Cog.listener()
     async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
@@ -179,11 +195,12 @@ class EventsCog(commands.Cog):
         for missing_tag in missing_tags:
             subalignment = guild_info.get_subalignment(missing_tag.id)
             if subalignment:
-                for role in self.client.get_subalignment_roles(subalignment):
-                    guild_info.roles.remove(role)
+                with self.client.edit_guild_info(before.guild.id) as guild_info:
+                    for role in guild_info.get_subalignment_roles(subalignment.id):
+                        guild_info.roles.remove(role)
 
-                guild_info.subalignments.remove(subalignment)
-                self.client.replace_guild_info(guild_info)
+                    guild_info.subalignments.remove(subalignment)
+                    guild_info.subalignment_factions.pop(subalignment.id, None)
 
                 await self.client.delete_item_from_db(subalignment, 'subalignments')
 
@@ -196,25 +213,30 @@ class EventsCog(commands.Cog):
         guild_info: utils.GuildInfo = self.client.get_guild_info(channel.guild.id)
 
         faction = guild_info.get_faction(channel.id)
+        info_category = guild_info.get_info_category(channel.id)
 
-        if faction:
-            guild_info.factions.remove(faction)
-            for role in self.client.get_faction_roles(faction):
-                guild_info.roles.remove(role)
-            await self.client.delete_item_from_db(faction, 'factions')
+        if not faction and not info_category:
+            return
 
-        info_category = guild_info.get_info_category(channel.id)
+        with self.client.edit_guild_info(channel.guild.id) as guild_info:
+            if faction:
+                guild_info.factions.remove(faction)
+                guild_info.set_faction_subalignments(faction.id, ())
+                for role in guild_info.get_faction_roles(faction.id):
+                    guild_info.roles.remove(role)
 
-        if info_category:
-            guild_info.info_categories.remove(info_category)
-            info_tags = [it for it in guild_info.info_tags if it.info_category == info_category]
-            for info_tag in info_tags:
-                guild_info.info_tags.remove(info_tag)
-            await self.client.delete_item_from_db(info_category, 'infotags')
+            if info_category:
+                guild_info.info_categories.remove(info_category)
+                guild_info.info_tags = [it for it in guild_info.info_tags if it.info_category != info_category]
 
-        if faction or info_category:
-            self.client.replace_guild_info(guild_info)
-            await self.client.sync_guild(channel.guild)
+        async with self.client.db.transaction() as transaction:
+            if faction:
+                await self.client.delete_item_from_db(faction, 'factions', transaction)
+
+            if info_category:
+                await self.client.delete_item_from_db(info_category, 'infotags', transaction)
+
+        await self.client.sync_guild(channel.guild)
 
 
 async def setup(bot):
@@ -2,7 +2,7 @@ import discord
 
 from discord import app_commands, Interaction
 from discord.ext import commands
-from utils import mod_check, Faction, GuildInfo
+from utils import mod_check, Faction
 
 import utils
 
@@ -31,9 +31,8 @@ class FactionCog(commands.GroupCog, group_name='faction'):
         if duplicates:
             raise utils.SDGException('Duplicate faction')
 
-        guild_info.factions.append(faction_info)
-
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.factions.append(faction_info)
 
         embed = utils.create_embed(
             interaction.user,
@@ -78,21 +77,20 @@ class FactionCog(commands.GroupCog, group_name='faction'):
             faction: app_commands.Transform[Faction, utils.FactionTransformer]
     ):
         """Removes a faction"""
-        guild_info: GuildInfo = utils.get_guild_info(interaction)
         faction_roles = self.client.get_faction_roles(faction)
         subalignments = self.client.get_faction_subalignments(faction)
 
         client = interaction.client
 
-        guild_info.factions.remove(faction)
-
-        for role in faction_roles:
-            guild_info.roles.remove(role)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.factions.remove(faction)
+            guild_info.set_faction_subalignments(faction.id, ())
 
-        for subalignment in subalignments:
-            guild_info.subalignments.remove(subalignment)
+            for role in faction_roles:
+                guild_info.roles.remove(role)
 
-        self.client.replace_guild_info(guild_info)
+            for subalignment in subalignments:
+                guild_info.subalignments.remove(subalignment)
 
         embed = utils.create_embed(
             user=interaction.user,
@@ -100,7 +98,11 @@ class FactionCog(commands.GroupCog, group_name='faction'):
             description=f'Removed <#{faction.id}>'
         )
 
-        await client.delete_item_from_db(faction, 'factions')
+        async with client.db.transaction() as transaction:
+            await client.delete_item_from_db(faction, 'factions', transaction)
+
+            for subalignment in subalignments:
+                await client.delete_item_from_db(subalignment, 'subalignments', transaction)
 
         await interaction.response.send_message(embed=embed)
 
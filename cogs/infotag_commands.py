@@ -20,11 +20,9 @@ class InfotagCog(commands.GroupCog, group_name='infotag'):
     async def infotag_add(self, interaction: Interaction, forum_channel: discord.ForumChannel, name: str):
         """Adds an infotag category"""
 
-        guild_info = utils.get_guild_info(interaction)
         infotag_category = InfoCategory(name, forum_channel.id)
-        guild_info.info_categories.append(infotag_category)
-
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.info_categories.append(infotag_category)
 
         embed = utils.create_embed(
             interaction.user,
@@ -46,14 +44,9 @@ class InfotagCog(commands.GroupCog, group_name='infotag'):
             info_category: app_commands.Transform[InfoCategory, utils.InfoCategoryTransformer],
     ):
         """Removes an infotag"""
-        guild_info = utils.get_guild_info(interaction)
-        guild_info.info_categories.remove(info_category)
-
-        for info_tag in guild_info.info_tags.copy():
-            if info_tag.info_category == info_category:
-                guild_info.info_tags.remove(info_tag)
-
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.info_categories.remove(info_category)
+            guild_info.info_tags = [t for t in guild_info.info_tags if t.info_category != info_category]
 
         embed = utils.create_embed(
             interaction.user,
@@ -1,6 +1,7 @@
 import random
 import typing
 
+from collections import defaultdict
 from dataclasses import dataclass
 from abc import abstractmethod
 
@@ -109,28 +110,26 @@ class MiscCog(commands.Cog):
         faction_multiplier = guild_info.guild_settings.faction_scroll_multiplier
         default_lots = 10
 
+        # Extra lots per role id, worked out once per player from the role indexes
+        bonus_lots: dict[int, int] = defaultdict(int)
+        cursed_ids = {s.id for s in cursed_scrolls} if use_scrolls else set()
+
+        if use_scrolls:
+            for blessed_scroll in blessed_scrolls:
+                if isinstance(blessed_scroll, utils.Role):
+                    bonus_lots[blessed_scroll.id] += default_lots * role_multiplier
+                if isinstance(blessed_scroll, Subalignment):
+                    for role in guild_info.get_subalignment_roles(blessed_scroll.id):
+                        bonus_lots[role.id] += default_lots * subalignment_multiplier
+                if isinstance(blessed_scroll, Faction):
+                    for role in guild_info.get_faction_roles(blessed_scroll.id):
+                        bonus_lots[role.id] += default_lots * faction_multiplier
+
         for role in roles:
-            lots_num = default_lots
-
-            if use_scrolls:
-                for blessed_scroll in blessed_scrolls:
-                    if isinstance(blessed_scroll, utils.Role):
-                        if blessed_scroll == role:
-                            lots_num += default_lots * role_multiplier
-                    if isinstance(blessed_scroll, Subalignment):
-                        subalignment_roles = self.client.get_subalignment_roles(blessed_scroll)
-                        if role in subalignment_roles:
-                            lots_num += default_lots * subalignment_multiplier
-                    if isinstance(blessed_scroll, Faction):
-                        faction_roles = self.client.get_faction_roles(blessed_scroll)
-                        if role in faction_roles:
-                            lots_num += default_lots * faction_multiplier
-
-                for cursed_scroll in cursed_scrolls:
-                    if role == cursed_scroll:
-                        lots_num = 1
-
-            lots.append(lots_num)
+            if role.id in cursed_ids:
+                lots.append(1)
+            else:
+                lots.append(default_lots + bonus_lots.get(role.id, 0))
 
         return lots
 
@@ -341,13 +340,12 @@ class MiscCog(commands.Cog):
         """Lists all roles that fit the filters"""
         guild_info = get_guild_info(interaction)
 
-        valid_roles = await utils.get_valid_roles(
+        valid_roles = utils.get_valid_roles(
             include_tags=include_tags,
             exclude_tags=exclude_tags,
             guild_info=guild_info,
             faction=faction,
-            subalignment=subalignment,
-            guild=interaction.guild
+            subalignment=subalignment
         )
 
         valid_roles.sort(key=lambda r: r.subalignment.name)
@@ -385,7 +383,7 @@ class MiscCog(commands.Cog):
     ):
         """View the server leaderboard"""
         guild_info: utils.GuildInfo = get_guild_info(interaction)
-        accounts = guild_info.accounts
+        accounts = list(guild_info.accounts)
 
         if not accounts:
             raise SDGException('This server has no accounts!')
@@ -82,8 +82,8 @@ class SettingCog(commands.GroupCog, group_name='settings'):
             faction_scroll_multiplier=faction_scroll_multiplier or settings.faction_scroll_multiplier
         )
 
-        guild_info.guild_settings = new_settings
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.guild_settings = new_settings
 
         await self.client.modify_settings_in_db(new_settings, interaction.guild_id)
 
@@ -25,12 +25,11 @@ class SubalaignmentCog(commands.GroupCog, group_name='subalignment'):
             forum_tag: app_commands.Transform[discord.ForumTag, utils.ForumTagTransformer]
     ):
         """Add a subalignment to a faction"""
-        guild_info = utils.get_guild_info(interaction)
         subalignment = Subalignment(forum_tag.name, forum_tag.id)
-        guild_info.subalignments.append(subalignment)
-        emoji_str = ' ' + str(forum_tag.emoji) + ' ' if forum_tag.emoji else ''
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.subalignments.append(subalignment)
 
-        self.client.replace_guild_info(guild_info)
+        emoji_str = ' ' + str(forum_tag.emoji) + ' ' if forum_tag.emoji else ''
 
         embed = utils.create_embed(
             interaction.user,
@@ -53,8 +52,9 @@ class SubalaignmentCog(commands.GroupCog, group_name='subalignment'):
             ephemeral: bool = False
     ):
         """Get info for a subalignment"""
-        roles = self.client.get_subalignment_roles(subalignment)
-        faction = self.client.get_subalignment_faction(subalignment)
+        guild_info = utils.get_guild_info(interaction)
+        roles = self.client.get_subalignment_roles(subalignment, guild_info)
+        faction = self.client.get_subalignment_faction(subalignment, guild_info)
         faction_channel = await utils.get_or_fetch_channel(interaction.guild, faction.id)
         emoji_str = ''
 
@@ -81,16 +81,14 @@ class SubalaignmentCog(commands.GroupCog, group_name='subalignment'):
             subalignment: app_commands.Transform[Subalignment, utils.SubalignmentTransformer]
     ):
         """Removes a subalignment from the bot"""
-        faction = self.client.get_subalignment_faction(subalignment)
+        faction = self.client.get_subalignment_faction(subalignment, utils.get_guild_info(interaction))
 
-        guild_info = utils.get_guild_info(interaction)
-
-        for role in self.client.get_subalignment_roles(subalignment):
-            guild_info.roles.remove(role)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            for role in guild_info.get_subalignment_roles(subalignment.id):
+                guild_info.roles.remove(role)
 
-        guild_info.subalignments.remove(subalignment)
-
-        self.client.replace_guild_info(guild_info)
+            guild_info.subalignments.remove(subalignment)
+            guild_info.subalignment_factions.pop(subalignment.id, None)
 
         faction_str = f' from <#{faction.id}>' if faction else ''
 
@@ -100,10 +98,11 @@ class SubalaignmentCog(commands.GroupCog, group_name='subalignment'):
             description=f'Removed {subalignment.name}' + faction_str
         )
 
-        if faction:
-            await self.client.sync_faction(faction)
+        async with self.client.db.transaction() as transaction:
+            if faction:
+                await self.client.sync_faction(faction, transaction)
 
-        await self.client.delete_item_from_db(subalignment, 'subalignments')
+            await self.client.delete_item_from_db(subalignment, 'subalignments', transaction)
 
         await interaction.response.send_message(embed=embed)
 
@@ -119,6 +118,7 @@ class SubalaignmentCog(commands.GroupCog, group_name='subalignment'):
         """Lists all of a faction's subalignments"""
         subalignments = self.client.get_faction_subalignments(faction)
         faction_channel = await utils.get_or_fetch_channel(interaction.guild, faction.id)
+        guild_info = utils.get_guild_info(interaction)
 
         if not subalignments:
             raise utils.SDGException('No subalignments defined yet! Use /subalignment add...')
@@ -129,7 +129,7 @@ class SubalaignmentCog(commands.GroupCog, group_name='subalignment'):
         )
 
         for subalignment in subalignments:
-            roles = self.client.get_subalignment_roles(subalignment)
+            roles = guild_info.get_subalignment_roles(subalignment.id)
             emoji_str = ''
 
             for tag in faction_channel.available_tags:
@@ -30,9 +30,8 @@ class TrustCog(commands.GroupCog, group_name='trust'):
 
             return await interaction.response.send_message(embed=embed)
 
-        guild_info.trusted_ids.append(trustee.id)
-
-        self.client.replace_guild_info(guild_info)
+        with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+            guild_info.trusted_ids.append(trustee.id)
 
         await self.client.add_trusted_id_in_db(trustee.id, interaction.guild_id)
 
@@ -48,10 +47,9 @@ class TrustCog(commands.GroupCog, group_name='trust'):
     @app_commands.describe(trustee='The trusted member or role you want remove')
     async def trust_remove(self, interaction: discord.Interaction, trustee: discord.Member | discord.Role):
         """Removes trust from role or member"""
-        guild_info = utils.get_guild_info(interaction)
-
         try:
-            guild_info.trusted_ids.remove(trustee.id)
+            with self.client.edit_guild_info(interaction.guild_id) as guild_info:
+                guild_info.trusted_ids.remove(trustee.id)
         except ValueError:
             embed = utils.create_embed(
                 interaction.user,
@@ -62,8 +60,6 @@ class TrustCog(commands.GroupCog, group_name='trust'):
 
             return await interaction.response.send_message(embed=embed)
 
-        self.client.replace_guild_info(guild_info)
-
         await self.client.delete_trusted_id_in_db(trustee.id, interaction.guild_id)
 
         embed = utils.create_embed(
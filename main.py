@@ -27,6 +27,7 @@ cogs = [
     'cogs.setting_commands',
     'cogs.misc_commands',
     'cogs.dev_commands',
+    'cogs.database_tasks',
     'cogs.error_handler',
     'cogs.events'
 ]
@@ -46,7 +47,29 @@ DISABLE_PROMETHEUS = DISABLE_PROMETHEUS.lower().strip() == 'true'
 
 DATA_DIR = os.getenv('DATA_DIR') or 'data'
 DATABASE_FILENAME = os.getenv('DATABASE_FILENAME') or 'guild_info.db'
-DATABASE_PATH = f'{DATA_DIR}/{DATABASE_FILENAME}'
+# ':memory:' keeps the whole database in memory, nothing is saved once the bot stops
+DATABASE_PATH = DATABASE_FILENAME if DATABASE_FILENAME == ':memory:' else f'{DATA_DIR}/{DATABASE_FILENAME}'
+DATABASE_READERS = os.getenv('DATABASE_READERS')
+DATABASE_READERS = int(DATABASE_READERS) if DATABASE_READERS else 4
+
+SLOW_QUERY_MS = os.getenv('SLOW_QUERY_MS')
+SLOW_QUERY_MS = int(SLOW_QUERY_MS) if SLOW_QUERY_MS else 100
+DATABASE_PROFILE = os.getenv('DATABASE_PROFILE') or 'balanced'
+DATABASE_SHARDS = os.getenv('DATABASE_SHARDS') or 'false'
+DATABASE_SHARDS = DATABASE_SHARDS.lower().strip() == 'true'
+DATABASE_SHARD_DIR = os.getenv('DATABASE_SHARD_DIR') or f'{DATA_DIR}/shards'
+DATABASE_MAX_OPEN_SHARDS = os.getenv('DATABASE_MAX_OPEN_SHARDS')
+DATABASE_MAX_OPEN_SHARDS = int(DATABASE_MAX_OPEN_SHARDS) if DATABASE_MAX_OPEN_SHARDS else 64
+MAINTENANCE_INTERVAL_MINUTES = os.getenv('MAINTENANCE_INTERVAL_MINUTES')
+MAINTENANCE_INTERVAL_MINUTES = float(MAINTENANCE_INTERVAL_MINUTES) if MAINTENANCE_INTERVAL_MINUTES else 10
+
+BACKUP_INTERVAL_HOURS = os.getenv('BACKUP_INTERVAL_HOURS')
+BACKUP_INTERVAL_HOURS = float(BACKUP_INTERVAL_HOURS) if BACKUP_INTERVAL_HOURS else 24
+BACKUP_DIR = os.getenv('BACKUP_DIR') or f'{DATA_DIR}/backups'
+BACKUP_KEEP = os.getenv('BACKUP_KEEP')
+BACKUP_KEEP = int(BACKUP_KEEP) if BACKUP_KEEP else 7
+HIBERNATE_AFTER_HOURS = os.getenv('HIBERNATE_AFTER_HOURS')
+HIBERNATE_AFTER_HOURS = float(HIBERNATE_AFTER_HOURS) if HIBERNATE_AFTER_HOURS else 24
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -79,6 +102,16 @@ async def main():
         test_guild=MY_GUILD,
         guide_channel_id=GUIDE_CHANNEL_ID,
         database_filename=DATABASE_PATH,
+        database_readers=DATABASE_READERS,
+        slow_query_threshold=SLOW_QUERY_MS / 1000 if SLOW_QUERY_MS > 0 else None,
+        database_profile=DATABASE_PROFILE.lower().strip(),
+        shard_dir=DATABASE_SHARD_DIR if DATABASE_SHARDS else None,
+        max_open_shards=DATABASE_MAX_OPEN_SHARDS,
+        maintenance_interval=MAINTENANCE_INTERVAL_MINUTES,
+        backup_interval=BACKUP_INTERVAL_HOURS,
+        backup_dir=BACKUP_DIR,
+        backup_keep=BACKUP_KEEP,
+        hibernate_after=HIBERNATE_AFTER_HOURS,
         do_first_sync=DO_FIRST_SYNC,
         command_prefix=when_mentioned_or('sdg.'),
         allowed_mentions=allowed_mentions,
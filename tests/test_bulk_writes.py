@@ -0,0 +1,62 @@
+import unittest
+
+import discord
+from discord.ext.commands import when_mentioned
+
+from utils import Account, Achievement, DiscordClient
+
+GUILD_ID = 100
+
+
+def make_account(user_id: int) -> Account:
+    return Account(user_id, 0, 0, 0, [], [], [])
+
+
+class AwardAchievementBulkTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = DiscordClient(
+            None,
+            False,
+            '0',
+            ':memory:',
+            command_prefix=when_mentioned,
+            intents=discord.Intents.none()
+        )
+        await self.client.db.startup()
+
+        self.achievement = Achievement(1, 'Winner', 'Win a game')
+        await self.client.add_achievement_to_db(self.achievement, GUILD_ID)
+
+        self.accounts = [make_account(user_id) for user_id in range(10, 15)]
+        await self.client.add_accounts_bulk(self.accounts, GUILD_ID)
+
+    async def asyncTearDown(self):
+        await self.client.db.close()
+
+    async def holders(self) -> list[int]:
+        rows = await self.client.db.fetchall(
+            'SELECT user_id FROM account_achievements WHERE guild_id = ? AND achievement_id = ? ORDER BY user_id',
+            (GUILD_ID, self.achievement.id)
+        )
+        return [row['user_id'] for row in rows]
+
+    async def test_awards_every_account(self):
+        await self.client.award_achievement_bulk(self.achievement, self.accounts, GUILD_ID)
+
+        self.assertEqual(await self.holders(), [10, 11, 12, 13, 14])
+        self.assertEqual(await self.client.count_achievement_holders(self.achievement, GUILD_ID), 5)
+
+    async def test_existing_holders_are_skipped(self):
+        await self.client.award_achievement_bulk(self.achievement, self.accounts[:2], GUILD_ID)
+        await self.client.award_achievement_bulk(self.achievement, self.accounts, GUILD_ID)
+
+        self.assertEqual(await self.holders(), [10, 11, 12, 13, 14])
+
+    async def test_empty_award_writes_nothing(self):
+        await self.client.award_achievement_bulk(self.achievement, [], GUILD_ID)
+
+        self.assertEqual(await self.holders(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import asyncio
+import tempfile
+import unittest
+
+from utils.db_helper import MEMORY_DATABASE, DatabaseHelper
+
+
+async def open_helper(path: str) -> DatabaseHelper:
+    db = DatabaseHelper([], 1, path)
+    await db.startup()
+    await db.execute('CREATE TABLE numbers (value INTEGER)')
+    await db.executemany('INSERT INTO numbers VALUES (?)', [(i,) for i in range(10)])
+    return db
+
+
+class AbandonedIteratorTests(unittest.IsolatedAsyncioTestCase):
+    async def abandon_iterator(self, db: DatabaseHelper):
+        """Starts an iterator and keeps it referenced, so it isn't finalized before the helper closes"""
+        iterator = db.iterate('SELECT value FROM numbers', size=2)
+        await anext(iterator)
+        return iterator
+
+    async def test_memory_database_closes_promptly(self):
+        db = await open_helper(MEMORY_DATABASE)
+        iterator = await self.abandon_iterator(db)
+
+        await asyncio.wait_for(db.close(), timeout=2)
+        self.assertIsNotNone(iterator)
+
+    async def test_file_database_closes_promptly(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db = await open_helper(os.path.join(directory, 'test.db'))
+            iterator = await self.abandon_iterator(db)
+
+            await asyncio.wait_for(db.close(), timeout=2)
+            self.assertIsNotNone(iterator)
+
+    async def test_finished_iterators_are_unaffected(self):
+        db = await open_helper(MEMORY_DATABASE)
+        values = [row['value'] async for row in db.iterate('SELECT value FROM numbers ORDER BY value', size=3)]
+
+        self.assertEqual(values, list(range(10)))
+        await asyncio.wait_for(db.close(), timeout=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
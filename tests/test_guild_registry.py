@@ -0,0 +1,88 @@
+import unittest
+
+from utils import Faction, GuildInfo, GuildRegistry, GuildSettings, Role, Subalignment
+
+
+def make_guild_info() -> GuildInfo:
+    faction = Faction('Town', 1)
+    subalignment = Subalignment('Town Investigative', 10)
+    return GuildInfo(
+        guild_id=100,
+        factions=[faction],
+        subalignments=[subalignment],
+        roles=[Role('Sheriff', 1000, faction, subalignment, frozenset())],
+        info_categories=[],
+        info_tags=[],
+        trusted_ids=[5],
+        achievements=[],
+        accounts=[],
+        guild_settings=GuildSettings.default()
+    )
+
+
+class OverlappingEditTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = GuildRegistry([make_guild_info()])
+        self.snapshot = self.registry.get(100)
+
+    def test_edits_of_different_fields_both_survive(self):
+        first = self.snapshot.edit()
+        second = self.snapshot.edit()
+
+        first.factions.append(Faction('Mafia', 2))
+        second.trusted_ids.append(6)
+
+        self.registry.add(first)
+        published = self.registry.add(second)
+
+        self.assertEqual([f.id for f in published.factions], [1, 2])
+        self.assertEqual(list(published.trusted_ids), [5, 6])
+        self.assertEqual(published.version, 3)
+
+    def test_edits_of_the_same_list_both_survive(self):
+        first = self.snapshot.edit()
+        second = self.snapshot.edit()
+        town = self.snapshot.get_faction(1)
+        subalignment = self.snapshot.get_subalignment(10)
+
+        first.roles.append(Role('Doctor', 1001, town, subalignment, frozenset()))
+        second.roles.remove(second.get_role(1000))
+        second.roles.append(Role('Lookout', 1002, town, subalignment, frozenset()))
+
+        self.registry.add(first)
+        published = self.registry.add(second)
+
+        self.assertEqual([r.id for r in published.roles], [1001, 1002])
+        self.assertIsNotNone(published.get_role(1001))
+        self.assertIsNone(published.get_role(1000))
+
+    def test_replaced_items_keep_the_other_edits(self):
+        first = self.snapshot.edit()
+        second = self.snapshot.edit()
+
+        first.factions.append(Faction('Mafia', 2))
+        second.factions[0] = Faction('Village', 1)
+
+        self.registry.add(first)
+        published = self.registry.add(second)
+
+        self.assertEqual([f.name for f in published.factions], ['Village', 'Mafia'])
+        self.assertEqual(published.get_faction_by_name('village').id, 1)
+
+    def test_unchanged_fields_read_by_the_stale_draft_are_not_reverted(self):
+        first = self.snapshot.edit()
+        second = self.snapshot.edit()
+
+        first.trusted_ids.append(6)
+        self.assertEqual(len(second.trusted_ids), 1)
+        second.factions.append(Faction('Mafia', 2))
+
+        self.registry.add(first)
+        published = self.registry.add(second)
+
+        self.assertEqual(list(published.trusted_ids), [5, 6])
+        self.assertEqual(len(published.factions), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
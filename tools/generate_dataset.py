@@ -0,0 +1,264 @@
+"""Fills a database with a seeded synthetic dataset for load and performance testing.
+
+Guild sizes follow a long-tailed distribution, so a few guilds hold most of the accounts like on
+the real bot. Every guild gets factions, subalignments, cataloged roles and infotags, achievements,
+settings, trusted ids, and accounts with scrolls and achievements. The games ledger is opened with
+an adjustment per guild matching the account counters. The same seed always produces the same data.
+
+Pass ``:memory:`` as the database to only time the generation, or call :func:`generate` on the
+``DatabaseHelper`` of a test client.
+
+Usage: python -m tools.generate_dataset [data/synthetic.db] [--guilds 2000] [--accounts 1000000] [--seed 0]
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import itertools
+
+from dataclasses import dataclass, field
+
+from utils.db_helper import DatabaseHelper, ShardRouter, MEMORY_DATABASE
+from utils.classes import (
+    CatalogEntry,
+    DiscordClient,
+    GuildSettings,
+    GUILD_TABLES,
+    TABLES,
+    USER_VERSION,
+    ACCOUNT_INSERT,
+    SCROLL_INSERT,
+    ACHIEVEMENT_AWARD,
+    SETTINGS_INSERT,
+    GAME_INSERT,
+    GAME_RESULT_INSERT,
+    CATALOG_UPSERT,
+    GAME_RESULTS
+)
+
+
+FACTION_NAMES = ['Town', 'Mafia', 'Coven', 'Neutral', 'Horsemen', 'Vampires', 'Pirates', 'Cult']
+SUBALIGNMENT_NAMES = [
+    'Investigative', 'Protective', 'Killing', 'Support', 'Power', 'Deception', 'Chaos', 'Evil', 'Benign', 'Head'
+]
+SYLLABLES = ['ra', 'ven', 'sher', 'iff', 'doc', 'tor', 'mor', 'ti', 'cian', 'gua', 'rd', 'jan', 'itor', 'bo', 'dy']
+TAGS = [
+    'unique', 'day', 'night', 'rampage', 'astral', 'roleblock immune', 'detection immune',
+    'control immune', 'basic defense', 'powerful attack', 'visit', 'transport'
+]
+
+# Base of the generated ids, so they look like discord snowflakes
+FIRST_ID = 10 ** 17
+
+
+@dataclass(slots=True)
+class GeneratedDataset:
+    guild_ids: list[int] = field(default_factory=list)
+    roles: int = 0
+    info_tags: int = 0
+    achievements: int = 0
+    accounts: int = 0
+    scrolls: int = 0
+    awards: int = 0
+    duration: float = 0.0
+
+
+def guild_sizes(rng: random.Random, guilds: int, accounts: int) -> list[int]:
+    """Splits ``accounts`` between the guilds with a Pareto distribution, every guild gets at least one"""
+    weights = [rng.paretovariate(1.16) for _ in range(guilds)]
+    total = sum(weights)
+    sizes = [max(int(w / total * accounts), 1) for w in weights]
+    sizes[weights.index(max(weights))] += max(accounts - sum(sizes), 0)
+    return sizes
+
+
+def role_name(rng: random.Random) -> str:
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+async def generate_guild(
+        db: DatabaseHelper,
+        rng: random.Random,
+        ids: itertools.count,
+        guild_id: int,
+        num_accounts: int,
+        stats: GeneratedDataset
+) -> list[tuple[str, tuple]]:
+    """Writes one guild's rows and returns the faction, subalignment and infotag rows for the main database"""
+    now = int(time.time())
+    items = []
+    catalog = []
+    factions = []
+    subalignments = []
+    roles = []
+
+    for faction_name in rng.sample(FACTION_NAMES, rng.randint(3, 6)):
+        faction_id = next(ids)
+        factions.append(faction_id)
+        items.append(('factions', (faction_id, faction_name)))
+
+        for subalignment_name in rng.sample(SUBALIGNMENT_NAMES, rng.randint(2, 4)):
+            subalignment_id = next(ids)
+            subalignments.append(subalignment_id)
+            items.append(('subalignments', (subalignment_id, f'{faction_name} {subalignment_name}')))
+
+            for _ in range(rng.randint(3, 12)):
+                role_id = next(ids)
+                roles.append(role_id)
+                tags = tuple(sorted(rng.sample(TAGS, rng.randint(0, 4))))
+                catalog.append(CatalogEntry(
+                    role_id, guild_id, faction_id, 'role', role_name(rng), subalignment_id, tags, False, now
+                ))
+
+    for category_number in range(rng.randint(1, 3)):
+        category_id = next(ids)
+        items.append(('infotags', (category_id, f'Info {category_number + 1}')))
+
+        for tag_number in range(rng.randint(5, 30)):
+            catalog.append(
+                CatalogEntry(next(ids), guild_id, category_id, 'infotag', f'Tag {tag_number + 1}', None, (), False, now)
+            )
+
+    achievements = []
+    for achievement_number in range(rng.randint(5, 25)):
+        target = rng.choice(['general', 'role', 'subalignment', 'faction'])
+        achievements.append((
+            next(ids),
+            guild_id,
+            f'Achievement {achievement_number + 1}',
+            'Synthetic achievement',
+            rng.choice(roles) if target == 'role' else None,
+            rng.choice(subalignments) if target == 'subalignment' else None,
+            rng.choice(factions) if target == 'faction' else None
+        ))
+
+    accounts = []
+    scrolls = []
+    awards = []
+    blessable = roles + subalignments + factions
+    # Popular achievements are held by most accounts, rare ones by almost nobody
+    award_chances = [(a[0], rng.random() ** 3) for a in achievements]
+
+    for _ in range(num_accounts):
+        user_id = next(ids)
+        num_wins, num_loses, num_draws = int(rng.expovariate(0.1)), int(rng.expovariate(0.1)), int(rng.expovariate(0.5))
+        accounts.append((user_id, guild_id, num_wins, num_loses, num_draws))
+
+        for scroll_id in rng.sample(blessable, rng.randint(0, 3)):
+            scrolls.append((guild_id, user_id, scroll_id, 'blessed'))
+        for scroll_id in rng.sample(roles, rng.randint(0, 3)):
+            scrolls.append((guild_id, user_id, scroll_id, 'cursed'))
+
+        for achievement_id, chance in award_chances:
+            if rng.random() < chance:
+                awards.append((guild_id, user_id, achievement_id))
+
+    trusted_ids = [(next(ids), guild_id) for _ in range(rng.randint(1, 5))]
+
+    async with db.conn(write=True, guild_id=guild_id) as conn:
+        async with conn.transaction():
+            await conn.executemany(CATALOG_UPSERT, [e.params() for e in catalog])
+            await conn.executemany('INSERT INTO achievements VALUES (?, ?, ?, ?, ?, ?, ?)', achievements)
+            await conn.executemany(ACCOUNT_INSERT, accounts)
+            await conn.executemany(SCROLL_INSERT, scrolls)
+            await conn.executemany(ACHIEVEMENT_AWARD, awards)
+            await conn.executemany('INSERT INTO trusted_ids VALUES (?, ?)', trusted_ids)
+            await conn.execute(SETTINGS_INSERT, DiscordClient._settings_params(GuildSettings.default(), guild_id))
+
+            cursor = await conn.execute(GAME_INSERT, (guild_id, 'adjustment', now, None))
+            game_id = cursor.get_cursor().lastrowid
+            await conn.executemany(
+                GAME_RESULT_INSERT,
+                [
+                    (game_id, guild_id, row[0], result, row[index + 2], 'adjustment', now)
+                    for row in accounts
+                    for index, result in enumerate(GAME_RESULTS)
+                    if row[index + 2]
+                ]
+            )
+
+    stats.roles += len(roles)
+    stats.info_tags += len(catalog) - len(roles)
+    stats.achievements += len(achievements)
+    stats.accounts += len(accounts)
+    stats.scrolls += len(scrolls)
+    stats.awards += len(awards)
+    return items
+
+
+async def generate(
+        db: DatabaseHelper,
+        *,
+        guilds: int = 2000,
+        accounts: int = 1_000_000,
+        seed: int = 0
+) -> GeneratedDataset:
+    """Fills an empty, started database with ``guilds`` guilds sharing ``accounts`` accounts"""
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    ids = itertools.count(FIRST_ID)
+    stats = GeneratedDataset()
+    items = []
+
+    for num_accounts in guild_sizes(rng, guilds, accounts):
+        guild_id = next(ids)
+        stats.guild_ids.append(guild_id)
+        items += await generate_guild(db, rng, ids, guild_id, num_accounts, stats)
+
+    async with db.conn(write=True) as conn:
+        async with conn.transaction():
+            for table_name, rows in itertools.groupby(sorted(items, key=lambda i: i[0]), key=lambda i: i[0]):
+                await conn.executemany(f'INSERT INTO {table_name} VALUES (?, ?)', [row for _, row in rows])
+
+    stats.duration = time.perf_counter() - start
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('database', nargs='?', default='data/synthetic.db')
+    parser.add_argument('--guilds', type=int, default=2000)
+    parser.add_argument('--accounts', type=int, default=1_000_000, help='Accounts across every guild')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--shard-dir', help='Write the guild data into per-guild shards in this directory')
+    parser.add_argument('--profile', default='throughput', help='PRAGMA profile used while generating')
+    args = parser.parse_args()
+
+    if args.database != MEMORY_DATABASE and os.path.exists(args.database):
+        parser.error(f'{args.database} already exists')
+
+    shards = None
+    if args.shard_dir:
+        shards = ShardRouter(
+            GUILD_TABLES,
+            USER_VERSION,
+            args.shard_dir,
+            readers=0,
+            profile=args.profile,
+            slow_query_threshold=None
+        )
+
+    db = DatabaseHelper(
+        TABLES,
+        USER_VERSION,
+        args.database,
+        readers=0,
+        profile=args.profile,
+        slow_query_threshold=None,
+        shards=shards
+    )
+    await db.startup()
+    stats = await generate(db, guilds=args.guilds, accounts=args.accounts, seed=args.seed)
+    await db.close()
+
+    print(
+        f'Generated {len(stats.guild_ids)} guilds in {stats.duration:.2f}s: '
+        f'{stats.accounts} accounts, {stats.scrolls} scrolls, {stats.awards} awarded achievements, '
+        f'{stats.roles} roles, {stats.info_tags} infotags, {stats.achievements} achievements'
+    )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
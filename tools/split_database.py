@@ -0,0 +1,105 @@
+"""Splits the guild data of a single-file database into one database per guild for DATABASE_SHARDS.
+
+The source is migrated to the latest version first. Guilds that already have a shard are skipped,
+so the tool can be re-run after an interruption. Stop the bot before running it.
+
+Usage: python -m tools.split_database [data/guild_info.db] [data/shards] [--prune]
+"""
+
+import os
+import time
+import asyncio
+import argparse
+
+from utils.db_helper import DatabaseHelper
+from utils.classes import GUILD_TABLES, MIGRATIONS, TABLES, USER_VERSION
+
+
+async def guild_ids(db: DatabaseHelper) -> list[int]:
+    union = ' UNION '.join(f'SELECT guild_id FROM {table.name}' for table in GUILD_TABLES)
+    return [row[0] for row in await db.fetchall(f'SELECT guild_id FROM ({union}) ORDER BY guild_id')]
+
+
+async def copy_guild(source: str, path: str, guild_id: int) -> int:
+    shard = DatabaseHelper(GUILD_TABLES, USER_VERSION, path, readers=0, slow_query_threshold=None)
+    await shard.startup()
+    copied = 0
+
+    try:
+        async with shard.conn(write=True) as conn:
+            await conn.execute('ATTACH DATABASE ? AS source', (source,))
+
+            try:
+                async with conn.transaction():
+                    for table in GUILD_TABLES:
+                        columns = ', '.join(column.name for column in table.columns)
+                        cursor = await conn.execute(
+                            f'INSERT INTO main.{table.name} ({columns}) '
+                            f'SELECT {columns} FROM source.{table.name} WHERE guild_id = ? ORDER BY rowid',
+                            (guild_id,)
+                        )
+                        copied += cursor.get_cursor().rowcount
+            finally:
+                await conn.execute('DETACH DATABASE source')
+    except BaseException:
+        # A partial shard would be skipped by the next run, so it's removed instead
+        await shard.close()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        raise
+
+    await shard.close()
+    return copied
+
+
+async def prune(db: DatabaseHelper, ids: list[int]) -> None:
+    async with db.conn(write=True) as conn:
+        async with conn.transaction():
+            for table in GUILD_TABLES:
+                await conn.executemany(f'DELETE FROM {table.name} WHERE guild_id = ?', [(i,) for i in ids])
+
+        await conn.execute('VACUUM')
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', nargs='?', default='data/guild_info.db')
+    parser.add_argument('directory', nargs='?', default='data/shards')
+    parser.add_argument('--prune', action='store_true', help='Delete the copied guild rows from the source afterwards')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        parser.error(f'{args.source} does not exist')
+
+    os.makedirs(args.directory, exist_ok=True)
+    source = os.path.abspath(args.source)
+
+    db = DatabaseHelper(TABLES, USER_VERSION, args.source, readers=0, migrations=MIGRATIONS)
+    await db.startup()
+    ids = await guild_ids(db)
+
+    start = time.perf_counter()
+    split = []
+
+    for guild_id in ids:
+        path = os.path.join(args.directory, f'{guild_id}.db')
+        if os.path.exists(path):
+            print(f'{guild_id}: already split, skipping')
+            continue
+
+        copied = await copy_guild(source, path, guild_id)
+        split.append(guild_id)
+        print(f'{guild_id}: copied {copied} rows')
+
+    print(f'Split {len(split)} of {len(ids)} guilds into {args.directory} in {time.perf_counter() - start:.2f}s')
+
+    if args.prune:
+        await prune(db, ids)
+        print(f'Removed the guild rows from {args.source}')
+
+    await db.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
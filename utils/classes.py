@@ -1,32 +1,53 @@
 from __future__ import annotations
 
 import os
+import sys
 import copy
+import shutil
+import json
+import time
+import asyncio
 import inspect
-from dataclasses import dataclass
+import sqlite3
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
 from typing import Any, TypeVar
 
 import discord
 from discord.ext.commands import Bot
-from discord.app_commands import ContextMenu, Command, Group
+from discord.app_commands import CommandTree, ContextMenu, Command, Group
 from discord.state import ConnectionState
 from loguru import logger
 
 from utils.db_helper import *
+from utils.guild_metrics import observe_eviction, observe_guilds, observe_hibernations, observe_wake
 
 __all__ = [
     'SDGObject',
     'DiscordClient',
     'Role',
+    'PartialRole',
+    'RoleStore',
     'Subalignment',
     'Faction',
     'GuildInfo',
+    'GuildRegistry',
+    'GuildInfoDraft',
+    'SnapshotList',
+    'IdIndexedList',
+    'NamedIndexedList',
+    'RoleList',
+    'name_key',
     'SDGException',
     'InfoTag',
     'InfoCategory',
     'Account',
     'Achievement',
     'GuildSettings',
+    'CatalogEntry',
     'GuideItem'
 ]
 
@@ -92,13 +113,15 @@ TrustedIds = BaseTable(
     columns=[
         BaseColumn(
             name='id',
-            datatype='integer',
-            addit_schema='PRIMARY KEY'
+            datatype='integer'
         ),
         BaseColumn(
             name='guild_id',
             datatype='integer'
         )
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id, id)'
     ]
 )
 
@@ -133,6 +156,9 @@ AchievementsTable = BaseTable(
             name='faction_id',
             datatype='integer'
         ),
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id, id)'
     ]
 )
 
@@ -158,19 +184,63 @@ AccountsTable = BaseTable(
         BaseColumn(
             name='num_draws',
             datatype='integer'
+        )
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id, user_id)'
+    ]
+)
+
+AccountScrollsTable = BaseTable(
+    name='account_scrolls',
+    columns=[
+        BaseColumn(
+            name='guild_id',
+            datatype='integer'
         ),
         BaseColumn(
-            name='blessed_scrolls',
-            datatype='string'
+            name='user_id',
+            datatype='integer'
         ),
         BaseColumn(
-            name='cursed_scrolls',
-            datatype='string'
+            name='scroll_id',
+            datatype='integer'
         ),
         BaseColumn(
-            name='accomplished_achievements',
-            datatype='string'
+            name='scroll_type',
+            datatype='string',
+            addit_schema="CHECK (scroll_type IN ('blessed', 'cursed'))"
+        )
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id, user_id, scroll_type, scroll_id)'
+    ]
+)
+
+AccountAchievementsTable = BaseTable(
+    name='account_achievements',
+    columns=[
+        BaseColumn(
+            name='guild_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='user_id',
+            datatype='integer'
         ),
+        BaseColumn(
+            name='achievement_id',
+            datatype='integer'
+        )
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id, user_id, achievement_id)'
+    ],
+    indexes=[
+        BaseIndex(
+            name='account_achievements_by_achievement',
+            columns=['guild_id', 'achievement_id']
+        )
     ]
 )
 
@@ -213,10 +283,296 @@ GuildSettingsTable = BaseTable(
             name='accounts_creatable',
             datatype='boolean'
         )
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id)'
+    ]
+)
+
+CatalogTable = BaseTable(
+    name='catalog_threads',
+    columns=[
+        BaseColumn(
+            name='thread_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='guild_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='parent_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='kind',
+            datatype='string',
+            addit_schema="CHECK (kind IN ('role', 'infotag'))"
+        ),
+        BaseColumn(
+            name='name',
+            datatype='string'
+        ),
+        BaseColumn(
+            name='subalignment_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='tags',
+            datatype='string'
+        ),
+        BaseColumn(
+            name='archived',
+            datatype='boolean'
+        ),
+        BaseColumn(
+            name='last_seen',
+            datatype='integer'
+        )
+    ],
+    constraints=[
+        'PRIMARY KEY (guild_id, thread_id)'
+    ],
+    indexes=[
+        BaseIndex(
+            name='catalog_threads_by_parent',
+            columns=['parent_id']
+        )
+    ]
+)
+
+GamesTable = BaseTable(
+    name='games',
+    columns=[
+        BaseColumn(
+            name='game_id',
+            datatype='integer',
+            addit_schema='PRIMARY KEY'
+        ),
+        BaseColumn(
+            name='guild_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='kind',
+            datatype='string',
+            addit_schema="CHECK (kind IN ('game', 'adjustment'))"
+        ),
+        BaseColumn(
+            name='recorded_at',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='recorded_by',
+            datatype='integer'
+        )
+    ],
+    indexes=[
+        BaseIndex(
+            name='games_by_guild',
+            columns=['guild_id', 'recorded_at']
+        )
     ]
 )
 
-USER_VERSION = 0
+GameResultsTable = BaseTable(
+    name='game_results',
+    columns=[
+        BaseColumn(
+            name='game_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='guild_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='user_id',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='result',
+            datatype='string',
+            addit_schema="CHECK (result IN ('win', 'loss', 'draw'))"
+        ),
+        BaseColumn(
+            name='delta',
+            datatype='integer'
+        ),
+        BaseColumn(
+            name='kind',
+            datatype='string'
+        ),
+        BaseColumn(
+            name='recorded_at',
+            datatype='integer'
+        )
+    ],
+    constraints=[
+        'PRIMARY KEY (game_id, user_id, result)'
+    ],
+    indexes=[
+        BaseIndex(
+            name='game_results_by_account',
+            columns=['guild_id', 'user_id', 'recorded_at']
+        ),
+        BaseIndex(
+            name='game_results_by_time',
+            columns=['guild_id', 'recorded_at']
+        )
+    ]
+)
+
+USER_VERSION = 4
+
+# Tables keyed by guild_id, these move into per-guild shards when sharding is enabled
+GUILD_TABLES = [
+    TrustedIds,
+    AccountsTable,
+    AccountScrollsTable,
+    AccountAchievementsTable,
+    AchievementsTable,
+    GuildSettingsTable,
+    CatalogTable,
+    GamesTable,
+    GameResultsTable
+]
+TABLES = [FactionTable, SubalignmentTable, InfotagTable] + GUILD_TABLES
+
+# Ledger results in the order of the account counters
+GAME_RESULTS = ('win', 'loss', 'draw')
+
+ACCOUNT_INSERT = (
+    'INSERT OR IGNORE INTO accounts (user_id, guild_id, num_wins, num_loses, num_draws) '
+    'VALUES (?, ?, ?, ?, ?)'
+)
+ACCOUNT_UPDATE = (
+    'UPDATE accounts SET '
+    'num_wins = ?, '
+    'num_loses = ?, '
+    'num_draws = ? '
+    'WHERE user_id = ? AND guild_id = ?'
+)
+SCROLL_INSERT = (
+    'INSERT OR IGNORE INTO account_scrolls (guild_id, user_id, scroll_id, scroll_type) '
+    'VALUES (?, ?, ?, ?)'
+)
+ACHIEVEMENT_AWARD = (
+    'INSERT OR IGNORE INTO account_achievements (guild_id, user_id, achievement_id) '
+    'VALUES (?, ?, ?)'
+)
+SETTINGS_INSERT = 'INSERT OR IGNORE INTO guild_settings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+ACCOUNT_INCREMENT = (
+    'UPDATE accounts SET '
+    'num_wins = num_wins + ?, '
+    'num_loses = num_loses + ?, '
+    'num_draws = num_draws + ? '
+    'WHERE user_id = ? AND guild_id = ?'
+)
+GAME_INSERT = 'INSERT INTO games (guild_id, kind, recorded_at, recorded_by) VALUES (?, ?, ?, ?)'
+GAME_RESULT_INSERT = (
+    'INSERT INTO game_results (game_id, guild_id, user_id, result, delta, kind, recorded_at) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?)'
+)
+CATALOG_UPSERT = (
+    'INSERT OR REPLACE INTO catalog_threads '
+    '(thread_id, guild_id, parent_id, kind, name, subalignment_id, tags, archived, last_seen) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+async def _migrate_account_items(conn) -> None:
+    """Moves the comma-joined scroll and achievement columns of accounts into their own tables"""
+    scrolls = []
+    achievements = []
+
+    for statement in table_schema(AccountScrollsTable) + table_schema(AccountAchievementsTable):
+        await conn.execute(statement)
+
+    rows = await conn.fetchall(
+        'SELECT user_id, guild_id, blessed_scrolls, cursed_scrolls, accomplished_achievements FROM accounts'
+    )
+
+    for row in rows:
+        key = (row['guild_id'], row['user_id'])
+
+        for scroll_type in ('blessed', 'cursed'):
+            for scroll_id in str(row[f'{scroll_type}_scrolls'] or '').split(','):
+                if scroll_id:
+                    scrolls.append(key + (int(scroll_id), scroll_type))
+
+        for achievement_id in str(row['accomplished_achievements'] or '').split(','):
+            if achievement_id:
+                achievements.append(key + (int(achievement_id),))
+
+    await conn.executemany(SCROLL_INSERT, scrolls)
+    await conn.executemany(ACHIEVEMENT_AWARD, achievements)
+
+    for column in ('blessed_scrolls', 'cursed_scrolls', 'accomplished_achievements'):
+        await conn.execute(f'ALTER TABLE accounts DROP COLUMN {column}')
+
+    logger.info('Migrated {} scrolls and {} achievements', len(scrolls), len(achievements))
+
+
+async def _migrate_primary_keys(conn) -> None:
+    """Rebuilds the guild tables with composite primary keys, dropping duplicate rows"""
+    await rebuild_table(conn, AccountsTable)
+    await rebuild_table(conn, AchievementsTable)
+    await rebuild_table(conn, TrustedIds)
+    # load_settings always used the last settings row of a guild
+    await rebuild_table(conn, GuildSettingsTable, keep_last=True)
+
+
+async def _migrate_games_ledger(conn) -> None:
+    """Creates the games ledger and opens it with an adjustment per guild matching the current counters"""
+    for statement in table_schema(GamesTable) + table_schema(GameResultsTable):
+        await conn.execute(statement)
+
+    rows = await conn.fetchall(
+        'SELECT guild_id, user_id, num_wins, num_loses, num_draws FROM accounts '
+        'WHERE num_wins != 0 OR num_loses != 0 OR num_draws != 0 ORDER BY guild_id'
+    )
+    now = int(time.time())
+    game_ids = {}
+    results = []
+
+    for row in rows:
+        guild_id = row['guild_id']
+        if guild_id not in game_ids:
+            cursor = await conn.execute(GAME_INSERT, (guild_id, 'adjustment', now, None))
+            game_ids[guild_id] = cursor.get_cursor().lastrowid
+
+        for result, column in zip(GAME_RESULTS, ('num_wins', 'num_loses', 'num_draws')):
+            if row[column]:
+                results.append((game_ids[guild_id], guild_id, row['user_id'], result, row[column], 'adjustment', now))
+
+    await conn.executemany(GAME_RESULT_INSERT, results)
+
+    logger.info('Opened the games ledger with {} balances across {} guilds', len(results), len(game_ids))
+
+
+MIGRATIONS = [
+    Migration(
+        version=1,
+        description='Move account scrolls and achievements into join tables',
+        callback=_migrate_account_items
+    ),
+    Migration(
+        version=2,
+        description='Add composite primary keys to guild tables',
+        callback=_migrate_primary_keys
+    ),
+    Migration(
+        version=3,
+        description='Add the role and infotag catalog',
+        statements=table_schema(CatalogTable)
+    ),
+    Migration(
+        version=4,
+        description='Add the games ledger',
+        callback=_migrate_games_ledger
+    )
+]
 
 
 class CustomConnectionState(ConnectionState):
@@ -243,30 +599,81 @@ class CustomConnectionState(ConnectionState):
             self.dispatch('thread_join', thread)
 
 
+class SDGCommandTree(CommandTree):
+    """Wakes the guild of every interaction before its command or autocomplete runs"""
+
+    async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
+        if interaction.guild_id is not None:
+            await self.client.wake_guild(interaction.guild_id)
+
+        return True
+
+
 class DiscordClient(Bot):
-    def __init__(self, test_guild, do_first_sync: bool, guide_channel_id: str, database_filename: str, *args, **kwargs):
+    def __init__(
+            self,
+            test_guild,
+            do_first_sync: bool,
+            guide_channel_id: str,
+            database_filename: str,
+            *args,
+            database_readers: int = 4,
+            slow_query_threshold: float | None = 0.1,
+            database_profile: str = 'balanced',
+            maintenance_interval: float = 10,
+            backup_interval: float = 24,
+            backup_dir: str | None = None,
+            backup_keep: int = 7,
+            shard_dir: str | None = None,
+            max_open_shards: int = 64,
+            hibernate_after: float = 24,
+            **kwargs
+    ):
+        kwargs.setdefault('tree_cls', SDGCommandTree)
         super().__init__(*args, **kwargs)
         self.test_guild = test_guild
-        self.guild_info: list[GuildInfo] = []
+        self.guild_info = GuildRegistry()
         self.guild_task = None
         self.database_filename = database_filename
+        self.shards = None
+
+        if shard_dir:
+            self.shards = ShardRouter(
+                GUILD_TABLES,
+                USER_VERSION,
+                shard_dir,
+                max_open=max_open_shards,
+                readers=0,
+                slow_query_threshold=slow_query_threshold,
+                profile=database_profile,
+                check_same_thread=False
+            )
+
         self.db = DatabaseHelper(
-            [
-                FactionTable,
-                SubalignmentTable,
-                InfotagTable,
-                TrustedIds,
-                AccountsTable,
-                AchievementsTable,
-                GuildSettingsTable
-            ],
+            TABLES,
             USER_VERSION,
             database_filename,
+            readers=database_readers,
+            migrations=MIGRATIONS,
+            slow_query_threshold=slow_query_threshold,
+            profile=database_profile,
+            shards=self.shards,
             check_same_thread=False
         )
+        self.maintenance_interval = maintenance_interval
+        self.backup_interval = backup_interval
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(database_filename), 'backups')
+        self.backup_keep = backup_keep
+        self.hibernate_after = hibernate_after
+        # Guild id -> time.monotonic() of its last interaction
+        self.guild_activity: dict[int, float] = {}
+        # Guilds idle past hibernate_after, their achievements and accounts stay unloaded until they're woken
+        self.hibernated_guild_ids: set[int] = set()
+        self._wake_locks: dict[int, asyncio.Lock] = {}
         self.db_loaded = False
         self.first_sync = False
-        self.populated_forum_ids: list[int] = []
+        self.populated_forum_ids: set[int] = set()
+        self.catalog: dict[int, dict[int, CatalogEntry]] = {}
         self.owner = None
         self.cogs_list: list[str] = []
         self.do_first_sync = do_first_sync
@@ -283,6 +690,7 @@ class DiscordClient(Bot):
 
     async def close(self) -> None:
         await super().close()
+        await self.db.close()
 
     async def get_owner(self) -> discord.User:
         if not self.owner:
@@ -291,78 +699,83 @@ class DiscordClient(Bot):
 
         return self.owner
 
-    async def sync_faction(self, faction: Faction):
+    async def sync_faction(self, faction: Faction, transaction: UnitOfWork | None = None):
         forum_channel = self.get_channel(faction.id)
+        first_walk = forum_channel.id not in self.populated_forum_ids
+
+        await self.add_archived_threads(forum_channel)
+
+        # Read after the await, the roles are published over the version they're built from
         guild_info = self.get_guild_info(forum_channel.guild.id)
-        subalignments = guild_info.subalignments
+        subalignments = {s.id: s for s in guild_info.subalignments}
 
         failed_roles = []
         roles = []
+        entries = []
 
-        guild_info_roles = [r for r in guild_info.roles if r.faction.id != faction.id]
-        pre_faction_roles = [r for r in guild_info.roles if r.faction.id == faction.id]
-        pre_faction_roles_ids = [r.id for r in pre_faction_roles]
-
-        roles += pre_faction_roles
-
-        await self.add_archived_threads(forum_channel)
+        pre_faction_roles = {r.id: r for r in guild_info.get_faction_roles(faction.id)}
 
+        # Every thread is cached once archived threads are added, so the forum is the source of truth
         for thread in forum_channel.threads:
-            subalignment = None
-
             if thread.flags.pinned:
                 continue
 
-            if thread.id in pre_faction_roles_ids:
-                continue
-
-            for tag in thread.applied_tags:
-                for subalign in subalignments:
-                    if subalign.id == tag.id:
-                        subalignment = subalign
-                        break
-                if subalignment:
-                    break
-
-            if subalignment:
-                forum_tags = [str(t).lower() for t in thread.applied_tags if t.id != subalignment.id]
-                roles.append(Role(thread.name, thread.id, faction, subalignment, set(forum_tags)))
+            subalignment = next((subalignments[t.id] for t in thread.applied_tags if t.id in subalignments), None)
 
             if not subalignment:
                 failed_roles.append(thread)
+                continue
+
+            forum_tags = guild_info.role_store.intern_tags(
+                str(t) for t in thread.applied_tags if t.id != subalignment.id
+            )
+            role = Role(thread.name, thread.id, faction, subalignment, forum_tags)
+
+            # Unchanged roles keep their object, accounts hold references to them
+            existing = pre_faction_roles.get(thread.id)
+            roles.append(existing if existing == role else role)
+            entries.append(CatalogEntry.from_thread(thread, 'role', subalignment_id=subalignment.id, tags=forum_tags))
 
-        guild_info_roles += roles
-        guild_info.roles = guild_info_roles
+        with self.edit_guild_info(guild_info.guild_id) as guild_info:
+            guild_info.roles.replace_faction(faction.id, roles)
+            guild_info.set_faction_subalignments(
+                faction.id, [t.id for t in forum_channel.available_tags if t.id in subalignments]
+            )
 
-        self.replace_guild_info(guild_info)
+        await self.save_catalog(forum_channel.id, entries, touch=first_walk, transaction=transaction)
 
         return roles, failed_roles
 
     async def sync_infotags(self, info_category: InfoCategory):
         forum_channel = self.get_channel(info_category.id)
+        first_walk = forum_channel.id not in self.populated_forum_ids
+
+        await self.add_archived_threads(forum_channel)
+
         guild_info = self.get_guild_info(forum_channel.guild.id)
 
         failed_tags = []
         tags = []
+        entries = []
 
-        guild_info_tags = [r for r in guild_info.info_tags if r.id != info_category.id]
-        guild_info_tags_ids = [t.id for t in guild_info_tags]
-
-        await self.add_archived_threads(forum_channel)
+        guild_info_tags = [t for t in guild_info.info_tags if t.info_category.id != info_category.id]
+        pre_category_tags = {t.id: t for t in guild_info.info_tags if t.info_category.id == info_category.id}
 
         for thread in forum_channel.threads:
             if thread.flags.pinned:
                 continue
 
-            if thread.id in guild_info_tags_ids:
-                continue
-
-            tags.append(InfoTag(name=thread.name, id=thread.id, info_category=info_category))
+            tag = InfoTag(name=thread.name, id=thread.id, info_category=info_category)
+            existing = pre_category_tags.get(thread.id)
+            tags.append(existing if existing == tag else tag)
+            entries.append(CatalogEntry.from_thread(thread, 'infotag'))
 
         guild_info_tags += tags
-        guild_info.info_tags = guild_info_tags
 
-        self.replace_guild_info(guild_info)
+        with self.edit_guild_info(guild_info.guild_id) as guild_info:
+            guild_info.info_tags = guild_info_tags
+
+        await self.save_catalog(forum_channel.id, entries, touch=first_walk)
 
         return tags, failed_tags
 
@@ -383,13 +796,7 @@ class DiscordClient(Bot):
     def get_faction_roles(self, faction: Faction) -> list[Role]:
         forum_channel = self.get_channel(faction.id)
         guild_info = self.get_guild_info(forum_channel.guild.id)
-        roles = []
-
-        for role in guild_info.roles:
-            if role.faction.id == faction.id:
-                roles.append(role)
-
-        return roles
+        return guild_info.get_faction_roles(faction.id)
 
     def get_faction_subalignments(self, faction: Faction) -> list[Subalignment]:
         forum_channel = self.get_channel(faction.id)
@@ -403,28 +810,34 @@ class DiscordClient(Bot):
 
         return subalignments
 
-    def get_subalignment_roles(self, subalignment: Subalignment) -> list[Role]:
-        guild_info = [gi for gi in self.guild_info if subalignment in gi.subalignments][0]
-        roles = []
-
-        for role in guild_info.roles:
-            if role.subalignment.id == subalignment.id:
-                roles.append(role)
-
-        return roles
-
-    def get_subalignment_faction(self, subalignment: Subalignment) -> Faction | None:
-        for channel in self.get_all_channels():
-            if isinstance(channel, discord.ForumChannel):
-                for tag in channel.available_tags:
-                    if tag.id == subalignment.id:
-                        guild = channel.guild
-                        guild_info = self.get_guild_info(guild.id)
-                        faction = [f for f in guild_info.factions if f.id == channel.id][0]
+    def get_subalignment_roles(self, subalignment: Subalignment, guild_info: GuildInfo | None = None) -> list[Role]:
+        if guild_info is None:
+            guild_info = next(gi for gi in self.guild_info if gi.get_subalignment(subalignment.id))
 
-                        return faction
+        return guild_info.get_subalignment_roles(subalignment.id)
 
-        return None
+    def get_subalignment_faction(
+            self,
+            subalignment: Subalignment,
+            guild_info: GuildInfo | None = None
+    ) -> Faction | None:
+        if guild_info is None:
+            guild_info = next((gi for gi in self.guild_info if gi.get_subalignment(subalignment.id)), None)
+            if guild_info is None:
+                return None
+
+        faction = guild_info.get_subalignment_faction(subalignment.id)
+        if faction is not None:
+            return faction
+
+        # Not indexed yet when the faction hasn't been synced since startup, index this guild's forums
+        for faction in guild_info.factions:
+            forum_channel = self.get_channel(faction.id)
+            if isinstance(forum_channel, discord.ForumChannel):
+                tag_ids = [t.id for t in forum_channel.available_tags if guild_info.get_subalignment(t.id)]
+                guild_info.set_faction_subalignments(faction.id, tag_ids)
+
+        return guild_info.get_subalignment_faction(subalignment.id)
 
     async def add_archived_threads(self, forum_channel: discord.ForumChannel, force: bool = False):
         if forum_channel.id in self.populated_forum_ids and not force:
@@ -435,165 +848,332 @@ class DiscordClient(Bot):
             thread.guild._add_thread(thread)
 
         if not force:
-            self.populated_forum_ids.append(forum_channel.id)
+            self.populated_forum_ids.add(forum_channel.id)
+
+    async def save_catalog(
+            self,
+            parent_id: int,
+            entries: list[CatalogEntry],
+            *,
+            touch: bool = False,
+            transaction: UnitOfWork | None = None
+    ) -> None:
+        """Replaces the catalog of one forum, only rows that changed are written unless ``touch``"""
+        previous = self.catalog.get(parent_id, {})
+        current = {e.thread_id: e for e in entries}
+
+        changed = [e for e in entries if touch or previous.get(e.thread_id) != e]
+        removed = [e for thread_id, e in previous.items() if thread_id not in current]
+
+        if changed or removed:
+            guild_id = (changed or removed)[0].guild_id
+
+            async with self.db.transaction(transaction) as transaction:
+                transaction.executemany(CATALOG_UPSERT, [e.params() for e in changed], guild_id=guild_id)
+                transaction.executemany(
+                    'DELETE FROM catalog_threads WHERE guild_id = ? AND thread_id = ?',
+                    [(e.guild_id, e.thread_id) for e in removed],
+                    guild_id=guild_id
+                )
+
+            logger.debug('Saved catalog of {}: {} written, {} removed', parent_id, len(changed), len(removed))
+
+        self.catalog[parent_id] = current
+
+    async def forget_catalog(
+            self,
+            parent_id: int,
+            thread_ids: list[int] | None = None,
+            *,
+            guild_id: int | None = None,
+            transaction: UnitOfWork | None = None
+    ) -> None:
+        """Drops catalog rows of a forum, every row unless ``thread_ids`` is given.
+
+        ``guild_id`` is only needed when sharded and the forum has nothing cataloged in memory.
+        """
+        entries = self.catalog.get(parent_id, {})
+        if guild_id is None and entries:
+            guild_id = next(iter(entries.values())).guild_id
+
+        async with self.db.transaction(transaction) as transaction:
+            if thread_ids is None:
+                self.catalog.pop(parent_id, None)
+
+                if guild_id is not None or self.shards is None:
+                    transaction.execute(
+                        'DELETE FROM catalog_threads WHERE parent_id = ?',
+                        (parent_id,),
+                        guild_id=guild_id
+                    )
+                return
+
+            removed = [entries.pop(thread_id) for thread_id in thread_ids if thread_id in entries]
+            transaction.executemany(
+                'DELETE FROM catalog_threads WHERE guild_id = ? AND thread_id = ?',
+                [(e.guild_id, e.thread_id) for e in removed],
+                guild_id=guild_id
+            )
 
     async def start_database(self):
         await self.db.startup()
 
+        if self.shards is not None and not self.shards.guild_ids():
+            row = await self.db.fetchone('SELECT COUNT(*) FROM accounts')
+            if row[0]:
+                raise RuntimeError(
+                    f'Database sharding is enabled but {self.database_filename} still holds the guild data, '
+                    f'run "python -m tools.split_database {self.database_filename} {self.shards.directory}" first'
+                )
+
     async def get_db_version(self) -> int:
-        async with self.db.conn() as conn:
-            pragma = await conn.execute('PRAGMA user_version')
-            pragma = await pragma.fetchall()
-            return pragma[0][0]
+        return await self.db.get_version()
+
+    async def backup_database(self) -> BackupResult:
+        """Takes an online backup into ``backup_dir`` and prunes all but the newest ``backup_keep`` backups.
+
+        When sharded the backup is a directory holding the main database and a ``shards`` folder.
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.database_filename))[0]
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+
+        if self.shards is not None:
+            result = await self._backup_shards(os.path.join(self.backup_dir, f'{stem}-{timestamp}'), stem)
+        else:
+            result = await self.db.backup(os.path.join(self.backup_dir, f'{stem}-{timestamp}.db'))
+
+        logger.info(
+            'Backed up database to {} ({} pages in {:.3f}s)',
+            result.path,
+            result.pages,
+            result.duration
+        )
+
+        backups = sorted(
+            f for f in os.listdir(self.backup_dir)
+            if f.startswith(f'{stem}-') and (f.endswith('.db') or os.path.isdir(os.path.join(self.backup_dir, f)))
+        )
+        # A backup_keep of 0 keeps every backup
+        if self.backup_keep > 0:
+            for old_backup in backups[:-self.backup_keep]:
+                path = os.path.join(self.backup_dir, old_backup)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+                logger.debug('Removed old backup {}', old_backup)
+
+        return result
+
+    async def _backup_shards(self, target: str, stem: str) -> BackupResult:
+        start = time.perf_counter()
+        os.makedirs(os.path.join(target, 'shards'))
+
+        main = await self.db.backup(os.path.join(target, f'{stem}.db'))
+        pages, steps = main.pages, main.steps
+
+        for guild_id in self.shards.guild_ids():
+            async with self.shards.shard(guild_id) as shard:
+                result = await shard.backup(os.path.join(target, 'shards', f'{guild_id}.db'))
+
+            pages += result.pages
+            steps += result.steps
+
+        return BackupResult(target, pages, steps, time.perf_counter() - start)
 
     async def load_db_item(self, table_name: str) -> dict[int, str]:
         items = {}
+        start = time.perf_counter()
 
-        async with self.db.conn() as conn:
-            async with conn.cursor() as cursor:
-                for row in await cursor.execute(f'SELECT * FROM {table_name}'):
-                    channel_id: int = row['channel_id']
-                    item_name: str = row['name']
+        for row in await self.db.fetchall(f'SELECT * FROM {table_name}'):
+            channel_id: int = row['channel_id']
+            item_name: str = row['name']
 
-                    items[channel_id] = item_name
+            items[channel_id] = item_name
 
-            return items
+        logger.info('Loaded {} rows from {} in {:.3f}s', len(items), table_name, time.perf_counter() - start)
+        return items
 
-    async def load_trusted_ids(self, guild_id: int) -> list[int]:
-        trusted_ids = []
-        async with self.db.conn() as conn:
-            async with conn.cursor() as cursor:
-                for row in await cursor.execute('SELECT * FROM trusted_ids WHERE guild_id = (?)', (guild_id,)):
-                    trusted_id: int = row['id']
-                    trusted_ids.append(trusted_id)
+    async def load_rows_by_guild(self, table_name: str) -> dict[int, list[sqlite3.Row]]:
+        """Reads the whole table in one query and groups its rows by guild_id, keeping insertion order"""
+        rows_by_guild = defaultdict(list)
+        start = time.perf_counter()
 
-        return trusted_ids
+        num_rows = 0
 
-    async def load_achievements(
-            self,
-            guild_info: GuildInfo
-    ) -> list[Achievement]:
-        achievements = []
-        roles = guild_info.roles
-        subalignments = guild_info.subalignments
-        factions = guild_info.factions
-        guild_id = guild_info.guild_id
-        async with self.db.conn() as conn:
-            async with conn.cursor() as cursor:
-                for row in await cursor.execute('SELECT * FROM achievements WHERE guild_id = (?)', (guild_id,)):
-                    achievement_id = row['id']
-                    achievement_name = row['name']
-                    achievement_description = row['description']
-                    achievement_role_id = row['role_id']
-                    achievement_subalignment_id = row['subalignment_id']
-                    achievement_faction_id = row['faction_id']
-
-                    achievement_role = [r for r in roles if r.id == achievement_role_id]
-                    achievement_subalignment = [s for s in subalignments if s.id == achievement_subalignment_id]
-                    achievement_faction = [f for f in factions if f.id == achievement_faction_id]
-
-                    achievements.append(
-                        Achievement(
-                            id=achievement_id,
-                            name=achievement_name,
-                            description=achievement_description,
-                            role=achievement_role[0] if achievement_role else None,
-                            subalignment=achievement_subalignment[0] if achievement_subalignment else None,
-                            faction=achievement_faction[0] if achievement_faction else None
-                        )
-                    )
+        async for row in self.db.iterate(f'SELECT * FROM {table_name} ORDER BY rowid'):
+            rows_by_guild[row['guild_id']].append(row)
+            num_rows += 1
+
+        logger.info(
+            'Loaded {} rows from {} for {} guilds in {:.3f}s',
+            num_rows,
+            table_name,
+            len(rows_by_guild),
+            time.perf_counter() - start
+        )
+        return rows_by_guild
+
+    async def load_tables_by_guild(self, *table_names: str) -> list[dict[int, list[sqlite3.Row]]]:
+        """Like :meth:`load_rows_by_guild` for several tables, each shard is opened once for all of them"""
+        if self.shards is None:
+            return [await self.load_rows_by_guild(table_name) for table_name in table_names]
+
+        tables = [{} for _ in table_names]
+        start = time.perf_counter()
+        guild_ids = self.shards.guild_ids()
+
+        for guild_id in guild_ids:
+            async with self.shards.shard(guild_id) as shard:
+                async with shard.conn() as conn:
+                    for rows_by_guild, table_name in zip(tables, table_names):
+                        rows = await conn.fetchall(f'SELECT * FROM {table_name} ORDER BY rowid')
+                        if rows:
+                            rows_by_guild[guild_id] = rows
+
+        logger.info(
+            'Loaded {} from {} shards in {:.3f}s',
+            ', '.join(table_names),
+            len(guild_ids),
+            time.perf_counter() - start
+        )
+        return tables
+
+    async def load_guild_rows(self, table_name: str, guild_id: int) -> list[sqlite3.Row]:
+        return await self.db.fetchall(
+            f'SELECT * FROM {table_name} WHERE guild_id = (?) ORDER BY rowid',
+            (guild_id,),
+            guild_id=guild_id
+        )
+
+    @staticmethod
+    def build_achievements(guild_info: GuildInfo, rows: list[sqlite3.Row]) -> list[Achievement]:
+        roles_by_id = {r.id: r for r in guild_info.roles}
+        subalignments_by_id = {s.id: s for s in guild_info.subalignments}
+        factions_by_id = {f.id: f for f in guild_info.factions}
+
+        return [
+            Achievement(
+                id=row['id'],
+                name=row['name'],
+                description=row['description'],
+                role=roles_by_id.get(row['role_id']),
+                subalignment=subalignments_by_id.get(row['subalignment_id']),
+                faction=factions_by_id.get(row['faction_id'])
+            ) for row in rows
+        ]
+
+    @staticmethod
+    def build_accounts(
+            guild_info: GuildInfo,
+            account_rows: list[sqlite3.Row],
+            scroll_rows: list[sqlite3.Row],
+            achievement_rows: list[sqlite3.Row]
+    ) -> list[Account]:
+        rsf_by_id = {i.id: i for i in guild_info.roles + guild_info.subalignments + guild_info.factions}
+        roles_by_id = {r.id: r for r in guild_info.roles}
+        achievements_by_id = {a.id: a for a in guild_info.achievements}
+        accounts: dict[int, Account] = {}
+
+        for row in account_rows:
+            accounts[row['user_id']] = Account(
+                id=row['user_id'],
+                num_wins=row['num_wins'],
+                num_loses=row['num_loses'],
+                num_draws=row['num_draws'],
+                blessed_scrolls=[],
+                cursed_scrolls=[],
+                accomplished_achievements=[]
+            )
+
+        for row in scroll_rows:
+            account = accounts.get(row['user_id'])
+            if not account:
+                continue
+
+            if row['scroll_type'] == 'blessed':
+                scroll = rsf_by_id.get(row['scroll_id'])
+                if scroll:
+                    account.blessed_scrolls.append(scroll)
+            else:
+                scroll = roles_by_id.get(row['scroll_id'])
+                if scroll:
+                    account.cursed_scrolls.append(scroll)
+
+        for row in achievement_rows:
+            account = accounts.get(row['user_id'])
+            achievement = achievements_by_id.get(row['achievement_id'])
+            if account and achievement:
+                account.accomplished_achievements.append(achievement)
+
+        return list(accounts.values())
+
+    @staticmethod
+    def build_catalog(guild_info: GuildInfo, entries: list[CatalogEntry]) -> tuple[list[Role], list[InfoTag]]:
+        factions_by_id = {f.id: f for f in guild_info.factions}
+        subalignments_by_id = {s.id: s for s in guild_info.subalignments}
+        categories_by_id = {c.id: c for c in guild_info.info_categories}
+        roles = []
+        info_tags = []
+
+        for entry in entries:
+            if entry.kind == 'role':
+                faction = factions_by_id.get(entry.parent_id)
+                subalignment = subalignments_by_id.get(entry.subalignment_id)
+                if faction and subalignment:
+                    forum_tags = guild_info.role_store.intern_tags(entry.tags)
+                    roles.append(Role(entry.name, entry.thread_id, faction, subalignment, forum_tags))
+            else:
+                info_category = categories_by_id.get(entry.parent_id)
+                if info_category:
+                    info_tags.append(InfoTag(name=entry.name, id=entry.thread_id, info_category=info_category))
+
+        return roles, info_tags
+
+    @staticmethod
+    def build_settings(rows: list[sqlite3.Row]) -> GuildSettings | None:
+        if not rows:
+            return None
+
+        row = rows[-1]
+        return GuildSettings(
+            max_scrolls=row['max_scrolls'],
+            roles_are_scrollable=bool(row['roles_are_scrollable']),
+            subalignments_are_scrollable=bool(row['subalignments_are_scrollable']),
+            factions_are_scrollable=bool(row['factions_are_scrollable']),
+            role_scroll_multiplier=row['role_scroll_multiplier'],
+            subalignment_scroll_multiplier=row['subalignment_scroll_multiplier'],
+            faction_scroll_multiplier=row['faction_scroll_multiplier'],
+            accounts_creatable=bool(row['accounts_creatable'])
+        )
 
-        return achievements
+    async def load_trusted_ids(self, guild_id: int) -> list[int]:
+        return [row['id'] for row in await self.load_guild_rows('trusted_ids', guild_id)]
+
+    async def load_achievements(self, guild_info: GuildInfo) -> list[Achievement]:
+        rows = await self.load_guild_rows('achievements', guild_info.guild_id)
+        return self.build_achievements(guild_info, rows)
 
     async def load_accounts(self, guild_info: GuildInfo) -> list[Account]:
-        accounts = []
-        rsf_list = guild_info.roles + guild_info.subalignments + guild_info.factions
-        logger.debug('Loading accounts for guild {}', guild_info.guild_id)
-
-        async with self.db.conn() as conn:
-            async with conn.cursor() as cursor:
-                for row in await cursor.execute('SELECT * FROM accounts WHERE guild_id = (?)', (guild_info.guild_id,)):
-                    logger.debug('Got row {}', row)
-                    account_id = row['user_id']
-                    account_wins = row['num_wins']
-                    account_losses = row['num_loses']
-                    account_draws = row['num_draws']
-                    account_blessed_scrolls = str(row['blessed_scrolls']).split(',')
-                    account_cursed_scrolls = str(row['cursed_scrolls']).split(',')
-                    account_achievements = str(row['accomplished_achievements']).split(',')
-
-                    blessed_scrolls = []
-                    for blessed_scroll in account_blessed_scrolls:
-                        if blessed_scroll:
-                            scroll_id = int(blessed_scroll)
-                            rsf = [r for r in rsf_list if r.id == scroll_id]
-                            if rsf:
-                                blessed_scrolls.append(rsf[0])
-
-                    cursed_scrolls = []
-                    for cursed_scroll in account_cursed_scrolls:
-                        if cursed_scroll:
-                            scroll_id = int(cursed_scroll)
-                            role = [r for r in guild_info.roles if r.id == scroll_id]
-                            if role:
-                                cursed_scrolls.append(role[0])
-
-                    achievements = []
-                    for achievement in account_achievements:
-                        if achievement:
-                            achievement_id = int(achievement)
-                            ach = [a for a in guild_info.achievements if a.id == achievement_id]
-                            if ach:
-                                achievements.append(ach[0])
-
-                    logger.debug('Loaded account: {}', account_id)
-
-                    accounts.append(
-                        Account(
-                            id=account_id,
-                            num_wins=account_wins,
-                            num_loses=account_losses,
-                            num_draws=account_draws,
-                            blessed_scrolls=blessed_scrolls,
-                            cursed_scrolls=cursed_scrolls,
-                            accomplished_achievements=achievements
-                        )
-                    )
+        guild_id = guild_info.guild_id
+        logger.debug('Loading accounts for guild {}', guild_id)
 
-                    logger.debug('Added account {} to list', account_id)
+        accounts = self.build_accounts(
+            guild_info,
+            await self.load_guild_rows('accounts', guild_id),
+            await self.load_guild_rows('account_scrolls', guild_id),
+            await self.load_guild_rows('account_achievements', guild_id)
+        )
 
-        logger.debug('Done loading accounts')
+        logger.debug('Loaded {} accounts', len(accounts))
         return accounts
 
     async def load_settings(self, guild_id: int) -> GuildSettings:
-        settings = None
-
-        async with self.db.conn() as conn:
-            async with conn.cursor() as cursor:
-                for row in await cursor.execute('SELECT * FROM guild_settings WHERE guild_id = (?)', (guild_id,)):
-                    settings = GuildSettings(
-                        max_scrolls=row['max_scrolls'],
-                        roles_are_scrollable=bool(row['roles_are_scrollable']),
-                        subalignments_are_scrollable=bool(row['subalignments_are_scrollable']),
-                        factions_are_scrollable=bool(row['factions_are_scrollable']),
-                        role_scroll_multiplier=row['role_scroll_multiplier'],
-                        subalignment_scroll_multiplier=row['subalignment_scroll_multiplier'],
-                        faction_scroll_multiplier=row['faction_scroll_multiplier'],
-                        accounts_creatable=bool(row['accounts_creatable'])
-                )
+        settings = self.build_settings(await self.load_guild_rows('guild_settings', guild_id))
 
         if not settings:
-            settings = GuildSettings(
-                max_scrolls=5,
-                roles_are_scrollable=True,
-                subalignments_are_scrollable=True,
-                factions_are_scrollable=True,
-                role_scroll_multiplier=10,
-                subalignment_scroll_multiplier=10,
-                faction_scroll_multiplier=10,
-                accounts_creatable=True
-            )
-
+            settings = GuildSettings.default()
             await self.add_settings_to_db(settings, guild_id)
 
         return settings
@@ -627,6 +1207,7 @@ class DiscordClient(Bot):
         self.guides = guides
 
     async def setup_hook(self):
+        await self.start_database()
         self.guild_task = self.loop.create_task(self.load_guild_info())
 
         for command in self.tree.get_commands():
@@ -647,100 +1228,286 @@ class DiscordClient(Bot):
 
     @logger.catch
     async def load_guild_info(self):
-        await self.start_database()
-
+        load_start = time.perf_counter()
         faction_data = await self.load_db_item('factions')
         subalignment_data = await self.load_db_item('subalignments')
         infotag_data = await self.load_db_item('infotags')
-
-        all_data: list[tuple[dict[int, str], type[S]]] = [
-            (faction_data, Faction),
-            (infotag_data, InfoCategory)
-        ]
+        trusted_id_rows, settings_rows, catalog_rows = await self.load_tables_by_guild(
+            'trusted_ids',
+            'guild_settings',
+            'catalog_threads'
+        )
 
         await self.wait_until_ready()
 
+        missing_settings: dict[int, GuildSettings] = {}
+        stale_catalog_parents: dict[int, int] = {}
+
         for guild in self.guilds:
-            forum_channels = [c for c in guild.channels if isinstance(c, discord.ForumChannel)]
-            compiled_classes = []
-
-            for forum_channel in forum_channels:
-                for data in all_data:
-                    if not data[0]:
-                        continue
-
-                    for channel_id, name in data[0].items():
-                        base_class = data[1]
-
-                        if forum_channel.id == channel_id:
-                            compiled_class: SDGObject = base_class(name, channel_id)
-                            compiled_classes.append(compiled_class)
-
-            factions = [f for f in compiled_classes if isinstance(f, Faction)]
-            subalignments = []
-
-            for faction in factions:
-                forum_channel = self.get_channel(faction.id)
-                for forum_tag in forum_channel.available_tags:
-                    for subalignment_channel, subalignment_name in subalignment_data.items():
-                        if forum_tag.id == subalignment_channel:
-                            subalignments.append(Subalignment(subalignment_name, subalignment_channel))
-
-            info_categories = [i for i in compiled_classes if isinstance(i, InfoCategory)]
-
-            trusted_ids = await self.load_trusted_ids(guild.id)
-            guild_settings = await self.load_settings(guild.id)
-
-            guild_info = GuildInfo(
-                guild_id=guild.id,
-                factions=factions,
-                subalignments=subalignments,
-                roles=[],
-                info_categories=info_categories,
-                info_tags=[],
-                trusted_ids=trusted_ids,
-                achievements=[],
-                accounts=[],
-                guild_settings=guild_settings
+            guild_settings = self.build_settings(settings_rows.get(guild.id))
+            if not guild_settings:
+                guild_settings = missing_settings[guild.id] = GuildSettings.default()
+
+            guild_info, stale_parents = self.build_guild_info(
+                guild,
+                faction_data,
+                subalignment_data,
+                infotag_data,
+                [row['id'] for row in trusted_id_rows.get(guild.id, [])],
+                guild_settings,
+                catalog_rows.get(guild.id, [])
             )
+            stale_catalog_parents.update(stale_parents)
 
             logger.debug('Loaded guild info: {}', guild_info)
 
-            self.guild_info.append(guild_info)
+            self.guild_info.add(guild_info)
+
+        await self.add_settings_bulk(missing_settings)
 
-        logger.debug('All guilds loaded: {}', [g.guild_id for g in self.guild_info])
+        for parent_id, guild_id in stale_catalog_parents.items():
+            await self.forget_catalog(parent_id, guild_id=guild_id)
+
+        logger.info(
+            'Loaded {} guilds in {:.3f}s with {} cataloged roles and infotags, created default settings for {}',
+            len(self.guild_info),
+            time.perf_counter() - load_start,
+            sum(len(entries) for entries in self.catalog.values()),
+            len(missing_settings)
+        )
+        self.observe_guilds()
         self.db_loaded = True
 
+    def build_guild_info(
+            self,
+            guild: discord.Guild,
+            faction_data: dict[int, str],
+            subalignment_data: dict[int, str],
+            infotag_data: dict[int, str],
+            trusted_ids: list[int],
+            guild_settings: GuildSettings,
+            catalog_rows: list[sqlite3.Row]
+    ) -> tuple[GuildInfo, dict[int, int]]:
+        """Builds a guild's GuildInfo without achievements and accounts, with the stale catalog parents found.
+
+        The stale parents are forums that were cataloged but aren't factions or infotag categories anymore,
+        mapped to their guild id for :meth:`forget_catalog`.
+        """
+        factions = []
+        info_categories = []
+        subalignments = []
+        stale_catalog_parents: dict[int, int] = {}
+
+        for channel in guild.channels:
+            if not isinstance(channel, discord.ForumChannel):
+                continue
+
+            if channel.id in faction_data:
+                factions.append(Faction(faction_data[channel.id], channel.id))
+
+            if channel.id in infotag_data:
+                info_categories.append(InfoCategory(infotag_data[channel.id], channel.id))
+
+        for faction in factions:
+            forum_channel = self.get_channel(faction.id)
+            for forum_tag in forum_channel.available_tags:
+                if forum_tag.id in subalignment_data:
+                    subalignments.append(Subalignment(subalignment_data[forum_tag.id], forum_tag.id))
+
+        guild_info = GuildInfo(
+            guild_id=guild.id,
+            factions=factions,
+            subalignments=subalignments,
+            roles=[],
+            info_categories=info_categories,
+            info_tags=[],
+            trusted_ids=trusted_ids,
+            achievements=[],
+            accounts=[],
+            guild_settings=guild_settings
+        )
+
+        catalog_parents = {f.id for f in factions} | {c.id for c in info_categories}
+        catalog_entries = []
+
+        for row in catalog_rows:
+            entry = CatalogEntry.from_row(row)
+            if entry.parent_id not in catalog_parents:
+                stale_catalog_parents[entry.parent_id] = entry.guild_id
+                continue
+
+            self.catalog.setdefault(entry.parent_id, {})[entry.thread_id] = entry
+            catalog_entries.append(entry)
+
+        guild_info.roles, guild_info.info_tags = self.build_catalog(guild_info, catalog_entries)
+        return guild_info, stale_catalog_parents
+
+    async def load_guild(self, guild: discord.Guild) -> GuildInfo:
+        """Loads a guild joined after startup. It starts hibernated, its accounts load on its first interaction"""
+        guild_info, stale_catalog_parents = self.build_guild_info(
+            guild,
+            await self.load_db_item('factions'),
+            await self.load_db_item('subalignments'),
+            await self.load_db_item('infotags'),
+            await self.load_trusted_ids(guild.id),
+            await self.load_settings(guild.id),
+            await self.load_guild_rows('catalog_threads', guild.id)
+        )
+
+        for parent_id, guild_id in stale_catalog_parents.items():
+            await self.forget_catalog(parent_id, guild_id=guild_id)
+
+        self.hibernated_guild_ids.add(guild.id)
+        snapshot = self.replace_guild_info(guild_info)
+        self.observe_guilds()
+        return snapshot
+
+    async def wake_guild(self, guild_id: int) -> GuildInfo | None:
+        """Marks the guild as active, loading its achievements and accounts back first if it's hibernated"""
+        self.guild_activity[guild_id] = time.monotonic()
+        if guild_id not in self.hibernated_guild_ids:
+            return self.get_guild_info(guild_id)
+
+        async with self._wake_locks.setdefault(guild_id, asyncio.Lock()):
+            # Another interaction may have woken it while this one waited
+            if guild_id in self.hibernated_guild_ids:
+                await self._load_hibernated_guild(guild_id)
+
+        return self.get_guild_info(guild_id)
+
+    async def _load_hibernated_guild(self, guild_id: int) -> None:
+        wake_start = time.perf_counter()
+
+        achievement_rows = await self.load_guild_rows('achievements', guild_id)
+        account_rows = await self.load_guild_rows('accounts', guild_id)
+        scroll_rows = await self.load_guild_rows('account_scrolls', guild_id)
+        award_rows = await self.load_guild_rows('account_achievements', guild_id)
+
+        if guild_id not in self.guild_info:
+            # Evicted while its rows loaded
+            return
+
+        with self.edit_guild_info(guild_id) as guild_info:
+            guild_info.achievements = self.build_achievements(guild_info, achievement_rows)
+            guild_info.accounts = self.build_accounts(guild_info, account_rows, scroll_rows, award_rows)
+
+        self.hibernated_guild_ids.discard(guild_id)
+        duration = time.perf_counter() - wake_start
+        observe_wake(duration)
+        self.observe_guilds()
+        logger.debug('Woke guild {} with {} accounts in {:.3f}s', guild_id, len(account_rows), duration)
+
+    def hibernate_guild(self, guild_id: int) -> None:
+        """Drops a guild's achievements, accounts and cached archived threads until an interaction wakes it"""
+        guild_info = self.get_guild_info(guild_id)
+        forum_ids = {f.id for f in guild_info.factions} | {c.id for c in guild_info.info_categories}
+
+        with self.edit_guild_info(guild_id) as guild_info:
+            guild_info.achievements = []
+            guild_info.accounts = []
+
+        # The next sync of the forums walks their archived threads again
+        self.populated_forum_ids -= forum_ids
+
+        guild = self.get_guild(guild_id)
+        if guild is not None:
+            for thread in guild.threads:
+                if thread.archived and thread.parent_id in forum_ids:
+                    guild._remove_thread(thread)
+
+        self.hibernated_guild_ids.add(guild_id)
+
+    def hibernate_idle_guilds(self) -> list[int]:
+        """Hibernates the guilds without an interaction in the last ``hibernate_after`` hours, returns their ids"""
+        now = time.monotonic()
+        hibernated = []
+
+        for guild_info in self.guild_info.copy():
+            guild_id = guild_info.guild_id
+            if guild_id in self.hibernated_guild_ids:
+                continue
+
+            # Guilds without an interaction since startup are idle from the first check
+            last_active = self.guild_activity.setdefault(guild_id, now)
+            if now - last_active >= self.hibernate_after * 3600:
+                self.hibernate_guild(guild_id)
+                hibernated.append(guild_id)
+
+        observe_hibernations(len(hibernated))
+        self.observe_guilds()
+        return hibernated
+
+    def evict_guild(self, guild_id: int) -> GuildInfo | None:
+        """Forgets a guild the bot left, its rows stay in the database in case it's added back"""
+        guild_info = self.guild_info.remove(guild_id)
+        self.hibernated_guild_ids.discard(guild_id)
+        self.guild_activity.pop(guild_id, None)
+        self._wake_locks.pop(guild_id, None)
+
+        if guild_info is None:
+            return None
+
+        forum_ids = {f.id for f in guild_info.factions} | {c.id for c in guild_info.info_categories}
+        self.populated_forum_ids -= forum_ids
+        for forum_id in forum_ids:
+            self.catalog.pop(forum_id, None)
+
+        observe_eviction()
+        self.observe_guilds()
+        return guild_info
+
+    def observe_guilds(self) -> None:
+        hibernated = len(self.hibernated_guild_ids)
+        observe_guilds(len(self.guild_info) - hibernated, hibernated)
+
     @logger.catch
     async def post_guild_info_load(self):
-        logger.debug('Available guilds: {}', [g.guild_id for g in self.guild_info])
+        load_start = time.perf_counter()
+        achievement_rows, account_rows, scroll_rows, account_achievement_rows = await self.load_tables_by_guild(
+            'achievements',
+            'accounts',
+            'account_scrolls',
+            'account_achievements'
+        )
+
         for guild_info in self.guild_info.copy():
-            logger.debug('Starting post info load for {}', guild_info.guild_id)
-            guild_info.achievements = await self.load_achievements(guild_info)
-            guild_info.accounts = await self.load_accounts(guild_info)
-            logger.debug('Loaded achievements and accounts for {}', guild_info.guild_id)
+            guild_id = guild_info.guild_id
+            if guild_id in self.hibernated_guild_ids:
+                continue
 
-            self.replace_guild_info(guild_info)
-            logger.debug('Done replacing guild {}', guild_info.guild_id)
-        logger.debug('Finished post guild info loads')
+            with self.edit_guild_info(guild_id) as guild_info:
+                guild_info.achievements = self.build_achievements(guild_info, achievement_rows.get(guild_id, []))
+                guild_info.accounts = self.build_accounts(
+                    guild_info,
+                    account_rows.get(guild_id, []),
+                    scroll_rows.get(guild_id, []),
+                    account_achievement_rows.get(guild_id, [])
+                )
 
-    @logger.catch
-    def replace_guild_info(self, guild_info: GuildInfo) -> None:
-        try:
-            self.guild_info.remove([gi for gi in self.guild_info if gi.guild_id == guild_info.guild_id][0])
-            logger.debug('Removed guild: {}', guild_info.guild_id)
-        except ValueError:
-            pass
+        logger.info(
+            'Loaded achievements and accounts for {} guilds in {:.3f}s',
+            len(self.guild_info),
+            time.perf_counter() - load_start
+        )
 
-        self.guild_info.append(guild_info)
-        logger.debug('Replaced guild: {}', guild_info.guild_id)
+    def replace_guild_info(self, guild_info: GuildInfo) -> GuildInfo:
+        snapshot = self.guild_info.add(guild_info)
+        logger.debug('Replaced guild: {} (version {})', snapshot.guild_id, snapshot.version)
+        return snapshot
 
-    def get_guild_info(self, guild_id: int) -> GuildInfo | None:
-        for guild_info in self.guild_info:
-            if guild_info.guild_id == guild_id:
-                return guild_info
+    @contextmanager
+    def edit_guild_info(self, guild_id: int) -> Iterator[GuildInfo]:
+        """Yields a draft of the guild's GuildInfo, published as its next version when the block exits.
 
-        return None
+        Nothing is published if the block raises. Avoid awaiting inside the block, a version of the
+        guild published meanwhile is merged with the draft, but what the block read from it is stale.
+        """
+        draft = self.get_guild_info(guild_id).edit()
+        yield draft
+        self.replace_guild_info(draft)
+
+    def get_guild_info(self, guild_id: int) -> GuildInfo | None:
+        return self.guild_info.get(guild_id)
 
     async def add_item_to_db(self, item: S, table_name: str):
         await self.db.execute(
@@ -751,13 +1518,17 @@ class DiscordClient(Bot):
             )
         )
 
-    async def delete_item_from_db(self, item: S, table_name: str):
-        await self.db.execute(
-            f'DELETE FROM {table_name} WHERE channel_id = (?)',
-            (
-                item.id,
+    async def delete_item_from_db(self, item: S, table_name: str, transaction: UnitOfWork | None = None):
+        async with self.db.transaction(transaction) as transaction:
+            transaction.execute(
+                f'DELETE FROM {table_name} WHERE channel_id = (?)',
+                (
+                    item.id,
+                )
             )
-        )
+
+            if table_name in ('factions', 'infotags'):
+                await self.forget_catalog(item.id, transaction=transaction)
 
     async def modify_item_in_db(self, item: S, table_name: str):
         await self.db.execute(
@@ -774,7 +1545,8 @@ class DiscordClient(Bot):
             (
                 trusted_id,
                 guild_id
-            )
+            ),
+            guild_id=guild_id
         )
 
     async def delete_trusted_id_in_db(self, trusted_id: int, guild_id: int):
@@ -783,7 +1555,8 @@ class DiscordClient(Bot):
             (
                 trusted_id,
                 guild_id
-            )
+            ),
+            guild_id=guild_id
         )
 
     async def add_achievement_to_db(self, achievement: Achievement, guild_id: int):
@@ -797,17 +1570,30 @@ class DiscordClient(Bot):
                 achievement.role.id if achievement.role else None,
                 achievement.subalignment.id if achievement.subalignment else None,
                 achievement.faction.id if achievement.faction else None
-            )
+            ),
+            guild_id=guild_id
         )
 
-    async def delete_achievement_from_db(self, achievement: Achievement, guild_id: int):
-        await self.db.execute(
-            'DELETE FROM achievements WHERE id = (?) AND guild_id = (?)',
-            (
-                achievement.id,
-                guild_id
+    async def delete_achievement_from_db(
+            self,
+            achievement: Achievement,
+            guild_id: int,
+            transaction: UnitOfWork | None = None
+    ) -> StatementResult:
+        """Deletes the achievement and every award of it, the returned result's rowcount is the number of awards"""
+        async with self.db.transaction(transaction) as transaction:
+            awards = transaction.execute(
+                'DELETE FROM account_achievements WHERE achievement_id = (?) AND guild_id = (?)',
+                (achievement.id, guild_id),
+                guild_id=guild_id
+            )
+            transaction.execute(
+                'DELETE FROM achievements WHERE id = (?) AND guild_id = (?)',
+                (achievement.id, guild_id),
+                guild_id=guild_id
             )
-        )
+
+        return awards
 
     async def modify_achievement_in_db(self, achievement: Achievement, guild_id: int):
         await self.db.execute(
@@ -826,77 +1612,235 @@ class DiscordClient(Bot):
                 achievement.faction.id if achievement.faction else None,
                 achievement.id,
                 guild_id
-            )
+            ),
+            guild_id=guild_id
+        )
+
+    @staticmethod
+    def _account_params(account: Account) -> tuple:
+        return (
+            account.num_wins,
+            account.num_loses,
+            account.num_draws
         )
 
+    @staticmethod
+    def _account_item_rows(account: Account, guild_id: int) -> tuple[list[tuple], list[tuple]]:
+        key = (guild_id, account.id)
+        scrolls = [key + (s.id, 'blessed') for s in account.blessed_scrolls]
+        scrolls += [key + (s.id, 'cursed') for s in account.cursed_scrolls]
+        achievements = [key + (a.id,) for a in account.accomplished_achievements]
+        return scrolls, achievements
+
     async def add_account_to_db(self, account: Account, guild_id: int):
         await self.db.execute(
-            'INSERT OR IGNORE INTO accounts VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-            (
-                account.id,
-                guild_id,
-                account.num_wins,
-                account.num_loses,
-                account.num_draws,
-                ','.join(str(s.id) for s in account.blessed_scrolls),
-                ','.join(str(s.id) for s in account.cursed_scrolls),
-                ','.join(str(s.id) for s in account.accomplished_achievements),
-            )
+            ACCOUNT_INSERT,
+            (account.id, guild_id) + self._account_params(account),
+            guild_id=guild_id
+        )
+
+    async def add_accounts_bulk(self, accounts: list[Account], guild_id: int):
+        await self.db.executemany(
+            ACCOUNT_INSERT,
+            ((a.id, guild_id) + self._account_params(a) for a in accounts),
+            guild_id=guild_id
         )
 
     async def delete_account_from_db(self, account: Account, guild_id: int):
+        async with self.db.conn(write=True, guild_id=guild_id) as conn:
+            async with conn.transaction():
+                for table_name in ('accounts', 'account_scrolls', 'account_achievements', 'game_results'):
+                    await conn.execute(
+                        f'DELETE FROM {table_name} WHERE user_id = (?) AND guild_id = (?)',
+                        (account.id, guild_id)
+                    )
+
+    async def modify_accounts_bulk(self, accounts: list[Account], guild_id: int, *, items: bool = False):
+        """Writes the accounts in one transaction, with ``items`` their scrolls and achievements are rewritten as well"""
+        async with self.db.conn(write=True, guild_id=guild_id) as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    ACCOUNT_UPDATE,
+                    [self._account_params(a) + (a.id, guild_id) for a in accounts]
+                )
+
+                if not items:
+                    return
+
+                scrolls = []
+                achievements = []
+                for account in accounts:
+                    account_scrolls, account_achievements = self._account_item_rows(account, guild_id)
+                    scrolls += account_scrolls
+                    achievements += account_achievements
+
+                keys = [(a.id, guild_id) for a in accounts]
+                await conn.executemany('DELETE FROM account_scrolls WHERE user_id = ? AND guild_id = ?', keys)
+                await conn.executemany('DELETE FROM account_achievements WHERE user_id = ? AND guild_id = ?', keys)
+                await conn.executemany(SCROLL_INSERT, scrolls)
+                await conn.executemany(ACHIEVEMENT_AWARD, achievements)
+
+    async def record_game(
+            self,
+            results: list[tuple[Account, str, int]],
+            guild_id: int,
+            *,
+            kind: str = 'game',
+            recorded_by: int | None = None
+    ) -> int | None:
+        """Appends a game or manual adjustment to the ledger and applies its ``(account, result, delta)`` rows
+        to the account counters in the same transaction. The accounts in memory should already include the deltas.
+        Every player of a game is written by this one transaction, so a game costs one commit however many played.
+
+        Returns the new game's id, or ``None`` if every delta was zero.
+        """
+        results = [r for r in results if r[2]]
+        if not results:
+            return None
+
+        now = int(time.time())
+        increments: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+        for account, result, delta in results:
+            increments[account.id][GAME_RESULTS.index(result)] += delta
+
+        async with self.db.conn(write=True, guild_id=guild_id) as conn:
+            async with conn.transaction():
+                cursor = await conn.execute(GAME_INSERT, (guild_id, kind, now, recorded_by))
+                game_id = cursor.get_cursor().lastrowid
+
+                await conn.executemany(
+                    GAME_RESULT_INSERT,
+                    [(game_id, guild_id, a.id, result, delta, kind, now) for a, result, delta in results]
+                )
+                await conn.executemany(
+                    ACCOUNT_INCREMENT,
+                    [tuple(deltas) + (user_id, guild_id) for user_id, deltas in increments.items()]
+                )
+
+        return game_id
+
+    async def game_stats(
+            self,
+            guild_id: int,
+            user_id: int,
+            *,
+            since: int | None = None,
+            until: int | None = None
+    ) -> dict[str, int]:
+        """Totals of the games a member played between two unix timestamps, manual adjustments aren't counted"""
+        rows = await self.db.fetchall(
+            'SELECT result, SUM(delta) AS total FROM game_results '
+            'WHERE guild_id = ? AND user_id = ? AND recorded_at >= ? AND recorded_at < ? AND kind = ? '
+            'GROUP BY result',
+            (guild_id, user_id, since or 0, until or 2 ** 62, 'game'),
+            guild_id=guild_id
+        )
+
+        stats = dict.fromkeys(GAME_RESULTS, 0)
+        stats.update({row['result']: row['total'] for row in rows})
+        return stats
+
+    async def rebuild_account_counters(self, guild_info: GuildInfo) -> int:
+        """Recomputes a guild's account counters from the ledger, returns how many accounts were corrected"""
+        guild_id = guild_info.guild_id
+
+        totals: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+        async for row in self.db.iterate(
+            'SELECT user_id, result, SUM(delta) AS total FROM game_results WHERE guild_id = ? GROUP BY user_id, result',
+            (guild_id,),
+            guild_id=guild_id
+        ):
+            totals[row['user_id']][GAME_RESULTS.index(row['result'])] = row['total']
+
+        corrected = []
+        for account in guild_info.accounts:
+            num_wins, num_loses, num_draws = totals.get(account.id, (0, 0, 0))
+            if (account.num_wins, account.num_loses, account.num_draws) != (num_wins, num_loses, num_draws):
+                account.num_wins, account.num_loses, account.num_draws = num_wins, num_loses, num_draws
+                corrected.append(account)
+
+        if corrected:
+            await self.modify_accounts_bulk(corrected, guild_id)
+
+        return len(corrected)
+
+    async def add_scroll_to_db(
+            self,
+            account: Account,
+            scroll: Role | Subalignment | Faction,
+            scroll_type: str,
+            guild_id: int
+    ):
+        await self.db.execute(SCROLL_INSERT, (guild_id, account.id, scroll.id, scroll_type), guild_id=guild_id)
+
+    async def delete_scroll_from_db(self, account: Account, scroll: Role | Subalignment | Faction, guild_id: int):
         await self.db.execute(
-            'DELETE FROM accounts WHERE user_id = (?) AND guild_id = (?)',
-            (
-                account.id,
-                guild_id
-            )
+            'DELETE FROM account_scrolls WHERE guild_id = ? AND user_id = ? AND scroll_id = ?',
+            (guild_id, account.id, scroll.id),
+            guild_id=guild_id
         )
 
-    async def modify_account_in_db(self, account: Account, guild_id: int):
+    async def award_achievement_in_db(self, achievement: Achievement, account: Account, guild_id: int):
+        await self.db.execute(ACHIEVEMENT_AWARD, (guild_id, account.id, achievement.id), guild_id=guild_id)
+
+    async def unaward_achievement_in_db(self, achievement: Achievement, account: Account, guild_id: int):
         await self.db.execute(
-            'UPDATE accounts SET '
-            'num_wins = ?, '
-            'num_loses = ?, '
-            'num_draws = ?, '
-            'blessed_scrolls = ?, '
-            'cursed_scrolls = ?, '
-            'accomplished_achievements = ? '
-            'WHERE user_id = ? AND guild_id = ?',
-            (
-                account.num_wins,
-                account.num_loses,
-                account.num_draws,
-                ','.join(str(s.id) for s in account.blessed_scrolls),
-                ','.join(str(s.id) for s in account.cursed_scrolls),
-                ','.join(str(s.id) for s in account.accomplished_achievements),
-                account.id,
-                guild_id
-            )
+            'DELETE FROM account_achievements WHERE guild_id = ? AND user_id = ? AND achievement_id = ?',
+            (guild_id, account.id, achievement.id),
+            guild_id=guild_id
+        )
+
+    async def award_achievement_bulk(self, achievement: Achievement, accounts: list[Account], guild_id: int):
+        """Awards the achievement to every account in one transaction, accounts that already have it are skipped"""
+        await self.db.executemany(
+            ACHIEVEMENT_AWARD,
+            ((guild_id, a.id, achievement.id) for a in accounts),
+            guild_id=guild_id
+        )
+
+    async def count_achievement_holders(self, achievement: Achievement, guild_id: int) -> int:
+        row = await self.db.fetchone(
+            'SELECT COUNT(*) FROM account_achievements WHERE guild_id = ? AND achievement_id = ?',
+            (guild_id, achievement.id),
+            guild_id=guild_id
+        )
+        return row[0]
+
+    @staticmethod
+    def _settings_params(settings: GuildSettings, guild_id: int) -> tuple:
+        return (
+            guild_id,
+            settings.max_scrolls,
+            settings.roles_are_scrollable,
+            settings.factions_are_scrollable,
+            settings.subalignments_are_scrollable,
+            settings.role_scroll_multiplier,
+            settings.subalignment_scroll_multiplier,
+            settings.faction_scroll_multiplier,
+            settings.accounts_creatable
         )
 
     async def add_settings_to_db(self, settings: GuildSettings, guild_id: int) -> None:
-        await self.db.execute(
-            'INSERT OR IGNORE INTO guild_settings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
-            (
-                guild_id,
-                settings.max_scrolls,
-                settings.roles_are_scrollable,
-                settings.factions_are_scrollable,
-                settings.subalignments_are_scrollable,
-                settings.role_scroll_multiplier,
-                settings.subalignment_scroll_multiplier,
-                settings.faction_scroll_multiplier,
-                settings.accounts_creatable
+        await self.db.execute(SETTINGS_INSERT, self._settings_params(settings, guild_id), guild_id=guild_id)
+
+    async def add_settings_bulk(self, settings: dict[int, GuildSettings]) -> None:
+        if self.shards is None:
+            await self.db.executemany(
+                SETTINGS_INSERT,
+                (self._settings_params(s, guild_id) for guild_id, s in settings.items())
             )
-        )
+            return
+
+        for guild_id, guild_settings in settings.items():
+            await self.add_settings_to_db(guild_settings, guild_id)
 
     async def delete_settings_from_db(self, guild_id: int):
         await self.db.execute(
             'DELETE FROM guild_settings WHERE guild_id = (?)',
             (
                 guild_id
-            )
+            ),
+            guild_id=guild_id
         )
 
     async def modify_settings_in_db(self, settings: GuildSettings, guild_id: int):
@@ -921,7 +1865,8 @@ class DiscordClient(Bot):
                 settings.faction_scroll_multiplier,
                 settings.accounts_creatable,
                 guild_id
-            )
+            ),
+            guild_id=guild_id
         )
 
 @dataclass(slots=True)
@@ -948,7 +1893,121 @@ class InfoTag(SDGObject):
 class Role(SDGObject):
     faction: Faction
     subalignment: Subalignment
-    forum_tags: set[str] | None = None
+    # Interned by the guild's RoleStore, roles with the same tags share one frozenset
+    forum_tags: frozenset[str] | set[str] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PartialRole:
+    """The compact form of a Role that rolelists filter, equal and hashed by the role's id.
+
+    Its forum tags and subalignment name are bits of ``tag_mask``, numbered by ``store``.
+    """
+
+    id: int
+    name: str = field(compare=False)
+    faction_id: int = field(compare=False)
+    faction_name: str = field(compare=False)
+    subalignment_id: int = field(compare=False)
+    tag_mask: int = field(compare=False)
+    store: RoleStore = field(compare=False, repr=False)
+
+    def __deepcopy__(self, memo) -> PartialRole:
+        return self
+
+    def to_role(self, full_roles: list[Role]) -> Role:
+        if isinstance(full_roles, IdIndexedList):
+            role = full_roles.get(self.id)
+        else:
+            role = next((r for r in full_roles if r.id == self.id), None)
+
+        if role is None:
+            raise SDGException(f'Unable to convert partial role {self.name} to full role')
+
+        return role
+
+
+class RoleStore:
+    """A guild's interned forum tags and the PartialRole form of its roles.
+
+    Tags are numbered the first time they're seen, so a role's tags and subalignment name fit in
+    one int bitmask. The store only grows, every version of the guild's GuildInfo shares it.
+    """
+
+    __slots__ = ('_tag_bits', '_tag_sets', '_masks', '_partials')
+
+    def __init__(self):
+        self._tag_bits: dict[str, int] = {}
+        self._tag_sets: dict[frozenset[str], frozenset[str]] = {}
+        self._masks: dict[tuple[frozenset[str], str], int] = {}
+        self._partials: dict[int, tuple[Role, PartialRole]] = {}
+
+    def __deepcopy__(self, memo) -> RoleStore:
+        return self
+
+    @property
+    def tag_count(self) -> int:
+        return len(self._tag_bits)
+
+    def intern_tags(self, tags: Iterable[str]) -> frozenset[str]:
+        """Lowercases ``tags``, returning the frozenset shared by every role with the same tags"""
+        tags = frozenset(sys.intern(t.lower()) for t in tags)
+        return self._tag_sets.setdefault(tags, tags)
+
+    def tag_bit(self, tag: str, *, add: bool = True) -> int:
+        """The bit of ``tag``, compared lowercased and stripped. Unknown tags are 0 if ``add`` is False"""
+        key = tag.lower().strip()
+        bit = self._tag_bits.get(key)
+        if bit is None:
+            if not add:
+                return 0
+
+            bit = self._tag_bits[sys.intern(key)] = 1 << len(self._tag_bits)
+
+        return bit
+
+    def tag_mask(self, role: Role) -> int:
+        forum_tags = role.forum_tags or frozenset()
+        if not isinstance(forum_tags, frozenset):
+            forum_tags = self.intern_tags(forum_tags)
+
+        key = (forum_tags, role.subalignment.name)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self.tag_bit(role.subalignment.name)
+            for tag in forum_tags:
+                mask |= self.tag_bit(tag)
+
+            self._masks[key] = mask
+
+        return mask
+
+    def partial(self, role: Role) -> PartialRole:
+        cached = self._partials.get(role.id)
+        if cached is not None and cached[0] is role:
+            return cached[1]
+
+        partial = PartialRole(
+            role.id,
+            role.name,
+            role.faction.id,
+            role.faction.name,
+            role.subalignment.id,
+            self.tag_mask(role),
+            self
+        )
+        self._partials[role.id] = (role, partial)
+        return partial
+
+    def partial_roles(self, roles: Iterable[Role]) -> set[PartialRole]:
+        partials = {self.partial(r) for r in roles}
+
+        # Roles that were deleted or replaced are only dropped once they outnumber the live ones
+        if len(self._partials) > 2 * len(partials) + 64:
+            live_ids = {p.id for p in partials}
+            self._partials = {i: cached for i, cached in self._partials.items() if i in live_ids}
+
+        return partials
 
 
 @dataclass(slots=True)
@@ -983,9 +2042,328 @@ class GuildSettings:
     faction_scroll_multiplier: int
     accounts_creatable: bool
 
+    @classmethod
+    def default(cls) -> GuildSettings:
+        return cls(
+            max_scrolls=5,
+            roles_are_scrollable=True,
+            subalignments_are_scrollable=True,
+            factions_are_scrollable=True,
+            role_scroll_multiplier=10,
+            subalignment_scroll_multiplier=10,
+            faction_scroll_multiplier=10,
+            accounts_creatable=True
+        )
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    """The last seen state of a role or infotag thread, persisted so roles are available before forums are synced"""
+    thread_id: int
+    guild_id: int
+    parent_id: int
+    kind: str
+    name: str
+    subalignment_id: int | None
+    tags: tuple[str, ...]
+    archived: bool
+    last_seen: int = field(default_factory=lambda: int(time.time()), compare=False)
+
+    @classmethod
+    def from_thread(
+            cls,
+            thread: discord.Thread,
+            kind: str,
+            *,
+            subalignment_id: int | None = None,
+            tags: set[str] | None = None
+    ) -> CatalogEntry:
+        return cls(
+            thread_id=thread.id,
+            guild_id=thread.guild.id,
+            parent_id=thread.parent_id,
+            kind=kind,
+            name=thread.name,
+            subalignment_id=subalignment_id,
+            tags=tuple(sorted(tags or ())),
+            archived=thread.archived
+        )
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> CatalogEntry:
+        return cls(
+            thread_id=row['thread_id'],
+            guild_id=row['guild_id'],
+            parent_id=row['parent_id'],
+            kind=row['kind'],
+            name=row['name'],
+            subalignment_id=row['subalignment_id'],
+            tags=tuple(json.loads(row['tags'] or '[]')),
+            archived=bool(row['archived']),
+            last_seen=row['last_seen']
+        )
+
+    def params(self) -> tuple:
+        return (
+            self.thread_id,
+            self.guild_id,
+            self.parent_id,
+            self.kind,
+            self.name,
+            self.subalignment_id,
+            json.dumps(self.tags),
+            self.archived,
+            self.last_seen
+        )
+
+
+class SnapshotList(list):
+    """A list that's frozen once its GuildInfo is published, changing a frozen list raises TypeError.
+
+    :meth:`copy` gives an unfrozen copy to change in a draft.
+    """
+
+    __slots__ = ('_frozen',)
+
+    def __init__(self, items: Iterable = ()):
+        super().__init__(items)
+        self._frozen = False
+
+    def __reduce_ex__(self, protocol):
+        # copy and deepcopy would otherwise rebuild the list without calling __init__
+        return type(self), (list(self),)
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> None:
+        self._frozen = True
+
+    def copy(self):
+        new = type(self).__new__(type(self))
+        list.extend(new, self)
+        new._frozen = False
+        new._copy_index(self)
+        return new
+
+    def _copy_index(self, source) -> None:
+        pass
+
+    def _check_mutable(self) -> None:
+        if self._frozen:
+            raise TypeError('Published GuildInfo snapshots can\'t be changed, edit a draft of them instead')
+
+    def _changed(self) -> None:
+        pass
+
+    def append(self, item) -> None:
+        self._check_mutable()
+        super().append(item)
+
+    def extend(self, items: Iterable) -> None:
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items: Iterable):
+        self.extend(items)
+        return self
+
+    def _mutator(name: str):
+        method = getattr(list, name)
+
+        def mutate(self, *args, **kwargs):
+            self._check_mutable()
+            result = method(self, *args, **kwargs)
+            self._changed()
+            return result
+
+        mutate.__name__ = name
+        return mutate
+
+    insert = _mutator('insert')
+    remove = _mutator('remove')
+    pop = _mutator('pop')
+    clear = _mutator('clear')
+    sort = _mutator('sort')
+    reverse = _mutator('reverse')
+    __setitem__ = _mutator('__setitem__')
+    __delitem__ = _mutator('__delitem__')
+    __imul__ = _mutator('__imul__')
+    del _mutator
+
+
+class IdIndexedList(SnapshotList):
+    """A list of objects with an ``id`` that keeps an id to object map, so ``get`` is O(1).
+
+    Appends update the map in place, every other mutation rebuilds it. Items' ids must not change
+    while they're in the list. Like a scan of the list, the first item with an id wins.
+    """
+
+    __slots__ = ('_by_id',)
+
+    def __init__(self, items: Iterable = ()):
+        super().__init__(items)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._by_id = {}
+        for item in self:
+            self._by_id.setdefault(item.id, item)
+
+    def _changed(self) -> None:
+        self._reindex()
+
+    def _copy_index(self, source: IdIndexedList) -> None:
+        self._by_id = source._by_id.copy()
+
+    def get(self, id_: int):
+        return self._by_id.get(id_)
+
+    def append(self, item) -> None:
+        SnapshotList.append(self, item)
+        self._by_id.setdefault(item.id, item)
+
+
+def _copy_buckets(index: dict[Any, dict[int, Any]]) -> dict[Any, dict[int, Any]]:
+    return defaultdict(dict, {key: bucket.copy() for key, bucket in index.items()})
+
+
+def name_key(name: str) -> str:
+    """How names are compared when they're resolved from user input"""
+    return name.casefold()
+
+
+class NamedIndexedList(IdIndexedList):
+    """An IdIndexedList that also maps :func:`name_key` of the items' names to them, for ``get_by_name``.
+
+    Items' names must not change while they're in the list. The first item with a name wins.
+    """
+
+    __slots__ = ('_by_name',)
+
+    def _reindex(self) -> None:
+        IdIndexedList._reindex(self)
+        self._by_name: dict[str, dict[int, Any]] = defaultdict(dict)
+        for item in self:
+            self._by_name[name_key(item.name)].setdefault(item.id, item)
+
+    def _copy_index(self, source: NamedIndexedList) -> None:
+        IdIndexedList._copy_index(self, source)
+        self._by_name = _copy_buckets(source._by_name)
+
+    def append(self, item) -> None:
+        IdIndexedList.append(self, item)
+        self._by_name[name_key(item.name)].setdefault(item.id, item)
+
+    def get_by_name(self, name: str):
+        bucket = self._by_name.get(name_key(name))
+        return next(iter(bucket.values())) if bucket else None
+
+
+class RoleList(NamedIndexedList):
+    """A NamedIndexedList of roles that also indexes them by faction, subalignment and forum tag.
+
+    Appends, removes and :meth:`replace_faction` only touch the index entries of the roles they change.
+    Role ids are thread ids, so they're assumed to be unique within the list.
+    """
+
+    __slots__ = ('_by_faction', '_by_subalignment', '_by_tag')
+
+    def _reindex(self) -> None:
+        IdIndexedList._reindex(self)
+        self._by_name: dict[str, dict[int, Role]] = defaultdict(dict)
+        self._by_faction: dict[int, dict[int, Role]] = defaultdict(dict)
+        self._by_subalignment: dict[int, dict[int, Role]] = defaultdict(dict)
+        self._by_tag: dict[str, dict[int, Role]] = defaultdict(dict)
+
+        for role in self:
+            self._index(role)
+
+    def _copy_index(self, source: RoleList) -> None:
+        IdIndexedList._copy_index(self, source)
+        self._by_name = _copy_buckets(source._by_name)
+        self._by_faction = _copy_buckets(source._by_faction)
+        self._by_subalignment = _copy_buckets(source._by_subalignment)
+        self._by_tag = _copy_buckets(source._by_tag)
+
+    def _index_keys(self, role: Role):
+        yield self._by_name, name_key(role.name)
+        yield self._by_faction, role.faction.id
+        yield self._by_subalignment, role.subalignment.id
+        for tag in role.forum_tags or ():
+            yield self._by_tag, tag.lower()
+
+    def _index(self, role: Role) -> None:
+        for index, key in self._index_keys(role):
+            index[key][role.id] = role
+
+    def _unindex(self, role: Role) -> None:
+        if self._by_id.get(role.id) is role:
+            del self._by_id[role.id]
+
+        for index, key in self._index_keys(role):
+            bucket = index.get(key)
+            if bucket and bucket.get(role.id) is role:
+                del bucket[role.id]
+                if not bucket:
+                    del index[key]
+
+    def append(self, role: Role) -> None:
+        IdIndexedList.append(self, role)
+        self._index(role)
+
+    def remove(self, role: Role) -> None:
+        self._check_mutable()
+        position = self.index(role)
+        removed = self[position]
+        list.__delitem__(self, position)
+        self._unindex(removed)
+
+    def replace_faction(self, faction_id: int, roles: Iterable[Role]) -> None:
+        """Swaps one faction's roles for ``roles``, which are moved to the end of the list"""
+        self._check_mutable()
+        for role in list(self._by_faction.get(faction_id, {}).values()):
+            self._unindex(role)
+
+        list.__setitem__(self, slice(None), [r for r in self if r.faction.id != faction_id])
+        self.extend(roles)
+
+    def faction_roles(self, faction_id: int) -> list[Role]:
+        return list(self._by_faction.get(faction_id, {}).values())
+
+    def subalignment_roles(self, subalignment_id: int) -> list[Role]:
+        return list(self._by_subalignment.get(subalignment_id, {}).values())
+
+    def tagged_roles(self, tag: str) -> list[Role]:
+        return list(self._by_tag.get(tag.strip().lower(), {}).values())
+
+
+# GuildInfo list types, assigning a plain or frozen list to one of these fields wraps or copies it
+_GUILD_LIST_FIELDS = {
+    'factions': NamedIndexedList,
+    'subalignments': NamedIndexedList,
+    'roles': RoleList,
+    'info_categories': IdIndexedList,
+    'info_tags': NamedIndexedList,
+    'trusted_ids': SnapshotList,
+    'achievements': IdIndexedList,
+    'accounts': IdIndexedList
+}
+# What a draft copies from its snapshot the first time the field is accessed
+_DRAFT_COPIED_FIELDS = frozenset(_GUILD_LIST_FIELDS) | {'subalignment_factions'}
+
 
 @dataclass(slots=True)
 class GuildInfo:
+    """A guild's loaded data, immutable once published through the GuildRegistry.
+
+    Published snapshots have a ``version`` that increases with every publish of the guild, so
+    ``(guild_id, version)`` can key caches of anything derived from them. Change a guild with
+    :meth:`DiscordClient.edit_guild_info`, or :meth:`edit` and ``replace_guild_info``.
+    Accounts are the exception, they're records changed in place and shared between versions.
+    """
+
     guild_id: int
     factions: list[Faction]
     subalignments: list[Subalignment]
@@ -996,14 +2374,56 @@ class GuildInfo:
     achievements: list[Achievement]
     accounts: list[Account]
     guild_settings: GuildSettings
+    # Only grows, so it's shared by every version of the guild
+    role_store: RoleStore = field(default_factory=RoleStore, repr=False, compare=False)
+    # Subalignment id -> id of the faction whose forum has the subalignment's tag. A memo of the forums,
+    # so unlike the rest of a snapshot it can be filled in after it's published
+    subalignment_factions: dict[int, int] = field(default_factory=dict, repr=False, compare=False)
+    version: int = field(default=0, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self.published:
+            raise TypeError('Published GuildInfo snapshots can\'t be changed, edit a draft of them instead')
+
+        list_type = _GUILD_LIST_FIELDS.get(name)
+        if list_type is not None:
+            if not isinstance(value, list_type):
+                value = list_type(value)
+            elif value.frozen:
+                value = value.copy()
+
+        object.__setattr__(self, name, value)
+
+    @property
+    def published(self) -> bool:
+        # version isn't set yet while __init__ assigns the other fields
+        return getattr(self, 'version', 0) > 0
+
+    def edit(self) -> GuildInfo:
+        """A draft of this GuildInfo, it copies the lists it changes instead of changing the snapshot's"""
+        return GuildInfoDraft.from_snapshot(self)
+
+    def publish(self, version: int) -> GuildInfo:
+        """Freezes this GuildInfo's lists and returns it as a snapshot with ``version``.
+
+        Unpublished GuildInfo objects become the snapshot, drafts and published snapshots are
+        republished as a new object sharing their lists.
+        """
+        if type(self) is GuildInfo and not self.published:
+            snapshot = self
+        else:
+            snapshot = object.__new__(GuildInfo)
+            for name in _GUILD_INFO_FIELDS:
+                object.__setattr__(snapshot, name, object.__getattribute__(self, name))
 
-    def _get_item_by_id(self, attribute: str, id_:  int) -> type[S] | None:
-        items = getattr(self, attribute)
-        for item in items:
-            if item.id == id_:
-                return item
+        for name in _GUILD_LIST_FIELDS:
+            object.__getattribute__(snapshot, name).freeze()
+
+        object.__setattr__(snapshot, 'version', version)
+        return snapshot
 
-        return None
+    def _get_item_by_id(self, attribute: str, id_:  int) -> type[S] | None:
+        return getattr(self, attribute).get(id_)
 
     def get_role(self, id_:  int) -> Role | None:
         return self._get_item_by_id('roles', id_)
@@ -1026,6 +2446,197 @@ class GuildInfo:
     def get_account(self, id_: int) -> Account | None:
         return self._get_item_by_id('accounts', id_)
 
+    def get_faction_by_name(self, name: str) -> Faction | None:
+        return self.factions.get_by_name(name)
+
+    def get_subalignment_by_name(self, name: str) -> Subalignment | None:
+        return self.subalignments.get_by_name(name)
+
+    def get_role_by_name(self, name: str) -> Role | None:
+        return self.roles.get_by_name(name)
+
+    def get_info_tag_by_name(self, name: str) -> InfoTag | None:
+        return self.info_tags.get_by_name(name)
+
+    def get_faction_roles(self, faction_id: int) -> list[Role]:
+        return self.roles.faction_roles(faction_id)
+
+    def get_subalignment_roles(self, subalignment_id: int) -> list[Role]:
+        return self.roles.subalignment_roles(subalignment_id)
+
+    def get_tagged_roles(self, tag: str) -> list[Role]:
+        return self.roles.tagged_roles(tag)
+
+    def get_subalignment_faction(self, subalignment_id: int) -> Faction | None:
+        faction_id = self.subalignment_factions.get(subalignment_id)
+        return None if faction_id is None else self.get_faction(faction_id)
+
+    def set_faction_subalignments(self, faction_id: int, subalignment_ids: Iterable[int]) -> None:
+        """Replaces the subalignments indexed under a faction, an empty iterable forgets the faction"""
+        for subalignment_id in [s for s, f in self.subalignment_factions.items() if f == faction_id]:
+            del self.subalignment_factions[subalignment_id]
+
+        for subalignment_id in subalignment_ids:
+            self.subalignment_factions[subalignment_id] = faction_id
+
+
+_GUILD_INFO_FIELDS = tuple(f.name for f in fields(GuildInfo))
+
+
+def _merge_list_changes(base: list, changed: list, current: list) -> list:
+    """Applies the difference between ``base`` and ``changed`` to ``current``.
+
+    Items with an ``id`` are matched by it, and count as changed when the object was replaced.
+    Other items (trusted ids) are matched by value.
+    """
+    if not isinstance(base, IdIndexedList):
+        removed = set(base) - set(changed)
+        kept = [i for i in current if i not in removed]
+        kept_set = set(kept)
+        return kept + [i for i in changed if i not in kept_set and i not in base]
+
+    base_by_id = {item.id: item for item in base}
+    changed_ids = {item.id for item in changed}
+    removed = base_by_id.keys() - changed_ids
+    replaced = {item.id: item for item in changed if base_by_id.get(item.id) is not item}
+
+    merged = []
+    for item in current:
+        if item.id in removed:
+            continue
+
+        merged.append(replaced.pop(item.id, item))
+
+    return merged + list(replaced.values())
+
+
+class GuildInfoDraft(GuildInfo):
+    """An unpublished copy of a GuildInfo snapshot, from :meth:`GuildInfo.edit`.
+
+    It shares the snapshot's lists until one is accessed, then copies it, so edits don't show up
+    in the snapshot and untouched lists (like a big guild's accounts) aren't copied.
+    """
+
+    __slots__ = ('base_version', '_base', '_copied')
+
+    @classmethod
+    def from_snapshot(cls, snapshot: GuildInfo) -> GuildInfoDraft:
+        draft = object.__new__(cls)
+        for name in _GUILD_INFO_FIELDS:
+            object.__setattr__(draft, name, object.__getattribute__(snapshot, name))
+
+        object.__setattr__(draft, 'version', 0)
+        object.__setattr__(draft, 'base_version', snapshot.version)
+        object.__setattr__(draft, '_base', snapshot)
+        object.__setattr__(draft, '_copied', set())
+        return draft
+
+    def rebase(self, snapshot: GuildInfo) -> GuildInfoDraft:
+        """A draft of ``snapshot`` with this draft's changes to the snapshot it was made from applied.
+
+        Lists are merged by item: items this draft added, replaced or removed are added, replaced or
+        removed in ``snapshot``'s list, the rest of its items are kept. Other changed fields overwrite it.
+        """
+        base = object.__getattribute__(self, '_base')
+        rebased = GuildInfoDraft.from_snapshot(snapshot)
+
+        for name in _GUILD_INFO_FIELDS:
+            if name == 'version':
+                continue
+
+            value = object.__getattribute__(self, name)
+            base_value = object.__getattribute__(base, name)
+            if value is base_value:
+                continue
+
+            if name in _GUILD_LIST_FIELDS:
+                setattr(rebased, name, _merge_list_changes(base_value, value, getattr(rebased, name)))
+            elif name == 'subalignment_factions':
+                merged = getattr(rebased, name)
+                for key in base_value.keys() - value.keys():
+                    merged.pop(key, None)
+                merged.update({k: v for k, v in value.items() if base_value.get(k) != v})
+            elif value != base_value:
+                setattr(rebased, name, value)
+
+        return rebased
+
+    def __getattribute__(self, name: str) -> Any:
+        value = object.__getattribute__(self, name)
+        if name in _DRAFT_COPIED_FIELDS:
+            copied = object.__getattribute__(self, '_copied')
+            if name not in copied:
+                value = value.copy()
+                object.__setattr__(self, name, value)
+                copied.add(name)
+
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        GuildInfo.__setattr__(self, name, value)
+        if name in _DRAFT_COPIED_FIELDS:
+            self._copied.add(name)
+
+
+class GuildRegistry:
+    """Every loaded GuildInfo keyed by guild id, iterating it yields the GuildInfo objects.
+
+    :meth:`add` publishes the GuildInfo it's given, so the registry only ever holds frozen snapshots
+    and swapping one is a single dict assignment.
+    """
+
+    __slots__ = ('_guilds',)
+
+    def __init__(self, guild_infos: Iterable[GuildInfo] = ()):
+        self._guilds: dict[int, GuildInfo] = {}
+        for guild_info in guild_infos:
+            self.add(guild_info)
+
+    def __iter__(self) -> Iterator[GuildInfo]:
+        return iter(self._guilds.values())
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._guilds
+
+    def get(self, guild_id: int | None) -> GuildInfo | None:
+        return self._guilds.get(guild_id)
+
+    def add(self, guild_info: GuildInfo) -> GuildInfo:
+        """Publishes the guild as its next version, replacing the snapshot already registered for it.
+
+        Adding a snapshot that's already published republishes the current one, for accounts changed in place.
+        A draft of an older version is rebased onto the current one, see :meth:`GuildInfoDraft.rebase`.
+        """
+        current = self._guilds.get(guild_info.guild_id)
+        version = current.version + 1 if current is not None else 1
+
+        if guild_info.published and current is not None:
+            guild_info = current
+        elif isinstance(guild_info, GuildInfoDraft) and current is not None:
+            if guild_info.base_version != current.version:
+                # Another version was published since the draft was made, keep both of their changes
+                logger.debug(
+                    'Rebasing guild {} draft from version {} onto version {}',
+                    guild_info.guild_id,
+                    guild_info.base_version,
+                    current.version
+                )
+                guild_info = guild_info.rebase(current)
+
+        snapshot = guild_info.publish(version)
+        self._guilds[snapshot.guild_id] = snapshot
+        return snapshot
+
+    def remove(self, guild_id: int) -> GuildInfo | None:
+        return self._guilds.pop(guild_id, None)
+
+    def copy(self) -> list[GuildInfo]:
+        """A snapshot of the registered guilds that's safe to iterate while guilds are replaced"""
+        return list(self._guilds.values())
+
 
 @dataclass(slots=True)
 class GuideItem:
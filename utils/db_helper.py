@@ -1,14 +1,46 @@
 import os
+import time
+import asyncio
+import sqlite3
+import weakref
+import itertools
 
-from dataclasses import dataclass
+from collections import OrderedDict, defaultdict
+from collections.abc import Awaitable, Callable
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
 
 import asqlite
 
+from utils.db_metrics import (
+    StatementObserver,
+    observe_backup,
+    observe_maintenance,
+    observe_pool_wait,
+    observe_shards
+)
+
 
 __all__ = [
     'BaseColumn',
+    'BaseIndex',
     'BaseTable',
-    'DatabaseHelper'
+    'Migration',
+    'table_schema',
+    'rebuild_table',
+    'PragmaProfile',
+    'PRAGMA_PROFILES',
+    'PoolStats',
+    'BackupResult',
+    'MaintenanceResult',
+    'StatementResult',
+    'UnitOfWork',
+    'MEMORY_DATABASE',
+    'DatabaseHelper',
+    'ShardRouter'
 ]
 
 
@@ -19,50 +51,689 @@ class BaseColumn:
     addit_schema: str | None = None
 
 
+@dataclass(slots=True)
+class BaseIndex:
+    name: str
+    columns: list[str]
+    unique: bool = False
+
+
 @dataclass(slots=True)
 class BaseTable:
     name: str
     columns: list[BaseColumn]
+    constraints: list[str] = field(default_factory=list)
+    indexes: list[BaseIndex] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Migration:
+    """Upgrades an existing database to ``version``, statements run before the callback in the same transaction"""
+    version: int
+    description: str
+    statements: list[str] = field(default_factory=list)
+    callback: Callable[[asqlite.Connection], Awaitable[None]] | None = None
+
+
+def table_schema(table: BaseTable, *, name: str | None = None) -> list[str]:
+    """Returns the statements that create the table and its indexes"""
+    name = name or table.name
+    column_schema = ', '.join(
+        [
+            f'{col.name} {col.datatype}{" " + col.addit_schema if col.addit_schema else ""}'
+            for col in table.columns
+        ] + table.constraints
+    )
+    statements = [f'CREATE TABLE IF NOT EXISTS {name} ({column_schema})']
+
+    for index in table.indexes:
+        unique = 'UNIQUE ' if index.unique else ''
+        statements.append(
+            f'CREATE {unique}INDEX IF NOT EXISTS {index.name} ON {name} ({", ".join(index.columns)})'
+        )
+
+    return statements
+
+
+async def rebuild_table(conn: asqlite.Connection, table: BaseTable, *, keep_last: bool = False) -> None:
+    """Recreates an existing table with its current schema and copies the rows over.
+
+    Rows that collide on a new key are dropped, keeping the first inserted row unless ``keep_last``.
+    """
+    old_columns = {row['name'] for row in await conn.fetchall(f'PRAGMA table_info({table.name})')}
+    if not old_columns:
+        for statement in table_schema(table):
+            await conn.execute(statement)
+        return
+
+    columns = ', '.join(c.name for c in table.columns if c.name in old_columns)
+    temp_name = f'{table.name}_rebuild'
+    conflict = 'REPLACE' if keep_last else 'IGNORE'
+
+    # Indexes are created after the rename, so they end up on the right table
+    await conn.execute(f'DROP TABLE IF EXISTS {temp_name}')
+    await conn.execute(table_schema(table, name=temp_name)[0])
+    await conn.execute(
+        f'INSERT OR {conflict} INTO {temp_name} ({columns}) SELECT {columns} FROM {table.name} ORDER BY rowid'
+    )
+    await conn.execute(f'DROP TABLE {table.name}')
+    await conn.execute(f'ALTER TABLE {temp_name} RENAME TO {table.name}')
+
+    for statement in table_schema(table)[1:]:
+        await conn.execute(statement)
+
+
+@dataclass(slots=True)
+class PragmaProfile:
+    """Per-connection performance settings, applied to every pooled connection when it opens"""
+    name: str
+    synchronous: str = 'NORMAL'
+    cache_size: int = -2000
+    mmap_size: int = 0
+    temp_store: str = 'DEFAULT'
+    wal_autocheckpoint: int = 1000
+    busy_timeout: int = 5000
+
+    def statements(self) -> list[str]:
+        return [
+            f'PRAGMA synchronous = {self.synchronous}',
+            f'PRAGMA cache_size = {self.cache_size}',
+            f'PRAGMA mmap_size = {self.mmap_size}',
+            f'PRAGMA temp_store = {self.temp_store}',
+            f'PRAGMA wal_autocheckpoint = {self.wal_autocheckpoint}',
+            f'PRAGMA busy_timeout = {self.busy_timeout}'
+        ]
+
+    def apply(self, connection: sqlite3.Connection) -> None:
+        for statement in self.statements():
+            connection.execute(statement).fetchall()
+
+
+# cache_size is negative so it's read as KiB instead of pages
+PRAGMA_PROFILES: dict[str, PragmaProfile] = {
+    # sqlite's defaults, every commit is synced to disk
+    'safe': PragmaProfile('safe', synchronous='FULL'),
+    # In WAL mode NORMAL can lose the last commits on power loss, but never corrupts the database
+    'balanced': PragmaProfile(
+        'balanced',
+        cache_size=-16000,
+        mmap_size=64 * 1024 * 1024,
+        temp_store='MEMORY'
+    ),
+    # Never syncs, an OS crash or power loss can lose recent commits. Checkpoints run less often
+    'throughput': PragmaProfile(
+        'throughput',
+        synchronous='OFF',
+        cache_size=-64000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store='MEMORY',
+        wal_autocheckpoint=4000,
+        busy_timeout=10000
+    )
+}
+
+
+@dataclass(slots=True)
+class PoolStats:
+    size: int = 0
+    in_use: int = 0
+    acquisitions: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    busy_time: float = 0.0
+    opened_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def average_wait(self) -> float:
+        if not self.acquisitions:
+            return 0.0
+
+        return self.total_wait / self.acquisitions
+
+    @property
+    def utilisation(self) -> float:
+        """Fraction of the pool's available connection-time that was spent holding a connection"""
+        elapsed = time.perf_counter() - self.opened_at
+        if not self.size or elapsed <= 0:
+            return 0.0
+
+        return min(self.busy_time / (self.size * elapsed), 1.0)
+
+    def record_acquire(self, wait: float) -> None:
+        self.acquisitions += 1
+        self.in_use += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def record_release(self, held: float) -> None:
+        self.in_use -= 1
+        self.busy_time += held
+
+
+@dataclass(slots=True)
+class BackupResult:
+    path: str
+    pages: int
+    steps: int
+    duration: float
+
+
+@dataclass(slots=True)
+class MaintenanceResult:
+    wal_size: int
+    checkpoint_busy: bool
+    wal_pages: int
+    checkpointed_pages: int
+    duration: float
+
+
+@dataclass(slots=True)
+class StatementResult:
+    """A statement queued in a :class:`UnitOfWork`, the result fields are filled in once it commits"""
+    command: str
+    params: Any
+    many: bool = False
+    guild_id: int | None = None
+    done: bool = False
+    rowcount: int = -1
+    lastrowid: int | None = None
+    rows: list[sqlite3.Row] = field(default_factory=list)
+
+
+class UnitOfWork:
+    """Collects statements and runs them together in a single transaction when the block exits.
+
+    Nothing is run if the block raises. When sharded the statements are committed once per
+    database they touch, so atomicity holds within each database file.
+    """
+
+    def __init__(self, db: 'DatabaseHelper'):
+        self.db = db
+        self.statements: list[StatementResult] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def execute(self, command: str, params=(), *, guild_id: int | None = None) -> StatementResult:
+        statement = StatementResult(command, tuple(params) if isinstance(params, list) else params, guild_id=guild_id)
+        self.statements.append(statement)
+        return statement
+
+    def executemany(self, command: str, seq_of_params, *, guild_id: int | None = None) -> StatementResult:
+        statement = StatementResult(command, list(seq_of_params), many=True, guild_id=guild_id)
+        self.statements.append(statement)
+        return statement
+
+    async def commit(self) -> list[StatementResult]:
+        statements, self.statements = self.statements, []
+        groups: dict[int | None, list[StatementResult]] = defaultdict(list)
+
+        for statement in statements:
+            if statement.many and not statement.params:
+                statement.done = True
+                statement.rowcount = 0
+                continue
+
+            groups[statement.guild_id if self.db.shards is not None else None].append(statement)
+
+        for guild_id, group in groups.items():
+            async with self.db.conn(write=True, guild_id=guild_id) as conn:
+                async with conn.transaction():
+                    for statement in group:
+                        await self._run(conn, statement)
+
+        return statements
+
+    @staticmethod
+    async def _run(conn: asqlite.Connection, statement: StatementResult) -> None:
+        if statement.many:
+            cursor = conn.executemany(statement.command, statement.params)
+        else:
+            cursor = conn.execute(statement.command, statement.params)
+
+        async with cursor as cursor:
+            if not statement.many and asqlite.is_read_only(statement.command):
+                statement.rows = await cursor.fetchall()
+
+            statement.rowcount = cursor.get_cursor().rowcount
+            statement.lastrowid = cursor.get_cursor().lastrowid
+
+        statement.done = True
+
+
+MEMORY_DATABASE = ':memory:'
+_memory_ids = itertools.count()
 
 
 class DatabaseHelper:
-    def __init__(self, base_tables: list[BaseTable], user_version: int, *args, **kwargs):
+    def __init__(
+            self,
+            base_tables: list[BaseTable],
+            user_version: int,
+            *args,
+            readers: int = 4,
+            migrations: list[Migration] | None = None,
+            slow_query_threshold: float | None = 0.1,
+            profile: PragmaProfile | str = 'balanced',
+            shards: 'ShardRouter | None' = None,
+            **kwargs
+    ):
         self.base_tables = base_tables
         self.user_version = user_version
-        self.args, self.kwargs = args, kwargs
+        self.migrations = sorted(migrations or [], key=lambda m: m.version)
+        self.in_memory = bool(args) and args[0] == MEMORY_DATABASE
         self.add_version = False
+        self.num_readers = max(readers, 0)
+
+        if self.in_memory:
+            # Each connection to ':memory:' gets a database of its own, a named shared-cache database is
+            # seen by every connection of the pool and lives until the last one closes. Shared-cache
+            # connections lock whole tables instead of using WAL, so everything runs on the writer
+            args = (f'file:sdg-memory-{next(_memory_ids)}?mode=memory&cache=shared',) + args[1:]
+            kwargs['uri'] = True
+            self.num_readers = 0
+
+        self.args, self.kwargs = args, kwargs
+        self.writer_stats = PoolStats()
+        self.reader_stats = PoolStats()
+        self.observer = StatementObserver(slow_query_threshold)
+
+        if isinstance(profile, str):
+            if profile not in PRAGMA_PROFILES:
+                raise ValueError(f'Unknown database profile {profile!r}, expected one of {", ".join(PRAGMA_PROFILES)}')
+            profile = PRAGMA_PROFILES[profile]
+
+        self.profile = profile
+        self.shards = shards
+        self.pool: asqlite.Pool | None = None
+        # Generators from iterate() hold their connection until they're finalized, close() finalizes them
+        self._iterators = weakref.WeakSet()
 
     async def startup(self):
-        if not os.path.exists(self.args[0]):
+        if self.in_memory or not os.path.exists(self.args[0]):
             self.add_version = True
 
+        await self.open_pool()
+
+        # A new database is created straight at the latest schema, existing ones are migrated up to it first
         if self.add_version:
             await self.set_version()
+        else:
+            await self.migrate()
 
         await self.create_table()
 
-    def conn(self):
-        return asqlite.connect(*self.args, **self.kwargs)
+        if self.shards is not None:
+            os.makedirs(self.shards.directory, exist_ok=True)
 
-    async def execute(self, command: str, *args, **kwargs):
-        async with self.conn() as conn:
+    async def open_pool(self):
+        self.pool = await asqlite.create_pool(
+            *self.args,
+            readers=self.num_readers,
+            observer=self.observer,
+            init=self.profile.apply,
+            **self.kwargs
+        )
+        self.writer_stats = PoolStats(size=1)
+        self.reader_stats = PoolStats(size=self.num_readers)
+
+    async def close(self):
+        # An abandoned iterator on a pool without readers holds the writer, optimize() would wait on it forever
+        for iterator in list(self._iterators):
+            try:
+                await iterator.aclose()
+            except RuntimeError:
+                # It's being iterated right now, its connection is returned once that step finishes
+                pass
+
+        if self.shards is not None:
+            await self.shards.close()
+
+        if self.pool is None:
+            return
+
+        # sqlite recommends running optimize before closing long-lived connections
+        try:
+            await self.optimize()
+        except Exception:
+            logger.exception('Failed to optimize database before closing')
+
+        pool, self.pool = self.pool, None
+        await pool.close()
+
+    @asynccontextmanager
+    async def conn(self, *, write: bool = False, guild_id: int | None = None):
+        """Borrows a pooled connection, readers are query-only and the writer is held exclusively.
+
+        With a shard router, passing ``guild_id`` borrows the connection from that guild's shard instead.
+        """
+        if guild_id is not None and self.shards is not None:
+            async with self.shards.shard(guild_id) as shard:
+                async with shard.conn(write=write) as connection:
+                    yield connection
+            return
+
+        if self.pool is None:
+            raise RuntimeError('Database pool is not open, call startup() first')
+
+        write = write or not self.num_readers
+        stats = self.writer_stats if write else self.reader_stats
+        start = time.perf_counter()
+
+        async with self.pool.acquire(write=write) as connection:
+            acquired = time.perf_counter()
+            stats.record_acquire(acquired - start)
+            observe_pool_wait('writer' if write else 'readers', acquired - start)
+
+            try:
+                yield connection
+            finally:
+                stats.record_release(time.perf_counter() - acquired)
+
+    @asynccontextmanager
+    async def transaction(self, outer: UnitOfWork | None = None):
+        """Collects the statements of a multi-step change and commits them together when the block exits.
+
+        Passing an ``outer`` unit of work joins it instead, its owner commits everything at once.
+        """
+        if outer is not None:
+            yield outer
+            return
+
+        unit = UnitOfWork(self)
+        yield unit
+        await unit.commit()
+
+    def conn_for(self, command: str, *, guild_id: int | None = None):
+        """Borrows a reader for read-only statements and the writer for everything else"""
+        return self.conn(write=not asqlite.is_read_only(command), guild_id=guild_id)
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        return {
+            'writer': self.writer_stats,
+            'readers': self.reader_stats
+        }
+
+    async def execute(self, command: str, *args, guild_id: int | None = None):
+        async with self.conn_for(command, guild_id=guild_id) as conn:
             async with conn.cursor() as cursor:
-                await cursor.execute(command, *args, **kwargs)
+                await cursor.execute(command, *args)
             await conn.commit()
 
-    async def set_version(self):
+    async def fetchone(self, command: str, *args, guild_id: int | None = None):
+        async with self.conn_for(command, guild_id=guild_id) as conn:
+            return await conn.fetchone(command, *args)
+
+    async def fetchall(self, command: str, *args, guild_id: int | None = None):
+        async with self.conn_for(command, guild_id=guild_id) as conn:
+            return await conn.fetchall(command, *args)
+
+    def iterate(self, command: str, *args, size: int = 256, guild_id: int | None = None):
+        """Streams the result rows in batches of ``size``, the connection is held until iteration finishes.
+
+        Breaking out early holds it until the generator is closed, wrap it in :func:`contextlib.aclosing` to do that.
+        Generators that are still open when the helper closes are closed first.
+        """
+        iterator = self._iterate(command, args, size, guild_id)
+        self._iterators.add(iterator)
+        return iterator
+
+    async def _iterate(self, command: str, args: tuple, size: int, guild_id: int | None):
+        async with self.conn_for(command, guild_id=guild_id) as conn:
+            async with aclosing(conn.iterate(command, *args, size=size)) as rows:
+                async for row in rows:
+                    yield row
+
+    async def executemany(self, command: str, seq_of_params, *, guild_id: int | None = None) -> None:
+        """Runs the command once for every parameter set, all inside a single transaction"""
+        seq_of_params = list(seq_of_params)
+        if not seq_of_params:
+            return
+
+        async with self.conn(write=True, guild_id=guild_id) as conn:
+            async with conn.transaction():
+                await conn.executemany(command, seq_of_params)
+
+    def _backup_init(self, connection: sqlite3.Connection) -> None:
+        self.profile.apply(connection)
+        connection.execute('pragma query_only=ON')
+
+    @asynccontextmanager
+    async def _backup_conn(self):
+        """Borrows a reader, or opens a read-only connection of its own when the pool has no readers"""
+        if self.num_readers:
+            async with self.conn() as connection:
+                yield connection
+            return
+
+        if self.pool is None:
+            raise RuntimeError('Database pool is not open, call startup() first')
+
+        # Without readers conn() would hand out the writer and block every write until the backup finishes
+        async with asqlite.connect(
+                *self.args,
+                init=self._backup_init,
+                shared=False,
+                observer=self.observer,
+                **self.kwargs
+        ) as connection:
+            yield connection
+
+    async def backup(self, target: str, *, pages: int = 256, sleep: float = 0.005) -> BackupResult:
+        """Copies the database to ``target`` a few pages at a time from a read-only connection.
+
+        The copy is written next to the target and renamed once complete, so ``target`` is never partial.
+        """
+        partial = f'{target}.partial'
+        start = time.perf_counter()
+
+        try:
+            async with self._backup_conn() as conn:
+                copied, steps = await conn.backup(partial, pages=pages, sleep=sleep)
+
+            os.replace(partial, target)
+        except Exception:
+            observe_backup(time.perf_counter() - start, 0, failed=True)
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+        duration = time.perf_counter() - start
+        observe_backup(duration, copied)
+        return BackupResult(target, copied, steps, duration)
+
+    def wal_size(self) -> int:
+        try:
+            return os.path.getsize(f'{self.args[0]}-wal')
+        except OSError:
+            return 0
+
+    async def checkpoint(self) -> tuple[bool, int, int]:
+        """Runs a passive checkpoint, which copies what it can without waiting on readers or the writer.
+        Returns whether it was blocked, the pages in the WAL, and how many were checkpointed.
+        """
+        # Checkpoints don't need the writer, so they're run on a reader to keep writes flowing
         async with self.conn() as conn:
+            row = await conn.fetchone('PRAGMA wal_checkpoint(PASSIVE)')
+
+        return bool(row[0]), row[1], row[2]
+
+    async def optimize(self) -> None:
+        async with self.conn(write=True) as conn:
+            await conn.fetchall('PRAGMA optimize')
+
+    async def maintain(self) -> MaintenanceResult:
+        start = time.perf_counter()
+        busy, wal_pages, checkpointed = await self.checkpoint()
+        await self.optimize()
+
+        result = MaintenanceResult(self.wal_size(), busy, wal_pages, checkpointed, time.perf_counter() - start)
+        observe_maintenance(result.duration, result.wal_size, busy, wal_pages, checkpointed)
+        return result
+
+    async def get_version(self) -> int:
+        row = await self.fetchone('PRAGMA user_version')
+        return row[0]
+
+    async def set_version(self):
+        async with self.conn(write=True) as conn:
             await conn.execute(f'PRAGMA user_version = {self.user_version}')
 
+    async def migrate(self):
+        """Applies every pending migration in order, each one in its own transaction"""
+        current_version = await self.get_version()
+
+        for migration in self.migrations:
+            if migration.version <= current_version or migration.version > self.user_version:
+                continue
+
+            logger.info('Migrating database to version {}: {}', migration.version, migration.description)
+            start = time.perf_counter()
+
+            async with self.conn(write=True) as conn:
+                async with conn.transaction():
+                    for statement in migration.statements:
+                        await conn.execute(statement)
+
+                    if migration.callback:
+                        await migration.callback(conn)
+
+                    await conn.execute(f'PRAGMA user_version = {migration.version}')
+
+            current_version = migration.version
+            logger.info('Migrated to version {} in {:.3f}s', migration.version, time.perf_counter() - start)
+
     async def create_table(self):
-        async with self.conn() as conn:
+        async with self.conn(write=True) as conn:
             async with conn.cursor() as cursor:
                 for table in self.base_tables:
-                    column_schema = ', '.join(
-                        f'{col.name} {col.datatype}{" " + col.addit_schema if col.addit_schema else ""}'
-                        for col in table.columns
-                    )
-                    command = f"CREATE TABLE IF NOT EXISTS {table.name} ({column_schema})"
-                    await cursor.execute(command)
+                    for statement in table_schema(table):
+                        await cursor.execute(statement)
 
             await conn.commit()
+
+
+@dataclass(slots=True)
+class _Shard:
+    db: DatabaseHelper
+    users: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ShardRouter:
+    """Keeps each guild's rows in a database file of its own under ``directory``.
+
+    Shards are opened on first use and the least recently used idle shards are closed
+    once more than ``max_open`` are open. Extra keyword arguments are passed to every
+    shard's :class:`DatabaseHelper`.
+    """
+
+    def __init__(
+            self,
+            base_tables: list[BaseTable],
+            user_version: int,
+            directory: str,
+            *,
+            max_open: int = 64,
+            **helper_kwargs
+    ):
+        self.base_tables = base_tables
+        self.user_version = user_version
+        self.directory = directory
+        self.max_open = max(max_open, 1)
+        self.helper_kwargs = helper_kwargs
+        self.opens = 0
+        self.evictions = 0
+        self._open: OrderedDict[int, _Shard] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def path(self, guild_id: int) -> str:
+        return os.path.join(self.directory, f'{guild_id}.db')
+
+    def guild_ids(self) -> list[int]:
+        """Guilds that have a shard on disk, open or not"""
+        if not os.path.isdir(self.directory):
+            return []
+
+        return sorted(
+            int(name[:-3]) for name in os.listdir(self.directory)
+            if name.endswith('.db') and name[:-3].isdigit()
+        )
+
+    @asynccontextmanager
+    async def shard(self, guild_id: int):
+        """Pins the guild's shard open for the duration of the block"""
+        shard = self._open.get(guild_id)
+        if shard is None:
+            shard = await self._open_shard(guild_id)
+
+        shard.users += 1
+        self._open.move_to_end(guild_id)
+
+        try:
+            yield shard.db
+        finally:
+            shard.users -= 1
+            shard.last_used = time.monotonic()
+
+    async def _open_shard(self, guild_id: int) -> _Shard:
+        async with self._lock:
+            # Another task may have opened it while this one waited for the lock
+            shard = self._open.get(guild_id)
+            if shard is not None:
+                return shard
+
+            db = DatabaseHelper(self.base_tables, self.user_version, self.path(guild_id), **self.helper_kwargs)
+            await db.startup()
+
+            shard = self._open[guild_id] = _Shard(db)
+            self.opens += 1
+            await self._evict(self.max_open, exclude=guild_id)
+            observe_shards(len(self._open), self.opens, self.evictions)
+            return shard
+
+    async def _evict(self, keep: int, *, idle_for: float = 0, exclude: int | None = None) -> None:
+        now = time.monotonic()
+        victims = []
+
+        # Least recently used first, shards that are pinned stay open even past the limit
+        for guild_id, shard in self._open.items():
+            if len(self._open) - len(victims) <= keep:
+                break
+
+            if guild_id != exclude and not shard.users and now - shard.last_used >= idle_for:
+                victims.append(guild_id)
+
+        for guild_id in victims:
+            shard = self._open.pop(guild_id)
+            self.evictions += 1
+            await shard.db.close()
+
+    async def close_idle(self, idle_for: float) -> None:
+        """Closes every shard that hasn't been used in ``idle_for`` seconds"""
+        async with self._lock:
+            await self._evict(0, idle_for=idle_for)
+            observe_shards(len(self._open), self.opens, self.evictions)
+
+    async def maintain(self) -> tuple[int, int]:
+        """Checkpoints the open shards, returns how many were checkpointed and their total WAL size"""
+        checkpointed = 0
+        wal_size = 0
+
+        for guild_id in list(self._open):
+            async with self.shard(guild_id) as db:
+                await db.checkpoint()
+                wal_size += db.wal_size()
+                checkpointed += 1
+
+        observe_shards(len(self._open), self.opens, self.evictions, wal_size=wal_size)
+        return checkpointed, wal_size
+
+    async def close(self) -> None:
+        async with self._lock:
+            while self._open:
+                _, shard = self._open.popitem(last=False)
+                await shard.db.close()
@@ -0,0 +1,234 @@
+import re
+import sqlite3
+import threading
+import weakref
+
+from functools import lru_cache
+
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+
+import asqlite
+
+
+__all__ = [
+    'normalize_sql',
+    'StatementObserver',
+    'observe_pool_wait',
+    'observe_backup',
+    'observe_maintenance',
+    'observe_shards'
+]
+
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+STATEMENT_LATENCY = Histogram(
+    'sdg_db_statement_seconds',
+    'Time spent running a statement or fetching its rows on the worker thread',
+    ['operation', 'template'],
+    buckets=LATENCY_BUCKETS
+)
+ROWS_READ = Counter('sdg_db_rows_read', 'Rows fetched from the database', ['template'])
+ROWS_WRITTEN = Counter('sdg_db_rows_written', 'Rows changed by write statements', ['template'])
+QUEUE_WAIT = Histogram(
+    'sdg_db_worker_queue_wait_seconds',
+    'Time a call waited in the worker queue before it started running',
+    buckets=LATENCY_BUCKETS
+)
+POOL_WAIT = Histogram(
+    'sdg_db_pool_wait_seconds',
+    'Time spent waiting to borrow a pooled connection',
+    ['role'],
+    buckets=LATENCY_BUCKETS
+)
+# Statements autocommitted outside of BEGIN count as transactions of their own, their commit time includes the statement
+COMMIT_LATENCY = Histogram('sdg_db_commit_seconds', 'Time spent committing a transaction', buckets=LATENCY_BUCKETS)
+TRANSACTION_ROWS = Histogram(
+    'sdg_db_transaction_rows',
+    'Rows changed by each committed transaction',
+    buckets=SIZE_BUCKETS
+)
+BACKUP_DURATION = Histogram(
+    'sdg_db_backup_seconds',
+    'Time taken by online database backups',
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+BACKUP_PAGES = Counter('sdg_db_backup_pages', 'Database pages copied by online backups')
+BACKUP_FAILURES = Counter('sdg_db_backup_failures', 'Online database backups that failed')
+BACKUP_LAST_SUCCESS = Gauge('sdg_db_backup_last_success_timestamp_seconds', 'When the last backup finished')
+MAINTENANCE_DURATION = Histogram(
+    'sdg_db_maintenance_seconds',
+    'Time taken by a database maintenance pass',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+)
+WAL_SIZE = Gauge('sdg_db_wal_size_bytes', 'Size of the WAL file after the last maintenance pass')
+WAL_PAGES = Gauge('sdg_db_wal_pages', 'Pages in the WAL at the last checkpoint')
+CHECKPOINTED_PAGES = Counter('sdg_db_checkpointed_pages', 'WAL pages copied back by maintenance checkpoints')
+CHECKPOINT_BUSY = Counter('sdg_db_checkpoint_busy', 'Maintenance checkpoints that were blocked by another connection')
+OPEN_SHARDS = Gauge('sdg_db_open_shards', 'Guild database shards currently open')
+SHARD_OPENS = Gauge('sdg_db_shard_opens', 'Guild database shards opened since startup')
+SHARD_EVICTIONS = Gauge('sdg_db_shard_evictions', 'Idle guild database shards closed since startup')
+SHARD_WAL_SIZE = Gauge('sdg_db_shard_wal_size_bytes', 'Total WAL size of the open shards after the last maintenance pass')
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+
+_MAX_TEMPLATE_LENGTH = 200
+_DML_KEYWORDS = frozenset({'INSERT', 'UPDATE', 'DELETE', 'REPLACE'})
+
+
+@lru_cache(maxsize=512)
+def normalize_sql(sql: str) -> str:
+    """Reduces a statement to a template usable as a metric label, literals become ``?`` and IN lists collapse"""
+    template = _WHITESPACE.sub(' ', sql).strip().rstrip(';')
+    template = _STRING_LITERAL.sub('?', template)
+    template = _NUMBER_LITERAL.sub('?', template)
+    template = _IN_LIST.sub('IN (...)', template)
+
+    if len(template) > _MAX_TEMPLATE_LENGTH:
+        template = template[:_MAX_TEMPLATE_LENGTH - 3] + '...'
+
+    return template
+
+
+def observe_pool_wait(role: str, wait: float) -> None:
+    POOL_WAIT.labels(role).observe(wait)
+
+
+def observe_backup(duration: float, pages: int, *, failed: bool = False) -> None:
+    if failed:
+        BACKUP_FAILURES.inc()
+        return
+
+    BACKUP_DURATION.observe(duration)
+    BACKUP_PAGES.inc(pages)
+    BACKUP_LAST_SUCCESS.set_to_current_time()
+
+
+def observe_maintenance(duration: float, wal_size: int, busy: bool, wal_pages: int, checkpointed: int) -> None:
+    MAINTENANCE_DURATION.observe(duration)
+    WAL_SIZE.set(wal_size)
+    WAL_PAGES.set(max(wal_pages, 0))
+    CHECKPOINTED_PAGES.inc(max(checkpointed, 0))
+
+    if busy:
+        CHECKPOINT_BUSY.inc()
+
+
+def observe_shards(open_shards: int, opens: int, evictions: int, *, wal_size: int | None = None) -> None:
+    OPEN_SHARDS.set(open_shards)
+    SHARD_OPENS.set(opens)
+    SHARD_EVICTIONS.set(evictions)
+
+    if wal_size is not None:
+        SHARD_WAL_SIZE.set(wal_size)
+
+
+class StatementObserver:
+    """Records per-statement metrics for asqlite workers, pass it as the ``observer`` of a pool.
+
+    Called on the worker threads, statements taking at least ``slow_query_threshold`` seconds
+    are logged as warnings. A threshold of ``None`` disables the slow query log.
+    """
+
+    def __init__(self, slow_query_threshold: float | None = 0.1):
+        self.slow_query_threshold = slow_query_threshold
+        self._lock = threading.Lock()
+        self._cursor_templates: weakref.WeakKeyDictionary[sqlite3.Cursor, str] = weakref.WeakKeyDictionary()
+        # sqlite3.Connection can't be weakly referenced, entries are dropped when the connection closes
+        self._transactions: dict[int, int] = {}
+
+    def __call__(self, func, args, result, exc, queue_wait: float, run_time: float) -> None:
+        QUEUE_WAIT.observe(queue_wait)
+        owner = getattr(func, '__self__', None)
+        name = getattr(func, '__name__', '')
+
+        if name in ('execute', 'executemany') and args:
+            self._on_execute(owner, name, args[0], result, exc, run_time)
+        elif name in ('fetchone', 'fetchmany', 'fetchall') and isinstance(owner, sqlite3.Cursor):
+            self._on_fetch(owner, name, result, run_time)
+        elif name == 'commit' and isinstance(owner, sqlite3.Connection):
+            self._on_commit(owner, run_time)
+        elif name in ('rollback', 'close') and isinstance(owner, sqlite3.Connection):
+            with self._lock:
+                self._transactions.pop(id(owner), None)
+
+    def _on_execute(self, owner, operation: str, sql: str, cursor, exc, run_time: float) -> None:
+        template = normalize_sql(sql)
+        STATEMENT_LATENCY.labels(operation, template).observe(run_time)
+        self._check_slow(operation, template, run_time)
+
+        if exc is not None or not isinstance(cursor, sqlite3.Cursor):
+            return
+
+        connection = owner if isinstance(owner, sqlite3.Connection) else cursor.connection
+        keyword = template.split(' ', 1)[0].upper()
+
+        with self._lock:
+            self._cursor_templates[cursor] = template
+
+            if keyword == 'BEGIN':
+                self._transactions[id(connection)] = 0
+            elif keyword == 'ROLLBACK':
+                self._transactions.pop(id(connection), None)
+
+        if keyword in ('COMMIT', 'END'):
+            self._on_commit(connection, run_time)
+            return
+
+        if asqlite.is_read_only(sql):
+            return
+
+        rows = max(cursor.rowcount, 0)
+        if rows:
+            ROWS_WRITTEN.labels(template).inc(rows)
+
+        with self._lock:
+            explicit = id(connection) in self._transactions
+            if explicit:
+                self._transactions[id(connection)] += rows
+
+        # Outside of BEGIN an autocommit connection commits the statement by itself
+        if not explicit and keyword in _DML_KEYWORDS and not connection.in_transaction:
+            COMMIT_LATENCY.observe(run_time)
+            TRANSACTION_ROWS.observe(rows)
+
+    def _on_fetch(self, cursor: sqlite3.Cursor, operation: str, rows, run_time: float) -> None:
+        with self._lock:
+            template = self._cursor_templates.get(cursor)
+
+        if template is None:
+            return
+
+        STATEMENT_LATENCY.labels(operation, template).observe(run_time)
+        self._check_slow(operation, template, run_time)
+
+        if isinstance(rows, list):
+            count = len(rows)
+        else:
+            count = int(rows is not None)
+
+        if count:
+            ROWS_READ.labels(template).inc(count)
+
+    def _on_commit(self, connection: sqlite3.Connection, run_time: float) -> None:
+        with self._lock:
+            rows = self._transactions.pop(id(connection), None)
+
+        if rows is None:
+            # Autocommit connections turn commit() into a no-op outside of an explicit transaction
+            return
+
+        COMMIT_LATENCY.observe(run_time)
+        TRANSACTION_ROWS.observe(rows)
+
+    def _check_slow(self, operation: str, template: str, run_time: float) -> None:
+        if self.slow_query_threshold is None or run_time < self.slow_query_threshold:
+            return
+
+        logger.warning('Slow query ({} took {:.1f}ms): {}', operation, run_time * 1000, template)
+
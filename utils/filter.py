@@ -7,7 +7,7 @@ import re
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
-from utils.classes import Role, Subalignment, Faction, SDGException, GuildInfo
+from utils.classes import Role, Subalignment, Faction, SDGException, GuildInfo, PartialRole, RoleStore
 
 __all__ = [
     'generate_rolelist_roles',
@@ -16,31 +16,6 @@ __all__ = [
 ]
 
 
-@dataclass(frozen=True)
-class PartialRole:
-    id: int
-    name: str
-    faction_name: str
-    tags: frozenset[str]
-
-    @classmethod
-    def from_role(cls, role: Role) -> PartialRole:
-        tags = role.forum_tags | {role.subalignment.name}
-        partial_role = cls(
-            id=role.id,
-            name=role.name,
-            faction_name=role.faction.name,
-            tags=frozenset(tags),
-        )
-        return partial_role
-
-    def to_role(self, full_roles: list[Role]) -> Role:
-        for role in full_roles:
-            if role.id == self.id:
-                return role
-        raise SDGException(f'Unable to convert partial role {self.name} to full role')
-
-
 @dataclass(frozen=True)
 class FactionedPartialRole:
     role: PartialRole
@@ -114,8 +89,9 @@ class Filter(ABC):
 class RoleFilter(Filter):
     def filter_roles(self, in_roles: set[PartialRole]) -> set[PartialRole]:
         valid_roles = set()
+        filter_name = self.filter_str.lower().strip()
         for role in in_roles:
-            add_role = role.name.lower().strip() == self.filter_str.lower().strip()
+            add_role = role.name.lower().strip() == filter_name
             if self.negated:
                 add_role = not add_role
 
@@ -147,13 +123,14 @@ class TagFilter(Filter):
         if self.filter_str == 'ANY':
             return in_roles if not self.negated else set()
 
+        if not in_roles:
+            return set()
+
         valid_roles = set()
+        # The roles all come from one guild, a tag its store hasn't seen matches none of them
+        filter_bit = next(iter(in_roles)).store.tag_bit(self.filter_str, add=False)
         for role in in_roles:
-            add_role = False
-            for tag in role.tags:
-                if tag.lower().strip() == self.filter_str.lower().strip():
-                    add_role = True
-                    continue
+            add_role = bool(role.tag_mask & filter_bit)
 
             if self.negated:
                 add_role = not add_role
@@ -314,6 +291,10 @@ class Marker:
     amount: int
     valid_roles: set[PartialRole] | None
     valid_factions: list[str, Role, Subalignment, Faction] | None
+    valid_role_ids: frozenset[int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.valid_role_ids = frozenset(r.id for r in self.valid_roles or ())
 
     def is_role_markable(self, role: FactionedRole) -> bool:
         if self.amount <= 0:
@@ -328,7 +309,7 @@ class Marker:
         if self.valid_factions and role.alignment not in self.valid_factions:
             return False
 
-        if self.valid_roles and PartialRole.from_role(role.role) not in self.valid_roles:
+        if self.valid_roles and role.id not in self.valid_role_ids:
             return False
 
         return True
@@ -374,6 +355,7 @@ class Rolelist:
     modifiers: list[Modifier]
     weight_changers: list[WeightChanger]
     markers: list[Marker]
+    store: RoleStore = field(default_factory=RoleStore, repr=False)
 
 
 filter_dict = {
@@ -616,21 +598,13 @@ def get_all_weights(roles: list[PartialRole], weight_changers: list[WeightChange
     return weights
 
 def get_flex_faction(text: str, guild_info: GuildInfo) -> str | Role | Subalignment | Faction:
-    fac_matches = [f for f in guild_info.factions if f.name.lower() == text.lower()]
-    faction = None
-
-    if fac_matches:
-        faction = fac_matches[0]
+    faction = guild_info.get_faction_by_name(text)
 
     if not faction:
-        sub_matches = [s for s in guild_info.subalignments if s.name.lower() == text.lower()]
-        if sub_matches:
-            faction = sub_matches[0]
+        faction = guild_info.get_subalignment_by_name(text)
 
     if not faction:
-        role_matches = [r for r in guild_info.roles if r.name.lower() == text.lower()]
-        if role_matches:
-            faction = role_matches[0]
+        faction = guild_info.get_role_by_name(text)
 
     if not faction:
         faction = text
@@ -670,7 +644,7 @@ def get_rolelist(message_str: str, guild_info: GuildInfo) -> Rolelist:
     modifiers = []
     weights = []
     markers = []
-    partial_roles = {PartialRole.from_role(r) for r in all_roles}
+    partial_roles = guild_info.role_store.partial_roles(all_roles)
 
     for line in message_lines:
         if not line:
@@ -702,7 +676,8 @@ def get_rolelist(message_str: str, guild_info: GuildInfo) -> Rolelist:
         global_filters=global_filters,
         modifiers=modifiers,
         weight_changers=weights,
-        markers=markers
+        markers=markers,
+        store=guild_info.role_store
     )
 
 
@@ -710,7 +685,7 @@ def generate_rolelist_roles(rolelist: Rolelist, full_roles: list[Role]) -> list[
     roles: list[FactionedRole] = []
     p_roles: list[PartialRole] = []
     weight_changers = rolelist.weight_changers
-    partial_roles = {PartialRole.from_role(r) for r in full_roles}
+    partial_roles = rolelist.store.partial_roles(full_roles)
 
     rolelist = copy.deepcopy(rolelist)
 
@@ -37,11 +37,7 @@ __all__ = [
 T = TypeVar('T')
 
 def get_guild_info(interaction: discord.Interaction) -> 'OptionalGuildInfo':
-    for g in interaction.client.guild_info:
-        if g.guild_id == interaction.guild_id:
-            return g
-
-    return None
+    return interaction.client.guild_info.get(interaction.guild_id)
 
 
 def create_embed(user: User | Member | None, *, image=None, thumbnail=None, **kwargs) -> Embed:
@@ -134,41 +130,46 @@ async def get_or_fetch_channel(guild: discord.Guild, channel_id: int):
     return guild.get_channel_or_thread(channel_id) or await guild.fetch_channel(channel_id)
 
 
-async def get_valid_roles(
+def _tagged_role_ids(guild_info: 'utils.GuildInfo', tags: list[str]) -> set[int]:
+    """Ids of the roles with any of ``tags``, a role's subalignment counts as one of its tags"""
+    role_ids = set()
+    for tag in tags:
+        normalized_tag = tag.lower().strip()
+        role_ids.update(r.id for r in guild_info.get_tagged_roles(normalized_tag))
+
+        for subalignment in guild_info.subalignments:
+            if subalignment.name.lower().strip() == normalized_tag:
+                role_ids.update(r.id for r in guild_info.get_subalignment_roles(subalignment.id))
+
+    return role_ids
+
+
+def get_valid_roles(
         include_tags: str,
         exclude_tags: str,
         guild_info: 'utils.GuildInfo',
         faction: 'utils.Faction',
-        subalignment: 'utils.Subalignment',
-        guild: discord.Guild
+        subalignment: 'utils.Subalignment'
 ) -> list['utils.Role']:
-    valid_roles = []
-    split_include_tags = include_tags.split()
-    split_exclude_tags = exclude_tags.split()
+    if subalignment:
+        candidates = guild_info.get_subalignment_roles(subalignment.id)
+    elif faction:
+        candidates = guild_info.get_faction_roles(faction.id)
+    else:
+        candidates = guild_info.roles
+
+    included_ids = _tagged_role_ids(guild_info, include_tags.split()) if include_tags else None
+    excluded_ids = _tagged_role_ids(guild_info, exclude_tags.split())
 
-    for role in guild_info.roles:
+    valid_roles = []
+    for role in candidates:
         if faction and role.faction.id != faction.id:
             continue
 
         if subalignment and role.subalignment.id != subalignment.id:
             continue
 
-        role_thread = await get_or_fetch_channel(guild, role.id)
-        role_thread_tags = [t.name.lower().strip() for t in role_thread.applied_tags]
-        has_included_tag = not bool(include_tags)
-        has_excluded_tag = False
-
-        for exclude_tag in split_exclude_tags:
-            normalized_e_tag = exclude_tag.lower().strip()
-            if normalized_e_tag in role_thread_tags:
-                has_excluded_tag = True
-
-        for include_tag in split_include_tags:
-            normalized_i_tag = include_tag.lower().strip()
-            if normalized_i_tag in role_thread_tags:
-                has_included_tag = True
-
-        if has_excluded_tag or not has_included_tag:
+        if role.id in excluded_ids or (included_ids is not None and role.id not in included_ids):
             continue
 
         valid_roles.append(role)
@@ -235,7 +236,7 @@ async def get_faction_emote(
         interaction: discord.Interaction
     ) -> discord.Emoji | str | None:
     if isinstance(faction, Subalignment):
-        subs_faction = interaction.client.get_subalignment_faction(faction)
+        subs_faction = interaction.client.get_subalignment_faction(faction, get_guild_info(interaction))
         if subs_faction:
             forum_channel = await get_or_fetch_channel(interaction.guild, subs_faction.id)
             sub_tag = forum_channel.get_tag(faction.id)
@@ -0,0 +1,39 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+__all__ = [
+    'observe_guilds',
+    'observe_hibernations',
+    'observe_wake',
+    'observe_eviction'
+]
+
+
+RESIDENT_GUILDS = Gauge('sdg_guilds_resident', 'Guilds with their accounts and achievements loaded in memory')
+HIBERNATED_GUILDS = Gauge('sdg_guilds_hibernated', 'Idle guilds whose accounts and achievements were dropped from memory')
+GUILD_HIBERNATIONS = Counter('sdg_guild_hibernations', 'Idle guilds hibernated')
+GUILD_WAKES = Counter('sdg_guild_wakes', 'Hibernated guilds loaded back by an interaction')
+GUILD_WAKE_LATENCY = Histogram(
+    'sdg_guild_wake_seconds',
+    'Time spent loading a hibernated guild back before its interaction ran',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+GUILD_EVICTIONS = Counter('sdg_guild_evictions', 'Guilds dropped from memory after the bot left them')
+
+
+def observe_guilds(resident: int, hibernated: int) -> None:
+    RESIDENT_GUILDS.set(resident)
+    HIBERNATED_GUILDS.set(hibernated)
+
+
+def observe_hibernations(count: int) -> None:
+    GUILD_HIBERNATIONS.inc(count)
+
+
+def observe_wake(duration: float) -> None:
+    GUILD_WAKES.inc()
+    GUILD_WAKE_LATENCY.observe(duration)
+
+
+def observe_eviction() -> None:
+    GUILD_EVICTIONS.inc()
@@ -15,6 +15,7 @@ __all__ = [
     'FakeContext',
     'FakeMessage',
     'ChoiceTransformer',
+    'clear_cached_choices',
     'MessageTransformer',
     'GreedyMemberRoleTransformer',
     'FactionTransformer',
@@ -127,7 +128,20 @@ class GreedyMemberRoleTransformer(app_commands.Transformer):
 
         return items
 
+# (transformer type, guild id) -> (GuildInfo version, choices), so cached choices expire with the version
+_CHOICE_CACHE: dict[tuple[type, int], tuple[int, list[Choice]]] = {}
+
+
+def clear_cached_choices(guild_id: int) -> None:
+    """Drops a guild's cached choices, for guilds that were evicted or hibernated"""
+    for key in [k for k in _CHOICE_CACHE if k[1] == guild_id]:
+        del _CHOICE_CACHE[key]
+
+
 class ChoiceTransformer(app_commands.Transformer):
+    # Whether get_choices only depends on the guild's GuildInfo, so its choices can be cached per version
+    cache_choices = False
+
     async def transform(self, interaction: Interaction, value: Any, /) -> Any:
         return await maybe_coroutine(self.get_value, interaction, value)
 
@@ -140,7 +154,7 @@ class ChoiceTransformer(app_commands.Transformer):
     async def autocomplete(
             self, interaction: Interaction, value: int | float | str, /
     ) -> list[Choice[int | float | str]]:
-        choices = await maybe_coroutine(self.get_choices, interaction)
+        choices = await self.get_cached_choices(interaction)
         if not value:
             return choices[:25]
 
@@ -150,8 +164,24 @@ class ChoiceTransformer(app_commands.Transformer):
         choices = [Choice(name=v, value=k) for k, v in choice_matches.items()]
         return choices
 
+    async def get_cached_choices(self, interaction: Interaction) -> list[Choice]:
+        guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
+        if not self.cache_choices or guild_info is None:
+            return await maybe_coroutine(self.get_choices, interaction)
+
+        key = (type(self), guild_info.guild_id)
+        cached = _CHOICE_CACHE.get(key)
+        if cached is not None and cached[0] == guild_info.version:
+            return cached[1]
+
+        choices = await maybe_coroutine(self.get_choices, interaction)
+        _CHOICE_CACHE[key] = (guild_info.version, choices)
+        return choices
+
 
 class FactionTransformer(ChoiceTransformer):
+    cache_choices = True
+
     def get_choices(self, interaction: Interaction) -> list[app_commands.Choice]:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
         choice_list = []
@@ -169,6 +199,8 @@ class FactionTransformer(ChoiceTransformer):
 
 
 class SubalignmentTransformer(ChoiceTransformer):
+    cache_choices = True
+
     def get_choices(self, interaction: Interaction) -> list[app_commands.Choice]:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
         choice_list = []
@@ -186,6 +218,8 @@ class SubalignmentTransformer(ChoiceTransformer):
 
 
 class InfoCategoryTransformer(ChoiceTransformer):
+    cache_choices = True
+
     def get_choices(self, interaction: Interaction) -> list[app_commands.Choice]:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
         choice_list = []
@@ -222,13 +256,19 @@ class InfoTagTransformer(ChoiceTransformer):
 
     def get_value(self, interaction: Interaction, value: Any) -> InfoTag:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
-        info_tag = guild_info.get_info_tag(int(value))
+        # Autocomplete values can be submitted without picking a choice, then the tag is looked up by name
+        if str(value).isnumeric():
+            info_tag = guild_info.get_info_tag(int(value))
+        else:
+            info_tag = guild_info.get_info_tag_by_name(str(value).strip())
         if info_tag is None:
             raise SDGException('Invalid value')
         return info_tag
 
 
 class RoleTransformer(ChoiceTransformer):
+    cache_choices = True
+
     def get_choices(self, interaction: Interaction) -> list[app_commands.Choice]:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
         choice_list = []
@@ -246,6 +286,8 @@ class RoleTransformer(ChoiceTransformer):
 
 
 class RSFTransformer(ChoiceTransformer):
+    cache_choices = True
+
     def get_choices(self, interaction: Interaction) -> list[app_commands.Choice]:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
         choice_list = []
@@ -343,6 +385,8 @@ class ForumTagTransformer(ChoiceTransformer):
 
 
 class AchievementTransformer(ChoiceTransformer):
+    cache_choices = True
+
     def get_choices(self, interaction: Interaction) -> list[app_commands.Choice]:
         guild_info: GuildInfo = interaction.client.get_guild_info(interaction.guild.id)
         choice_list = []